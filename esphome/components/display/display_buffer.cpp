@@ -1,5 +1,7 @@
 #include "display_buffer.h"
 
+#include <algorithm>
+#include <cstring>
 #include <utility>
 
 #include "esphome/core/application.h"
@@ -9,10 +11,17 @@ namespace esphome {
 namespace display {
 
 static const char *const TAG = "display";
+// Side of the square blocks pixels are transposed in when blitting to a display rotated by 90 or
+// 270 degrees. 16 rows of 16 bit pixels of either buffer fit a few cache lines each.
+static const int BLIT_BLOCK_SIZE = 16;
 
-void DisplayBuffer::init_internal_(uint32_t buffer_length) {
+uint8_t *DisplayBuffer::allocate_buffer_(uint32_t buffer_length) {
   ExternalRAMAllocator<uint8_t> allocator(ExternalRAMAllocator<uint8_t>::ALLOW_FAILURE);
-  this->buffer_ = allocator.allocate(buffer_length);
+  return allocator.allocate(buffer_length);
+}
+
+void DisplayBuffer::init_internal_(uint32_t buffer_length) {
+  this->buffer_ = this->allocate_buffer_(buffer_length);
   this->buffer_length_ = buffer_length;
   if (this->buffer_ == nullptr) {
     ESP_LOGE(TAG, "Could not allocate buffer for display!");
@@ -21,6 +30,199 @@ void DisplayBuffer::init_internal_(uint32_t buffer_length) {
   this->clear();
 }
 
+#ifdef USE_GUI
+uint8_t *DisplayBuffer::allocate_back_buffer() {
+  if (this->back_buffer_ == nullptr && this->buffer_length_ > 0)
+    this->back_buffer_ = this->allocate_buffer_(this->buffer_length_);
+  if (this->back_buffer_ == nullptr)
+    ESP_LOGE(TAG, "Could not allocate back buffer for display!");
+  return this->back_buffer_;
+}
+
+void HOT DisplayBuffer::blit_area(const Rect &area, const uint8_t *data) {
+  if (this->buffer_ == nullptr)
+    return;
+  const int width = this->get_width_internal();
+  const uint32_t bpp = this->get_buffer_bpp_();
+  if (bpp == 0) {
+    ESP_LOGE(TAG, "Blitting is not supported for displays with less than 8 bits per pixel");
+    return;
+  }
+  const uint32_t row_len = area.w * bpp;
+  for (int16_t row = 0; row < area.h; row++) {
+    uint32_t offset = ((area.y + row) * width + area.x) * bpp;
+    memcpy(this->buffer_ + offset, data + row * row_len, row_len);
+  }
+}
+
+Rect DisplayBuffer::blit_rotated_area(const Rect &area, const uint8_t *data) {
+  this->blit_rect(area.x, area.y, area.w, area.h, data);
+  return this->to_absolute_area_(area.x, area.y, area.w, area.h);
+}
+#endif
+
+uint32_t DisplayBuffer::get_buffer_bpp_() {
+  const uint32_t pixels = this->get_width_internal() * this->get_height_internal();
+  if (this->buffer_ == nullptr || pixels == 0)
+    return 0;
+  return this->buffer_length_ / pixels;
+}
+
+bool DisplayBuffer::clip_rect_(int &x, int &y, int &width, int &height) {
+  int x2, y2;
+  if (!this->clamp_x_(x, width, x, x2) || !this->clamp_y_(y, height, y, y2))
+    return false;
+  width = x2 - x;
+  height = y2 - y;
+  return true;
+}
+
+Rect DisplayBuffer::to_absolute_area_(int x, int y, int width, int height) {
+  switch (this->rotation_) {
+    case DISPLAY_ROTATION_90_DEGREES:
+      return Rect(this->get_width_internal() - y - height, x, height, width);
+    case DISPLAY_ROTATION_180_DEGREES:
+      return Rect(this->get_width_internal() - x - width, this->get_height_internal() - y - height, width, height);
+    case DISPLAY_ROTATION_270_DEGREES:
+      return Rect(y, this->get_height_internal() - x - width, height, width);
+    case DISPLAY_ROTATION_0_DEGREES:
+    default:
+      return Rect(x, y, width, height);
+  }
+}
+
+void HOT DisplayBuffer::fill_rect(int x, int y, int width, int height, Color color) {
+  if (!this->clip_rect_(x, y, width, height))
+    return;
+  this->fill_absolute_area_internal(this->to_absolute_area_(x, y, width, height), color);
+  App.feed_wdt();
+}
+
+void HOT DisplayBuffer::fill_absolute_area_internal(const Rect &area, Color color) {
+  for (int y = area.y; y < area.y2(); y++) {
+    for (int x = area.x; x < area.x2(); x++)
+      this->draw_absolute_pixel_internal(x, y, color);
+  }
+}
+
+void HOT DisplayBuffer::fill_buffer_area_(const Rect &area, const uint8_t *pixel, uint32_t bpp) {
+  const uint32_t stride = this->get_width_internal() * bpp;
+  const uint32_t row_len = area.w * bpp;
+  uint8_t *first = this->buffer_ + area.y * stride + area.x * bpp;
+  if (bpp == 1) {
+    memset(first, *pixel, row_len);
+  } else {
+    for (uint32_t offset = 0; offset < row_len; offset += bpp)
+      memcpy(first + offset, pixel, bpp);
+  }
+  // The remaining rows are copies of the first one.
+  for (int16_t row = 1; row < area.h; row++)
+    memcpy(first + row * stride, first, row_len);
+}
+
+/// Copy count pixels from src to dst, advancing dst by step pixels after each one.
+static inline void HOT copy_pixels(uint8_t *dst, const uint8_t *src, int count, int32_t step, uint32_t bpp) {
+  switch (bpp) {
+    case 1:
+      for (int i = 0; i < count; i++, dst += step)
+        *dst = src[i];
+      break;
+    case 2:
+      for (int i = 0; i < count; i++, dst += step * 2)
+        memcpy(dst, src + i * 2, 2);
+      break;
+    case 4:
+      for (int i = 0; i < count; i++, dst += step * 4)
+        memcpy(dst, src + i * 4, 4);
+      break;
+    default:
+      for (int i = 0; i < count; i++, dst += step * (int32_t) bpp)
+        memcpy(dst, src + i * bpp, bpp);
+      break;
+  }
+}
+
+void HOT DisplayBuffer::blit_rect(int x, int y, int width, int height, const uint8_t *data) {
+  const uint32_t bpp = this->get_buffer_bpp_();
+  if (bpp == 0) {
+    ESP_LOGE(TAG, "Blitting is not supported for displays with less than 8 bits per pixel");
+    return;
+  }
+  int clip_x = x, clip_y = y, clip_w = width, clip_h = height;
+  if (!this->clip_rect_(clip_x, clip_y, clip_w, clip_h))
+    return;
+  const uint8_t *src = data + ((clip_y - y) * width + (clip_x - x)) * bpp;
+  const uint32_t src_stride = width * bpp;
+  const Rect area = this->to_absolute_area_(clip_x, clip_y, clip_w, clip_h);
+
+  // Where the top left source pixel ends up, and how far apart (in pixels) consecutive source
+  // pixels and rows are in the buffer.
+  const int32_t buf_width = this->get_width_internal();
+  int32_t start_x, start_y, col_step, row_step;
+  switch (this->rotation_) {
+    case DISPLAY_ROTATION_90_DEGREES:
+      start_x = area.x2() - 1;
+      start_y = area.y;
+      col_step = buf_width;
+      row_step = -1;
+      break;
+    case DISPLAY_ROTATION_180_DEGREES:
+      start_x = area.x2() - 1;
+      start_y = area.y2() - 1;
+      col_step = -1;
+      row_step = -buf_width;
+      break;
+    case DISPLAY_ROTATION_270_DEGREES:
+      start_x = area.x;
+      start_y = area.y2() - 1;
+      col_step = -buf_width;
+      row_step = 1;
+      break;
+    case DISPLAY_ROTATION_0_DEGREES:
+    default:
+      start_x = area.x;
+      start_y = area.y;
+      col_step = 1;
+      row_step = buf_width;
+      break;
+  }
+  uint8_t *dst = this->buffer_ + (start_y * buf_width + start_x) * bpp;
+  if (col_step == 1 || col_step == -1) {
+    // Rows stay rows, so both buffers are walked sequentially.
+    for (int row = 0; row < clip_h; row++, src += src_stride, dst += row_step * (int32_t) bpp) {
+      if (col_step == 1) {
+        memcpy(dst, src, clip_w * bpp);
+      } else {
+        copy_pixels(dst, src, clip_w, col_step, bpp);
+      }
+    }
+  } else {
+    // Rows become columns. Transposing in square blocks keeps the rows written to, as well
+    // as the ones read from, in the cache rather than striding across the whole buffer.
+    for (int block_row = 0; block_row < clip_h; block_row += BLIT_BLOCK_SIZE) {
+      const int rows = std::min(BLIT_BLOCK_SIZE, clip_h - block_row);
+      for (int block_col = 0; block_col < clip_w; block_col += BLIT_BLOCK_SIZE) {
+        const int cols = std::min(BLIT_BLOCK_SIZE, clip_w - block_col);
+        for (int row = block_row; row < block_row + rows; row++) {
+          copy_pixels(dst + (row * row_step + block_col * col_step) * (int32_t) bpp,
+                      src + row * src_stride + block_col * bpp, cols, col_step, bpp);
+        }
+      }
+    }
+  }
+  App.feed_wdt();
+}
+
+bool DisplayBuffer::use_hardware_rotation() {
+  if (this->rotation_ == DISPLAY_ROTATION_0_DEGREES)
+    return true;
+  if (!this->set_hardware_rotation_(this->rotation_))
+    return false;
+  // The driver's buffer is now laid out in rotated coordinates.
+  this->rotation_ = DISPLAY_ROTATION_0_DEGREES;
+  return true;
+}
+
 int DisplayBuffer::get_width() {
   switch (this->rotation_) {
     case DISPLAY_ROTATION_90_DEGREES:
@@ -21,23 +21,101 @@ class DisplayBuffer : public Display {
   /// Set a single pixel at the specified coordinates to the given color.
   void draw_pixel_at(int x, int y, Color color) override;
 
+  /// Fill a horizontal run of pixels starting at [x,y] with the given color.
+  void fill_span(int x, int y, int width, Color color) { this->fill_rect(x, y, width, 1, color); }
+  /// Fill a rectangle with the given color. The rectangle is clipped and rotated once rather than
+  /// per pixel, then handed to fill_absolute_area_internal().
+  void fill_rect(int x, int y, int width, int height, Color color);
+  /// Copy a rectangle of pixels, given row by row in the buffer's native format, to [x,y].
+  /// Rotation and clipping are applied like for any other drawing.
+  void blit_rect(int x, int y, int width, int height, const uint8_t *data);
+
+  void horizontal_line(int x, int y, int width, Color color = COLOR_ON) override {
+    this->fill_span(x, y, width, color);
+  }
+  void vertical_line(int x, int y, int height, Color color = COLOR_ON) override {
+    this->fill_rect(x, y, 1, height, color);
+  }
+  void filled_rectangle(int x1, int y1, int width, int height, Color color = COLOR_ON) override {
+    this->fill_rect(x1, y1, width, height, color);
+  }
+
   virtual int get_height_internal() = 0;
   virtual int get_width_internal() = 0;
 
+  /// Have the panel rotate the image itself (e.g. through its MADCTL register) instead of rotating
+  /// every pixel drawn. Returns false if the driver can't, in which case nothing changes.
+  bool use_hardware_rotation();
+
 #ifdef USE_GUI
   // public DisplayBuffer methods for LVGL
   virtual void update() = 0;
   uint8_t *get_buffer() { return this->buffer_; }
   uint32_t get_buffer_length() { return this->buffer_length_; }
+
+  /// Write a window of the buffer to the display and return the number of bytes sent.
+  /// Drivers which can address a part of the panel should override this together with
+  /// supports_partial_update(); the default falls back to a full update().
+  virtual uint32_t update_area(const Rect &area) {
+    this->update();
+    return this->buffer_length_;
+  }
+  virtual bool supports_partial_update() { return false; }
+
+  /// Allocate a second buffer of the same size, used by the GUI for double buffering.
+  uint8_t *allocate_back_buffer();
+  /// Start sending a window of the given buffer to the display and return the number of
+  /// bytes queued. Drivers capable of background (e.g. DMA) transfers should override this
+  /// together with is_update_busy(); the default makes it the active buffer and performs
+  /// a blocking update_area().
+  virtual uint32_t start_update_area(const Rect &area, uint8_t *buffer) {
+    this->buffer_ = buffer;
+    return this->update_area(area);
+  }
+  virtual bool is_update_busy() { return false; }
+
+  /// Copy a window of pixels, given in the buffer's native format, into the buffer.
+  void blit_area(const Rect &area, const uint8_t *data);
+  /// Write a window of pixels, given in the buffer's native format, to the display and return
+  /// the number of bytes sent. Drivers which can stream pixels straight to the panel should
+  /// override it; the default copies them into the buffer and calls update_area().
+  virtual uint32_t write_area(const Rect &area, const uint8_t *data) {
+    this->blit_area(area, data);
+    return this->update_area(area);
+  }
+  /// Copy a window of pixels given in rotated coordinates into the buffer, rotating it on the way,
+  /// and return the window of the buffer it ended up in.
+  Rect blit_rotated_area(const Rect &area, const uint8_t *data);
 #endif
 
  protected:
   virtual void draw_absolute_pixel_internal(int x, int y, Color color) = 0;
+  /// Drivers supporting hardware rotation should override it to set up the panel for the given
+  /// rotation and return true. Afterwards, get_width_internal(), get_height_internal() and the
+  /// layout of the buffer have to follow the rotated dimensions.
+  virtual bool set_hardware_rotation_(DisplayRotation rotation) { return false; }
+  /// Fill an area, in unrotated coordinates and within the bounds of the display. Drivers
+  /// should override it if they can do better than drawing pixel by pixel, e.g. using
+  /// fill_buffer_area_().
+  virtual void fill_absolute_area_internal(const Rect &area, Color color);
+
+  /// Clip a rectangle against the display and the clipping region, returns false if nothing is left.
+  bool clip_rect_(int &x, int &y, int &width, int &height);
+  /// Map a rectangle from rotated to unrotated coordinates.
+  Rect to_absolute_area_(int x, int y, int width, int height);
+  /// Bytes per pixel of the buffer, 0 for formats packing several pixels into a byte.
+  uint32_t get_buffer_bpp_();
+  /// Fill an area of a row-major buffer with a pixel in its native format.
+  void fill_buffer_area_(const Rect &area, const uint8_t *pixel, uint32_t bpp);
 
   void init_internal_(uint32_t buffer_length);
+  uint8_t *allocate_buffer_(uint32_t buffer_length);
 
   uint8_t *buffer_{nullptr};
   uint32_t buffer_length_{0};
+#ifdef USE_GUI
+  uint8_t *back_buffer_{nullptr};
+#endif
 };
 
 }  // namespace display
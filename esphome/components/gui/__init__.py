@@ -1,10 +1,25 @@
+import logging
 import re
 
 import esphome.codegen as cg
 import esphome.config_validation as cv
 import esphome.core as core
+import esphome.final_validate as fv
+from esphome import automation
+from esphome.automation import maybe_simple_id
+from esphome.cpp_generator import LambdaExpression
 from esphome.schema_extractors import schema_extractor, SCHEMA_EXTRACT
-from esphome.components import display, switch, sensor, image, color
+from esphome.components import (
+    binary_sensor,
+    display,
+    switch,
+    sensor,
+    image,
+    color,
+    font,
+    touchscreen,
+)
+from esphome.components.rotary_encoder.sensor import RotaryEncoderSensor
 
 from esphome.const import (
     CONF_ID,
@@ -21,8 +36,41 @@ from esphome.const import (
     CONF_GROUP,
     CONF_LENGTH,
     CONF_COUNT,
+    CONF_DIMENSIONS,
+    CONF_HEIGHT,
+    CONF_PRIORITY,
+    CONF_MAX_LENGTH,
+    CONF_FORMAT,
+    CONF_FILE,
+    CONF_GLYPHS,
+    CONF_SIZE,
+    CONF_RESIZE,
+    CONF_PATH,
+    CONF_UPDATE_INTERVAL,
+    CONF_OUTPUT,
+    ENTITY_CATEGORY_DIAGNOSTIC,
+    ICON_COUNTER,
+    ICON_MEMORY,
+    ICON_TIMER,
+    STATE_CLASS_MEASUREMENT,
+    UNIT_BYTES,
+    UNIT_MILLISECOND,
+    UNIT_PERCENT,
+)
+from .fonts import font_symbol, generate_font, remove_stale_fonts
+from .images import (
+    COMPRESSION_NONE,
+    COMPRESSION_RLE,
+    TRANSPARENCY_ALPHA,
+    TRANSPARENCY_CHROMA_KEY,
+    TRANSPARENCY_OPAQUE,
+    generate_image,
+    image_symbol,
+    remove_stale_images,
 )
 
+_LOGGER = logging.getLogger(__name__)
+
 CODEOWNERS = ["@lukasz-tuz"]
 
 # Contains _extensive_ amount of code from @clydebarrow's work on lvgl component
@@ -31,13 +79,53 @@ CODEOWNERS = ["@lukasz-tuz"]
 # in the future. For now, I'm re-using his schema to avoid reinventing the wheel.
 
 DEPENDENCIES = ["display"]
+AUTO_LOAD = ["sensor"]
 
 CONF_DISPLAY_ID = "display_id"
+CONF_BUFFER_MODE = "buffer_mode"
+CONF_DRAW_BUFFER_LINES = "draw_buffer_lines"
+CONF_DRAW_BUFFER_PERCENT = "draw_buffer_percent"
+CONF_TARGET_FPS = "target_fps"
+CONF_IDLE_POLICY = "idle_policy"
+CONF_ROTATION_MODE = "rotation_mode"
+CONF_DIAGNOSTICS = "diagnostics"
+CONF_TRACE = "trace"
+CONF_TEXT_CACHE = "text_cache"
+CONF_CACHE = "cache"
+CONF_IN_PSRAM = "in_psram"
+CONF_ALL_LABELS = "all_labels"
+CONF_OVERLAY = "overlay"
+CONF_MEMORY = "memory"
+CONF_ALLOCATOR = "allocator"
+CONF_POOL_SIZE = "pool_size"
+CONF_POOL_IN_PSRAM = "pool_in_psram"
+CONF_INTERNAL_THRESHOLD = "internal_threshold"
+
+ALLOCATOR_POOL = "pool"
+ALLOCATOR_HEAP = "heap"
+# LVGL's default LV_MEM_SIZE
+DEFAULT_POOL_SIZE = 48 * 1024
+CONF_PAGES = "pages"
+CONF_POLICY = "policy"
+CONF_RENDER_TASK = "render_task"
+CONF_CORE = "core"
+CONF_STACK_SIZE = "stack_size"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_DEADBAND = "deadband"
+CONF_THEME = "theme"
+CONF_DEFAULT_FONT = "default_font"
+CONF_FONTS = "fonts"
+CONF_FONT_ID = "font_id"
+CONF_BPP = "bpp"
+CONF_IMAGES = "images"
+CONF_IMAGE_ID = "image_id"
+CONF_TRANSPARENCY = "transparency"
+CONF_COMPRESSION = "compression"
 CONF_SWITCH_ID = "switch_id"
 CONF_CHECKBOX = "checkbox"
 CONF_DESCRIPTION = "description"
-CONF_DIMENSIONS = "dimensions"
 CONF_POSITION = "position"
+CONF_TOUCHSCREEN_ID = "touchscreen_id"
 
 #
 # @clydebarrow lvgl component
@@ -51,6 +139,7 @@ CONF_BAR = "bar"
 CONF_BTN = "btn"
 CONF_BYTE_ORDER = "byte_order"
 CONF_CHANGE_RATE = "change_rate"
+CONF_CHART = "chart"
 CONF_CLEAR_FLAGS = "clear_flags"
 CONF_COLOR_DEPTH = "color_depth"
 CONF_COLOR_END = "color_end"
@@ -61,6 +150,7 @@ CONF_DISPLAY_ID = "display_id"
 CONF_END_ANGLE = "end_angle"
 CONF_END_VALUE = "end_value"
 CONF_FLEX_FLOW = "flex_flow"
+CONF_HISTORY = "history"
 CONF_IMG = "img"
 CONF_INDICATORS = "indicators"
 CONF_LABEL = "label"
@@ -85,6 +175,7 @@ CONF_ROTATION = "rotation"
 CONF_R_MOD = "r_mod"
 CONF_SCALES = "scales"
 CONF_SCALE_LINES = "scale_lines"
+CONF_SERIES = "series"
 CONF_SET_FLAGS = "set_flags"
 CONF_SLIDER = "slider"
 CONF_SRC = "src"
@@ -198,6 +289,8 @@ OBJ_FLAGS = [
     "user_4",
 ]
 
+THEMES = ["default", "basic", "none"]
+
 ARC_MODES = ["NORMAL", "REVERSE", "SYMMETRICAL"]
 BAR_MODES = ["NORMAL", "SYMMETRICAL", "RANGE"]
 
@@ -217,8 +310,8 @@ def lv_color(value):
     if isinstance(value, int):
         hexval = cv.hex_int(value)
         return f"lv_color_hex({hexval})"
-    color_id = cv.use_id(color)(value)
-    return f"lv_color_from({color_id})"
+    color_id = cv.use_id(color.ColorStruct)(value)
+    return f"gui::lv_color_from({color_id})"
 
 
 # List the LVGL built-in fonts that are available
@@ -226,7 +319,7 @@ LV_FONTS = list(map(lambda size: f"montserrat_{size}", range(12, 50, 2))) + [
     "montserrat_12_subpx",
     "montserrat_28_compressed",
     "dejavu_16_persian_hebrew",
-    "simsun_16_cjk16",
+    "simsun_16_cjk",
     "unscii_8",
     "unscii_16",
 ]
@@ -236,7 +329,8 @@ lv_fonts_used = set()
 
 
 def lv_font(value):
-    """Accept either the name of a built-in LVGL font, or the ID of an ESPHome font"""
+    """Accept either the name of a built-in LVGL font, or the ID of a font
+    generated from `fonts`"""
     global lv_fonts_used
     if value == SCHEMA_EXTRACT:
         return LV_FONTS
@@ -244,8 +338,7 @@ def lv_font(value):
         font = cv.one_of(*LV_FONTS, lower=True)(value)
         lv_fonts_used.add(font)
         return "&lv_font_" + font
-    font = cv.use_id(Font)(value)
-    return f"(new lvgl::FontEngine({font}))->get_lv_font()"
+    return cv.use_id(lv_font_t)(value)
 
 
 def lv_bool(value):
@@ -336,7 +429,7 @@ def lv_opacity(value):
 
 
 def lv_stop_value(value):
-    return cv.int_range(0, 255)
+    return cv.int_range(0, 255)(value)
 
 
 STYLE_PROPS = {
@@ -357,7 +450,7 @@ STYLE_PROPS = {
     "bg_opa": lv_opacity,
     "border_color": lv_color,
     "border_opa": lv_opacity,
-    "border_post": cv.boolean,
+    "border_post": lv_bool,
     "border_side": lv_any_of(
         ["NONE", "TOP", "BOTTOM", "LEFT", "RIGHT", "INTERNAL"], "LV_BORDER_SIDE_"
     ),
@@ -370,7 +463,6 @@ STYLE_PROPS = {
     "line_rounded": lv_bool,
     "line_color": lv_color,
     "opa": lv_opacity,
-    "opa_layered": lv_opacity,
     "outline_color": lv_color,
     "outline_opa": lv_opacity,
     "outline_pad": cv.positive_int,
@@ -477,14 +569,14 @@ def lv_value(value):
         return cv.float_(float(cv.int_(value)))
     if isinstance(value, float):
         return cv.float_(value)
-    return cv.templatable(cv.use_id(Sensor))(value)
+    return cv.use_id(sensor.Sensor)(value)
 
 
 def lv_text_value(value):
     if isinstance(value, cv.Lambda):
         return cv.returning_lambda(value)
     if isinstance(value, core.ID):
-        return cv.use_id(Sensor)(value)
+        return cv.use_id(sensor.Sensor)(value)
     return cv.string(value)
 
 
@@ -496,12 +588,161 @@ def lv_text_value(value):
 #
 
 
+lv_font_t = cg.global_ns.struct("lv_font_t")
+lv_img_dsc_t = cg.global_ns.struct("lv_img_dsc_t")
+lv_style_t = cg.global_ns.struct("lv_style_t")
+
 gui_ns = cg.esphome_ns.namespace("gui")
 GuiComponent = gui_ns.class_("GuiComponent", cg.Component)
 GuiObject = gui_ns.class_("GuiObject")
-GuiLabel = gui_ns.class_("GuiLabel", GuiObject, cg.Component)
-GuiCheckbox = gui_ns.class_("GuiCheckbox", GuiObject, cg.Component)
-GuiMeter = gui_ns.class_("GuiMeter", GuiObject, cg.Component)
+GuiStyleRef = gui_ns.struct("GuiStyleRef")
+GuiPage = gui_ns.class_("GuiPage")
+GuiPagePtr = GuiPage.operator("ptr")
+GuiLabel = gui_ns.class_("GuiLabel", GuiObject)
+GuiCheckbox = gui_ns.class_("GuiCheckbox", GuiObject)
+GuiMeter = gui_ns.class_("GuiMeter", GuiObject)
+GuiBar = gui_ns.class_("GuiBar", GuiObject)
+GuiImage = gui_ns.class_("GuiImage", GuiObject)
+GuiChart = gui_ns.class_("GuiChart", GuiObject)
+GuiDiagnostics = gui_ns.class_("GuiDiagnostics", cg.PollingComponent)
+GuiInput = gui_ns.class_("GuiInput")
+GuiRotaryEncoder = gui_ns.class_("GuiRotaryEncoder", GuiInput)
+GuiTouchscreen = gui_ns.class_("GuiTouchscreen", GuiInput, touchscreen.TouchListener)
+DumpTraceAction = gui_ns.class_("DumpTraceAction", automation.Action)
+ShowPageAction = gui_ns.class_("ShowPageAction", automation.Action)
+ShowNextPageAction = gui_ns.class_("ShowNextPageAction", automation.Action)
+ShowPreviousPageAction = gui_ns.class_("ShowPreviousPageAction", automation.Action)
+
+BufferMode = gui_ns.enum("BufferMode")
+BUFFER_MODES = {
+    "single": BufferMode.BUFFER_MODE_SINGLE,
+    "double": BufferMode.BUFFER_MODE_DOUBLE,
+}
+
+IdlePolicy = gui_ns.enum("IdlePolicy")
+IDLE_POLICIES = {
+    "busy": IdlePolicy.IDLE_POLICY_BUSY,
+    "sleep": IdlePolicy.IDLE_POLICY_SLEEP,
+}
+
+PagePolicy = gui_ns.enum("PagePolicy")
+PAGE_POLICIES = {
+    "eager": PagePolicy.PAGE_POLICY_EAGER,
+    "lazy": PagePolicy.PAGE_POLICY_LAZY,
+    "destroy": PagePolicy.PAGE_POLICY_DESTROY,
+}
+
+RotationMode = gui_ns.enum("RotationMode")
+ROTATION_MODES = {
+    "auto": RotationMode.ROTATION_MODE_AUTO,
+    "hardware": RotationMode.ROTATION_MODE_HARDWARE,
+    "software": RotationMode.ROTATION_MODE_SOFTWARE,
+}
+
+# Sensors of the diagnostics block: unit, icon and accuracy
+DIAGNOSTIC_SENSORS = {
+    "fps": ("FPS", "mdi:monitor-eye", 1),
+    "render_time_min": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "render_time_avg": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "render_time_max": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "flush_time_min": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "flush_time_avg": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "flush_time_max": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "invalidated_area": (UNIT_PERCENT, "mdi:select-drag", 1),
+    "heap_used": (UNIT_BYTES, ICON_MEMORY, 0),
+    "heap_max_used": (UNIT_BYTES, ICON_MEMORY, 0),
+    "heap_fragmentation": (UNIT_PERCENT, ICON_MEMORY, 0),
+    "timer_handler_runs": ("", ICON_COUNTER, 0),
+    "input_latency_min": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "input_latency_avg": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "input_latency_max": (UNIT_MILLISECOND, ICON_TIMER, 2),
+    "text_cache_hits": ("", ICON_COUNTER, 0),
+    "text_cache_misses": ("", ICON_COUNTER, 0),
+}
+
+DIAGNOSTICS_SCHEMA = cv.Schema(
+    {
+        cv.GenerateID(): cv.declare_id(GuiDiagnostics),
+        cv.Optional(CONF_UPDATE_INTERVAL, default="60s"): cv.update_interval,
+        **{
+            cv.Optional(key): sensor.sensor_schema(
+                unit_of_measurement=unit,
+                icon=icon,
+                accuracy_decimals=accuracy,
+                state_class=STATE_CLASS_MEASUREMENT,
+                entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+            )
+            for key, (unit, icon, accuracy) in DIAGNOSTIC_SENSORS.items()
+        },
+    }
+)
+
+ROTARY_ENCODER_SCHEMA = cv.Schema(
+    {
+        cv.GenerateID(): cv.declare_id(GuiRotaryEncoder),
+        cv.Required(CONF_SENSOR): cv.use_id(RotaryEncoderSensor),
+        cv.Optional(CONF_BINARY_SENSOR): cv.use_id(binary_sensor.BinarySensor),
+    }
+)
+
+TOUCHSCREEN_SCHEMA = cv.maybe_simple_value(
+    {
+        cv.GenerateID(): cv.declare_id(GuiTouchscreen),
+        cv.Required(CONF_TOUCHSCREEN_ID): cv.use_id(touchscreen.Touchscreen),
+    },
+    key=CONF_TOUCHSCREEN_ID,
+)
+
+TRACE_SCHEMA = cv.Schema(
+    {
+        cv.Optional(CONF_SIZE, default=256): cv.int_range(min=16, max=65535),
+        cv.Optional(CONF_OVERLAY, default=False): cv.boolean,
+        cv.Optional(CONF_OUTPUT): cv.All(cv.string, cv.only_on(["host"])),
+    }
+)
+
+TEXT_CACHE_SCHEMA = cv.Schema(
+    {
+        cv.Optional(CONF_SIZE, default=32768): cv.int_range(min=1024),
+        cv.Optional(CONF_IN_PSRAM): cv.All(cv.boolean, cv.only_on(["esp32"])),
+        # Labels which do not set cache themselves.
+        cv.Optional(CONF_ALL_LABELS, default=True): cv.boolean,
+    }
+)
+
+
+def validate_memory(config):
+    if config[CONF_ALLOCATOR] == ALLOCATOR_POOL:
+        if CONF_INTERNAL_THRESHOLD in config:
+            raise cv.Invalid(
+                f"{CONF_INTERNAL_THRESHOLD} requires the {ALLOCATOR_HEAP} allocator"
+            )
+        config.setdefault(CONF_POOL_SIZE, DEFAULT_POOL_SIZE)
+        config.setdefault(CONF_POOL_IN_PSRAM, False)
+    else:
+        for key in (CONF_POOL_SIZE, CONF_POOL_IN_PSRAM):
+            if key in config:
+                raise cv.Invalid(f"{key} requires the {ALLOCATOR_POOL} allocator")
+        config.setdefault(CONF_INTERNAL_THRESHOLD, 1024)
+    return config
+
+
+MEMORY_SCHEMA = cv.All(
+    cv.Schema(
+        {
+            cv.Optional(CONF_ALLOCATOR, default=ALLOCATOR_POOL): cv.one_of(
+                ALLOCATOR_POOL, ALLOCATOR_HEAP, lower=True
+            ),
+            # The pool is addressed with 32 bit offsets, but has to fit in RAM.
+            cv.Optional(CONF_POOL_SIZE): cv.int_range(min=2048, max=4 * 1024 * 1024),
+            cv.Optional(CONF_POOL_IN_PSRAM): cv.All(
+                cv.boolean, cv.only_on(["esp32"])
+            ),
+            cv.Optional(CONF_INTERNAL_THRESHOLD): cv.int_range(min=0),
+        }
+    ),
+    validate_memory,
+)
 
 
 def validate_position(position):
@@ -515,6 +756,39 @@ def validate_position(position):
         return [int(x), int(y)]
 
 
+def validate_label_text_length(config):
+    if CONF_MAX_LENGTH in config and CONF_TEXT in config:
+        if len(config[CONF_TEXT].encode("utf-8")) > config[CONF_MAX_LENGTH]:
+            raise cv.Invalid(
+                f"{CONF_TEXT} is longer than {CONF_MAX_LENGTH} ({config[CONF_MAX_LENGTH]} bytes)"
+            )
+    return config
+
+
+# A printf conversion, or an escaped "%"
+FORMAT_CONVERSION = re.compile(r"%(%|[-+ #0]*[0-9]*(\.[0-9]+)?[a-zA-Z])")
+
+
+def validate_value_format(value):
+    """printf format a sensor state is printed with: the state is passed as a
+    single double, so exactly one floating point conversion is allowed"""
+    value = cv.string(value)
+    conversions = [
+        m.group(1) for m in FORMAT_CONVERSION.finditer(value) if m.group(1) != "%"
+    ]
+    if len(conversions) != 1 or conversions[0][-1] not in "eEfFgG":
+        raise cv.Invalid(
+            "Format must contain exactly one of the conversions %e, %f or %g "
+            "(with optional flags, width and precision, e.g. %.1f), use %% for "
+            "a literal %"
+        )
+    if "%" in FORMAT_CONVERSION.sub("", value):
+        raise cv.Invalid(
+            "Format contains an invalid conversion, use %% for a literal %"
+        )
+    return value
+
+
 INDICATOR_SCHEMA = cv.Any(
     # {
     #     cv.Exclusive(CONF_LINE, CONF_INDICATORS): cv.Schema(
@@ -612,9 +886,50 @@ BAR_SCHEMA = cv.Schema(
     }
 )
 
+CHART_SERIES_SCHEMA = cv.Schema(
+    {
+        cv.Required(CONF_SENSOR): cv.use_id(sensor.Sensor),
+        cv.Optional(CONF_COLOR): lv_color,
+    }
+)
+
+# Colors of series without one of their own, in order.
+CHART_SERIES_PALETTE = ["BLUE", "RED", "GREEN", "ORANGE", "PURPLE", "CYAN"]
+
+
+def validate_chart(config):
+    if CONF_DIMENSIONS not in config:
+        raise cv.Invalid("Charts need dimensions, their width sets the columns")
+    if config[CONF_DIMENSIONS][0] < 2:
+        raise cv.Invalid("Charts need to be at least 2 pixels wide")
+    return config
+
+
+def chart_columns(config):
+    """Number of columns of a chart, and of samples shown by each column.
+    Each column shows ceil(history / width) samples, and there are just
+    enough columns for the history. That is min(history, width) columns at
+    most, each at least a pixel wide. A history shorter than the width
+    gets a column per sample, wider than a pixel."""
+    width = config[CONF_DIMENSIONS][0]
+    history = config.get(CONF_HISTORY, width)
+    samples_per_column = -(-history // width)
+    return -(-history // samples_per_column), samples_per_column
+
+
+# Options for widgets showing the state of a sensor.
+SENSOR_BINDING_SCHEMA = cv.Schema(
+    {
+        cv.Optional(
+            CONF_MIN_UPDATE_INTERVAL, default="0s"
+        ): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_DEADBAND, default=0.0): cv.positive_float,
+    }
+)
+
 STYLE_SCHEMA = PROP_SCHEMA.extend(
     {
-        cv.Optional(CONF_STYLES): cv.Any(),  # cv.ensure_list(cv.use_id(lv_style_t)),
+        cv.Optional(CONF_STYLES): cv.ensure_list(cv.use_id(lv_style_t)),
     }
 )
 STATE_SCHEMA = cv.Schema({cv.Optional(state): STYLE_SCHEMA for state in STATES}).extend(
@@ -642,13 +957,67 @@ OBJ_SCHEMA = PART_SCHEMA.extend(FLAG_SCHEMA).extend(
     )
 )
 
+
+def validate_truetype_source(value):
+    if value[font.CONF_TYPE] == font.TYPE_LOCAL_BITMAP:
+        raise cv.Invalid("Only TrueType fonts can be converted for the GUI")
+    return value
+
+
+FONT_SCHEMA = cv.All(
+    cv.Schema(
+        {
+            cv.Required(CONF_ID): cv.declare_id(lv_font_t),
+            cv.Exclusive(CONF_FILE, "source"): cv.All(
+                font.FILE_SCHEMA, validate_truetype_source
+            ),
+            cv.Exclusive(CONF_FONT_ID, "source"): cv.use_id(font.Font),
+            cv.Optional(CONF_SIZE): cv.int_range(min=1, max=200),
+            cv.Optional(CONF_BPP, default=4): cv.one_of(1, 2, 4, 8, int=True),
+            cv.Optional(CONF_GLYPHS, default=""): cv.string,
+        }
+    ),
+    cv.has_exactly_one_key(CONF_FILE, CONF_FONT_ID),
+    font.validate_pillow_installed,
+)
+
+IMAGE_SCHEMA = cv.All(
+    cv.Schema(
+        {
+            cv.Required(CONF_ID): cv.declare_id(lv_img_dsc_t),
+            cv.Exclusive(CONF_FILE, "source"): cv.file_,
+            cv.Exclusive(CONF_IMAGE_ID, "source"): cv.use_id(image.Image_),
+            cv.Optional(CONF_RESIZE): cv.dimensions,
+            cv.Optional(CONF_TRANSPARENCY): cv.one_of(
+                TRANSPARENCY_OPAQUE,
+                TRANSPARENCY_ALPHA,
+                TRANSPARENCY_CHROMA_KEY,
+                lower=True,
+            ),
+            cv.Optional(CONF_COMPRESSION, default=COMPRESSION_NONE): cv.one_of(
+                COMPRESSION_NONE, COMPRESSION_RLE, lower=True
+            ),
+        }
+    ),
+    cv.has_exactly_one_key(CONF_FILE, CONF_IMAGE_ID),
+    font.validate_pillow_installed,
+)
+
 WIDGET_SCHEMA = cv.Any(
     {
-        cv.Exclusive(CONF_LABEL, CONF_WIDGETS): OBJ_SCHEMA.extend(
-            {
-                cv.GenerateID(CONF_ID): cv.declare_id(GuiLabel),
-                cv.Optional(CONF_TEXT): cv.string,
-            }
+        cv.Exclusive(CONF_LABEL, CONF_WIDGETS): cv.All(
+            OBJ_SCHEMA.extend(
+                {
+                    cv.GenerateID(CONF_ID): cv.declare_id(GuiLabel),
+                    cv.Optional(CONF_TEXT): cv.string,
+                    cv.Optional(CONF_MAX_LENGTH): cv.int_range(min=1, max=1024),
+                    cv.Optional(CONF_SENSOR): cv.use_id(sensor.Sensor),
+                    cv.Optional(CONF_FORMAT, default="%.1f"): validate_value_format,
+                    cv.Optional(CONF_GLYPHS): cv.string,
+                    cv.Optional(CONF_CACHE): cv.boolean,
+                }
+            ).extend(SENSOR_BINDING_SCHEMA),
+            validate_label_text_length,
         ),
         # cv.Exclusive(CONF_LINE, CONF_WIDGETS): OBJ_SCHEMA.extend(
         #     {cv.Required(CONF_POINTS): cv_point_list}
@@ -658,7 +1027,29 @@ WIDGET_SCHEMA = cv.Any(
             {
                 cv.GenerateID(CONF_ID): cv.declare_id(GuiMeter),
                 cv.Optional(CONF_SCALES): cv.ensure_list(SCALE_SCHEMA),
+                cv.Optional(CONF_VALUE): lv_value,
             }
+        ).extend(SENSOR_BINDING_SCHEMA),
+        cv.Exclusive(CONF_BAR, CONF_WIDGETS): cv.All(
+            OBJ_SCHEMA.extend(BAR_SCHEMA)
+            .extend(SENSOR_BINDING_SCHEMA)
+            .extend({cv.GenerateID(CONF_ID): cv.declare_id(GuiBar)}),
+            validate_max_min,
+        ),
+        cv.Exclusive(CONF_CHART, CONF_WIDGETS): cv.All(
+            OBJ_SCHEMA.extend(
+                {
+                    cv.GenerateID(CONF_ID): cv.declare_id(GuiChart),
+                    cv.Optional(CONF_MIN_VALUE, default=0): cv.float_,
+                    cv.Optional(CONF_MAX_VALUE, default=100): cv.float_,
+                    cv.Optional(CONF_HISTORY): cv.int_range(min=2, max=65535),
+                    cv.Required(CONF_SERIES): cv.All(
+                        cv.ensure_list(CHART_SERIES_SCHEMA), cv.Length(min=1)
+                    ),
+                }
+            ),
+            validate_max_min,
+            validate_chart,
         ),
         cv.Exclusive(CONF_CHECKBOX, CONF_WIDGETS): OBJ_SCHEMA.extend(
             {
@@ -667,12 +1058,42 @@ WIDGET_SCHEMA = cv.Any(
                 cv.GenerateID(CONF_SWITCH_ID): cv.use_id(switch.Switch),
             }
         ),
-        # cv.Exclusive(CONF_IMG, CONF_WIDGETS): OBJ_SCHEMA.extend(
-        #     {cv.Required(CONF_SRC): cv.use_id(Image_)},
-        # ),
+        cv.Exclusive(CONF_IMG, CONF_WIDGETS): OBJ_SCHEMA.extend(
+            {
+                cv.GenerateID(CONF_ID): cv.declare_id(GuiImage),
+                cv.Required(CONF_SRC): cv.use_id(lv_img_dsc_t),
+            }
+        ),
+    }
+)
+
+# A screen of its own. Its style properties apply to the screen, on top of
+# those set on the gui.
+PAGE_SCHEMA = PART_SCHEMA.extend(
+    {
+        cv.Required(CONF_ID): cv.declare_id(GuiPage),
+        cv.Optional(CONF_POLICY, default="lazy"): cv.enum(PAGE_POLICIES, lower=True),
+        cv.Required(CONF_WIDGETS): cv.ensure_list(WIDGET_SCHEMA),
     }
 )
 
+
+def validate_text_cache(config):
+    text_cache = config.get(CONF_TEXT_CACHE)
+    for widget_type, widget in iter_widgets(gui_widgets(config)):
+        if widget_type != CONF_LABEL:
+            continue
+        if text_cache is None:
+            if widget.get(CONF_CACHE):
+                raise cv.Invalid(
+                    f"Label {widget[CONF_ID]} sets {CONF_CACHE}, "
+                    f"which requires {CONF_TEXT_CACHE}"
+                )
+        else:
+            widget.setdefault(CONF_CACHE, text_cache[CONF_ALL_LABELS])
+    return config
+
+
 # Top-level schema from lvgl component has essentially the same structure
 # as esphome-gui's. Different names are used, but idea remains.
 CONFIG_SCHEMA = cv.COMPONENT_SCHEMA.extend(OBJ_SCHEMA).extend(
@@ -683,31 +1104,442 @@ CONFIG_SCHEMA = cv.COMPONENT_SCHEMA.extend(OBJ_SCHEMA).extend(
         cv.Optional(CONF_BYTE_ORDER, default="big_endian"): cv.one_of(
             "big_endian", "little_endian"
         ),
-        # Temporarily disabling style definitions until there's a proper
-        # class in place to wrap all lvgl's properties in a single object.
-        # cv.Optional(CONF_STYLE_DEFINITIONS): cv.ensure_list(
-        #     cv.Schema({cv.Required(CONF_ID): cv.declare_id(lv_style_t)})
-        #     .extend(PROP_SCHEMA)
-        #     .extend(STATE_SCHEMA)
-        # ),
-        cv.Required(CONF_WIDGETS): cv.ensure_list(WIDGET_SCHEMA),
+        cv.Optional(CONF_BUFFER_MODE, default="single"): cv.enum(
+            BUFFER_MODES, lower=True
+        ),
+        cv.Optional(CONF_TARGET_FPS, default=30): cv.int_range(1, 100),
+        cv.Optional(CONF_THEME, default="default"): cv.one_of(*THEMES, lower=True),
+        cv.Optional(CONF_DEFAULT_FONT, default="montserrat_36"): lv_font,
+        cv.Optional(CONF_FONTS): cv.ensure_list(FONT_SCHEMA),
+        cv.Optional(CONF_IMAGES): cv.ensure_list(IMAGE_SCHEMA),
+        cv.Optional(CONF_LOG_LEVEL, default="WARN"): cv.one_of(
+            *LOG_LEVELS, upper=True
+        ),
+        cv.Optional(CONF_IDLE_POLICY, default="sleep"): cv.enum(
+            IDLE_POLICIES, lower=True
+        ),
+        cv.Optional(CONF_ROTATION_MODE, default="auto"): cv.enum(
+            ROTATION_MODES, lower=True
+        ),
+        cv.Optional(CONF_ROTARY_ENCODERS): cv.ensure_list(ROTARY_ENCODER_SCHEMA),
+        cv.Optional(CONF_TOUCHSCREENS): cv.ensure_list(TOUCHSCREEN_SCHEMA),
+        cv.Optional(CONF_DIAGNOSTICS): DIAGNOSTICS_SCHEMA,
+        cv.Optional(CONF_TRACE): TRACE_SCHEMA,
+        cv.Optional(CONF_TEXT_CACHE): TEXT_CACHE_SCHEMA,
+        cv.Optional(CONF_MEMORY, default={}): MEMORY_SCHEMA,
+        cv.Optional(CONF_RENDER_TASK): cv.All(
+            cv.Schema(
+                {
+                    cv.Optional(CONF_CORE, default=1): cv.int_range(0, 1),
+                    cv.Optional(CONF_PRIORITY, default=5): cv.int_range(1, 24),
+                    cv.Optional(CONF_STACK_SIZE, default=8192): cv.int_range(
+                        min=2048
+                    ),
+                }
+            ),
+            cv.only_on(["esp32", "host"]),
+        ),
+        cv.Exclusive(CONF_DRAW_BUFFER_LINES, "draw_buffer"): cv.int_range(min=1),
+        cv.Exclusive(CONF_DRAW_BUFFER_PERCENT, "draw_buffer"): cv.All(
+            cv.percentage, cv.Range(min=0.0, min_included=False)
+        ),
+        cv.Optional(CONF_STYLE_DEFINITIONS): cv.ensure_list(
+            cv.Schema({cv.Required(CONF_ID): cv.declare_id(lv_style_t)}).extend(
+                PROP_SCHEMA
+            )
+        ),
+        cv.Exclusive(CONF_WIDGETS, CONF_WIDGETS): cv.ensure_list(WIDGET_SCHEMA),
+        cv.Exclusive(CONF_PAGES, CONF_WIDGETS): cv.ensure_list(PAGE_SCHEMA),
     }
+).add_extra(cv.has_at_least_one_key(CONF_WIDGETS, CONF_PAGES)).add_extra(
+    validate_text_cache
 )
 
-lv_uses = {
-    "USER_DATA",
-    "LOG",
+
+def display_dimensions(display_config):
+    """Logical (rotated) width and height of the display, if known at compile time"""
+    if CONF_DIMENSIONS in display_config:
+        w, h = display_config[CONF_DIMENSIONS]
+    elif CONF_WIDTH in display_config and CONF_HEIGHT in display_config:
+        w, h = display_config[CONF_WIDTH], display_config[CONF_HEIGHT]
+    else:
+        return None
+    if display_config.get(CONF_ROTATION) in (90, 270):
+        return h, w
+    return w, h
+
+
+def color_size(config):
+    """Size of lv_color_t in bytes for the configured color depth"""
+    return max(config[CONF_COLOR_DEPTH] // 8, 1)
+
+
+def report_draw_buffer(config):
+    buffers = 2 if config[CONF_BUFFER_MODE] == "double" else 1
+    fconf = fv.full_config.get()
+    path = fconf.get_path_for_id(config[CONF_DISPLAY_ID])[:-1]
+    display_config = fconf.get_config_for_path(path)
+    dims = display_dimensions(display_config)
+
+    if CONF_DRAW_BUFFER_LINES not in config and CONF_DRAW_BUFFER_PERCENT not in config:
+        if display_config.get(CONF_ROTATION, 0) != 0:
+            _LOGGER.info(
+                "GUI renders into a draw buffer of 1/10 of the screen if the display "
+                "has to be rotated in software, set draw_buffer_lines to change it"
+            )
+        elif dims is not None:
+            _LOGGER.info(
+                "GUI renders directly into the display buffer (%u extra bytes)",
+                (buffers - 1) * dims[0] * dims[1] * color_size(config),
+            )
+        return config
+    if dims is None:
+        _LOGGER.info("GUI draw buffer size will be reported at boot")
+        return config
+
+    width, height = dims
+    lines = config.get(CONF_DRAW_BUFFER_LINES)
+    if lines is None:
+        lines = max(int(height * config[CONF_DRAW_BUFFER_PERCENT]), 1)
+    lines = min(lines, height)
+    _LOGGER.info(
+        "GUI draw buffer: %u x %u lines, %u bytes of RAM",
+        buffers,
+        lines,
+        buffers * lines * width * color_size(config),
+    )
+    return config
+
+
+# Widgets known to LVGL 8.3. Whatever the configuration doesn't use is
+# disabled, LVGL enables most of them by default.
+LV_WIDGETS = [
+    "ARC",
+    "BAR",
+    "BTN",
+    "BTNMATRIX",
+    "CANVAS",
+    "CHECKBOX",
+    "DROPDOWN",
+    "IMG",
+    "LABEL",
+    "LINE",
+    "ROLLER",
+    "SLIDER",
+    "SWITCH",
+    "TEXTAREA",
+    "TABLE",
+    "ANIMIMG",
+    "CALENDAR",
+    "CHART",
+    "COLORWHEEL",
+    "IMGBTN",
+    "KEYBOARD",
+    "LED",
+    "LIST",
+    "MENU",
+    "METER",
+    "MSGBOX",
+    "SPAN",
+    "SPINBOX",
+    "SPINNER",
+    "TABVIEW",
+    "TILEVIEW",
+    "WIN",
+    "FLEX",
+    "GRID",
+]
+
+# Widgets and layouts which other widgets are built from
+LV_WIDGET_DEPENDENCIES = {
+    "ANIMIMG": ["IMG"],
+    "CALENDAR": ["BTNMATRIX"],
+    "DROPDOWN": ["LABEL"],
+    "IMGBTN": ["IMG"],
+    "KEYBOARD": ["BTNMATRIX", "TEXTAREA"],
+    "LIST": ["BTN", "LABEL", "FLEX"],
+    "MENU": ["FLEX"],
+    "MSGBOX": ["BTNMATRIX", "LABEL", "FLEX"],
+    "ROLLER": ["LABEL"],
+    "SLIDER": ["BAR"],
+    "SPINBOX": ["TEXTAREA"],
+    "SPINNER": ["ARC"],
+    "TABVIEW": ["BTNMATRIX", "FLEX"],
+    "TEXTAREA": ["LABEL"],
+    "WIN": ["BTN", "LABEL", "FLEX"],
+}
+
+# Fonts hard-coded by GuiObject implementations
+WIDGET_FONTS = {
+    CONF_CHECKBOX: ["montserrat_18"],
+    CONF_METER: ["montserrat_18"],
+}
+
+# Widgets which can't be drawn without LV_DRAW_COMPLEX: arcs, rounded
+# corners of the default theme, etc.
+COMPLEX_DRAW_WIDGETS = {
+    "ARC",
+    "BAR",
+    "BTN",
+    "CHART",
+    "CHECKBOX",
+    "METER",
+    "SLIDER",
+    "SWITCH",
+}
+
+# Style properties needing LV_DRAW_COMPLEX, unless set to the value which
+# draws nothing.
+COMPLEX_DRAW_PROPS = {
+    "arc_width": 0,
+    "bg_grad_dir": "LV_GRAD_DIR_NONE",
+    "clip_corner": "false",
+    "line_rounded": "false",
+    "radius": 0,
+    "shadow_width": 0,
+    "transform_angle": 0,
+    "transform_zoom": 256,
 }
 
 
+def gui_widgets(config):
+    """Widgets of the gui, on all of its pages"""
+    if CONF_PAGES in config:
+        return [widget for page in config[CONF_PAGES] for widget in page[CONF_WIDGETS]]
+    return config[CONF_WIDGETS]
+
+
+def iter_widgets(widgets):
+    """All widgets of a widget list as (type, config), including nested ones"""
+    for widget in widgets:
+        for widget_type, widget_data in widget.items():
+            yield widget_type, widget_data
+            yield from iter_widgets(widget_data.get(CONF_WIDGETS, []))
+
+
+def iter_style_props(config, definitions=None):
+    """Style properties set on an object, its parts and states, including
+    those of the style definitions it refers to if given"""
+    for key, value in config.items():
+        if key == CONF_WIDGETS:
+            continue
+        if key == CONF_STYLES and definitions is not None:
+            for style_id in value:
+                yield from iter_style_props(definitions[style_id.id])
+        elif isinstance(value, dict):
+            yield from iter_style_props(value, definitions)
+        elif key in STYLE_PROPS:
+            yield key, value
+
+
+def widget_glyphs(config):
+    """Characters a widget may show, as far as they are known at compile time"""
+    glyphs = set(config.get(CONF_TEXT, "")) | set(config.get(CONF_GLYPHS, ""))
+    if CONF_SENSOR in config:
+        # Literal text of the format, the digits and "nan" for unknown states
+        glyphs.update(
+            FORMAT_CONVERSION.sub(
+                lambda m: "%" if m.group(1) == "%" else "", config[CONF_FORMAT]
+            )
+        )
+        glyphs.update("0123456789.-na")
+    return glyphs
+
+
+def analyze_features(config):
+    """Work out which LVGL widgets, fonts and draw features the configuration
+    actually uses. Everything else is left out of the build."""
+    widgets = set()
+    fonts = set()
+    # Characters to include in each generated font, by font ID
+    glyphs = {font_conf[CONF_ID].id: set() for font_conf in config.get(CONF_FONTS, [])}
+    complex_draw = False
+    definitions = {
+        style_conf[CONF_ID].id: style_conf
+        for style_conf in config.get(CONF_STYLE_DEFINITIONS, [])
+    }
+
+    def use_font(value, chars):
+        if isinstance(value, core.ID):
+            glyphs[value.id].update(chars)
+        else:
+            fonts.add(value[len("&lv_font_") :])
+
+    use_font(config[CONF_DEFAULT_FONT], set())
+    objects = [config] + list(definitions.values()) + config.get(CONF_PAGES, [])
+    for obj in objects + list(iter_widgets(gui_widgets(config))):
+        if isinstance(obj, tuple):
+            widget_type, obj = obj
+            widgets.add(widget_type.upper())
+            widget_fonts = WIDGET_FONTS.get(widget_type, [])
+            fonts.update(widget_fonts)
+            text_fonts = [
+                value
+                for prop, value in iter_style_props(obj, definitions)
+                if prop == "text_font"
+            ]
+            if not text_fonts and not widget_fonts:
+                text_fonts = [config[CONF_DEFAULT_FONT]]
+            for value in text_fonts:
+                use_font(value, widget_glyphs(obj))
+        for prop, value in iter_style_props(obj):
+            if prop == "text_font":
+                use_font(value, set())
+            elif prop in COMPLEX_DRAW_PROPS and value != COMPLEX_DRAW_PROPS[prop]:
+                complex_draw = True
+
+    pending = list(widgets)
+    while pending:
+        for dep in LV_WIDGET_DEPENDENCIES.get(pending.pop(), []):
+            if dep not in widgets:
+                widgets.add(dep)
+                pending.append(dep)
+
+    return {
+        "widgets": widgets,
+        "fonts": fonts,
+        "glyphs": glyphs,
+        "complex_draw": complex_draw or bool(widgets & COMPLEX_DRAW_WIDGETS),
+    }
+
+
+def lv_conf_flags(config, features):
+    """lv_conf.h settings derived from the features in use"""
+    flags = {}
+    for widget in LV_WIDGETS:
+        flags[f"LV_USE_{widget}"] = int(widget in features["widgets"])
+    # Selecting text is only possible in text areas.
+    flags["LV_LABEL_TEXT_SELECTION"] = int("TEXTAREA" in features["widgets"])
+    flags["LV_LABEL_LONG_TXT_HINT"] = 0
+
+    for font in LV_FONTS:
+        flags[f"LV_FONT_{font.upper()}"] = int(font in features["fonts"])
+    default_font = config[CONF_DEFAULT_FONT]
+    if isinstance(default_font, core.ID):
+        symbol = font_symbol(default_font.id)
+        flags["LV_FONT_CUSTOM_DECLARE"] = f"\\'LV_FONT_DECLARE({symbol})\\'"
+        flags["LV_FONT_DEFAULT"] = f"\\'\\&{symbol}\\'"
+    else:
+        flags["LV_FONT_DEFAULT"] = f"\\'\\{default_font}\\'"
+    flags["LV_USE_FONT_SUBPX"] = int(
+        any(font.endswith("_subpx") for font in features["fonts"])
+    )
+    flags["LV_USE_FONT_COMPRESSED"] = int(
+        any(font.endswith("_compressed") for font in features["fonts"])
+    )
+
+    flags["LV_DRAW_COMPLEX"] = int(features["complex_draw"])
+    for theme in THEMES[:-1]:
+        flags[f"LV_USE_THEME_{theme.upper()}"] = int(config[CONF_THEME] == theme)
+    flags["LV_USE_THEME_MONO"] = 0
+
+    memory = config[CONF_MEMORY]
+    include = "\\'<esphome/components/gui/memory.h>\\'"
+    if memory[CONF_ALLOCATOR] == ALLOCATOR_HEAP:
+        flags["LV_MEM_CUSTOM"] = 1
+        flags["LV_MEM_CUSTOM_INCLUDE"] = include
+        flags["LV_MEM_CUSTOM_ALLOC"] = "gui_mem_alloc"
+        flags["LV_MEM_CUSTOM_FREE"] = "gui_mem_free"
+        flags["LV_MEM_CUSTOM_REALLOC"] = "gui_mem_realloc"
+    else:
+        flags["LV_MEM_CUSTOM"] = 0
+        flags["LV_MEM_SIZE"] = memory[CONF_POOL_SIZE]
+        if memory[CONF_POOL_IN_PSRAM]:
+            flags["LV_MEM_POOL_INCLUDE"] = include
+            flags["LV_MEM_POOL_ALLOC"] = "gui_mem_pool_alloc"
+
+    # LVGL's own overlay, tinting every redrawn area in a different color.
+    flags["LV_USE_REFR_DEBUG"] = int(
+        config.get(CONF_TRACE, {}).get(CONF_OVERLAY, False)
+    )
+
+    if config[CONF_LOG_LEVEL] == "NONE":
+        flags["LV_USE_LOG"] = 0
+    else:
+        flags["LV_USE_LOG"] = 1
+        flags["LV_LOG_LEVEL"] = f"LV_LOG_LEVEL_{config[CONF_LOG_LEVEL]}"
+    return flags
+
+
+def estimate_font_size(font):
+    """Rough size of a built-in font's glyph data in bytes: ASCII and symbols
+    at 4 bits per pixel, glyphs about half as wide as they are tall."""
+    size = int(re.search(r"_(\d+)", font).group(1))
+    glyphs, bpp = 160, 4
+    if font.startswith("unscii"):
+        bpp = 1
+    elif "cjk" in font:
+        glyphs = 1100
+    elif "persian_hebrew" in font:
+        glyphs = 450
+    return glyphs * size * size * bpp // 16
+
+
+def report_features(config):
+    features = analyze_features(config)
+    widgets = sorted(features["widgets"])
+    fonts = sorted(features["fonts"])
+    _LOGGER.info(
+        "GUI uses %u of %u LVGL widgets and layouts: %s",
+        len(widgets),
+        len(LV_WIDGETS),
+        ", ".join(widgets) or "none",
+    )
+    _LOGGER.info(
+        "GUI fonts: %s (roughly %u kB of glyph data)",
+        ", ".join(fonts),
+        sum(map(estimate_font_size, fonts)) // 1024,
+    )
+    for name, glyphs in sorted(features["glyphs"].items()):
+        _LOGGER.info("GUI font %s: %u glyphs used by widgets", name, len(glyphs))
+    _LOGGER.info(
+        "GUI complex drawing %s, theme: %s, log level: %s",
+        "enabled" if features["complex_draw"] else "disabled",
+        config[CONF_THEME],
+        config[CONF_LOG_LEVEL],
+    )
+    return config
+
+
+FINAL_VALIDATE_SCHEMA = cv.All(report_draw_buffer, report_features)
+
+
 async def build_label(obj, config):
-    lv_uses.add("LABEL")
+    cg.add_define("USE_LABEL")
+    if CONF_MAX_LENGTH in config:
+        # Displayed text plus a staging area of the same size, see GuiLabel.
+        capacity = config[CONF_MAX_LENGTH] + 1
+        buffer = f"{config[CONF_ID].id}__text"
+        cg.add_global(cg.RawStatement(f"static char {buffer}[{2 * capacity}];"))
+        cg.add(obj.set_text_buffer(cg.RawExpression(buffer), capacity))
     if CONF_TEXT in config:
         cg.add(obj.set_text(config[CONF_TEXT]))
+    if CONF_SENSOR in config:
+        cg.add(obj.set_format(config[CONF_FORMAT]))
+        await bind_sensor(obj, config[CONF_SENSOR], config)
+    if config.get(CONF_CACHE):
+        cg.add(obj.set_cache(True))
+
+
+async def bind_sensor(obj, sensor_id, config):
+    sens = await cg.get_variable(sensor_id)
+    cg.add(
+        obj.set_sensor(
+            sens, config[CONF_MIN_UPDATE_INTERVAL], config[CONF_DEADBAND]
+        )
+    )
+
+
+async def build_value(obj, config):
+    """Static initial value, or binding to a sensor"""
+    value = config.get(CONF_VALUE)
+    if isinstance(value, core.ID):
+        await bind_sensor(obj, value, config)
+    elif value is not None:
+        cg.add(obj.set_value(value))
 
 
 async def build_checkbox(obj, config):
-    lv_uses.add("CHECKBOX")
     sw = await cg.get_variable(config[CONF_SWITCH_ID])
     if CONF_TEXT in config:
         cg.add(obj.set_text(config[CONF_TEXT]))
@@ -716,21 +1548,152 @@ async def build_checkbox(obj, config):
 
 
 async def build_meter(obj, config):
-    lv_uses.add("METER")
     cg.add_define("USE_METER")
+    await build_value(obj, config)
+
+
+async def build_bar(obj, config):
+    cg.add_define("USE_BAR")
+    cg.add(obj.set_range(config[CONF_MIN_VALUE], config[CONF_MAX_VALUE]))
+    cg.add(obj.set_mode(cg.RawExpression(config[CONF_MODE])))
+    cg.add(obj.set_animated(cg.RawExpression(config[CONF_ANIMATED])))
+    await build_value(obj, config)
+
+
+async def build_chart(obj, config):
+    cg.add_define("USE_CHART")
+    columns, samples_per_column = chart_columns(config)
+    cg.add(obj.set_range(config[CONF_MIN_VALUE], config[CONF_MAX_VALUE]))
+    cg.add(obj.set_columns(columns, samples_per_column))
+    for index, series in enumerate(config[CONF_SERIES]):
+        buffer = f"{config[CONF_ID].id}__series_{index + 1}"
+        cg.add_global(cg.RawStatement(f"static lv_coord_t {buffer}[{2 * columns}];"))
+        palette = CHART_SERIES_PALETTE[index % len(CHART_SERIES_PALETTE)]
+        color = series.get(CONF_COLOR, f"lv_palette_main(LV_PALETTE_{palette})")
+        sens = await cg.get_variable(series[CONF_SENSOR])
+        cg.add(
+            obj.add_series(sens, cg.RawExpression(color), cg.RawExpression(buffer))
+        )
+
+
+async def build_img(obj, config):
+    cg.add_define("USE_IMG")
+    cg.add(obj.set_src(await cg.get_variable(config[CONF_SRC])))
+    if CONF_DIMENSIONS not in config:
+        size_content = cg.RawExpression("LV_SIZE_CONTENT")
+        cg.add(obj.set_dimensions(size_content, size_content))
 
 
 GUI_OBJECT_BUILDERS = {
     CONF_LABEL: build_label,
     CONF_CHECKBOX: build_checkbox,
     CONF_METER: build_meter,
+    CONF_BAR: build_bar,
+    CONF_IMG: build_img,
+    CONF_CHART: build_chart,
 }
 
 
-async def widget_to_code(widget):
+def style_selectors(config):
+    """Style definitions and properties set on an object, by the LVGL selector
+    (part and state) they apply to"""
+    selectors = {}
+
+    def add(part, state, style_config):
+        selector = f"LV_PART_{part.upper()} | LV_STATE_{state.upper()}"
+        definitions, props = selectors.setdefault(selector, ([], {}))
+        definitions.extend(style_config.get(CONF_STYLES, []))
+        props.update(
+            {key: value for key, value in style_config.items() if key in STYLE_PROPS}
+        )
+
+    def add_part(part, part_config):
+        add(part, CONF_DEFAULT, part_config)
+        for state in STATES:
+            if state in part_config:
+                add(part, state, part_config[state])
+
+    # Whatever isn't nested under a part applies to the main one.
+    add_part(CONF_MAIN, config)
+    for part in PARTS:
+        if part in config:
+            add_part(part, config[part])
+    return selectors
+
+
+def style_value(prop, value):
+    """C++ expression for the validated value of a style property"""
+    if isinstance(value, core.ID):
+        # Generated fonts are static, so styles can refer to them directly.
+        return f"&{font_symbol(value.id)}"
+    if prop == "transform_angle":
+        # In units of 0.1 degree.
+        return int(round(value * 10))
+    return value
+
+
+def style_to_code(name, props):
+    """Declare a statically allocated style. Returns the statements filling it
+    in, which have to wait until LVGL is initialized."""
+    cg.add_global(cg.RawStatement(f"static lv_style_t {name};"))
+    return [f"lv_style_init(&{name});"] + [
+        f"lv_style_set_{prop}(&{name}, {style_value(prop, value)});"
+        for prop, value in sorted(props.items())
+    ]
+
+
+def style_refs(config, shared, init):
+    """Styles of an object (or a screen) as GuiStyleRef initializers. Objects
+    with the same properties for a part and state share a single lv_style_t,
+    kept in shared by properties; the statements filling in new styles go to
+    init."""
+    refs = []
+    for selector, (definitions, props) in style_selectors(config).items():
+        # Styles added later take precedence, so properties set on the object
+        # itself override the style definitions it refers to.
+        refs.extend(f"{{&{style_id.id}__style, {selector}}}" for style_id in definitions)
+        if not props:
+            continue
+        key = tuple(sorted((prop, str(value)) for prop, value in props.items()))
+        if key not in shared:
+            shared[key] = f"gui_style_{len(shared) + 1}"
+            init.extend(style_to_code(shared[key], props))
+        refs.append(f"{{&{shared[key]}, {selector}}}")
+    return refs
+
+
+def styles_to_code(var, name, refs):
+    """Attach styles from style_refs() to an object or page"""
+    if not refs:
+        return
+    table = f"{name}__styles"
+    cg.add_global(
+        cg.RawStatement(
+            f"static const {GuiStyleRef} {table}[] = {{{', '.join(refs)}}};"
+        )
+    )
+    cg.add(var.set_styles(cg.RawExpression(table), len(refs)))
+
+
+def has_periodic_work(config):
+    """Whether a widget has to be run from the GuiComponent's loop()"""
+    return CONF_SENSOR in config or isinstance(config.get(CONF_VALUE), core.ID)
+
+
+async def widget_to_code(gui, page, widget, shared_styles, styles_init, trace=False):
+    """Returns the statically allocated object of the widget, and whether it
+    has periodic work"""
     for widget_type, widget_data in widget.items():
-        obj = cg.new_Pvariable(widget_data[CONF_ID])
-        await cg.register_component(obj, widget_data)
+        widget_id = widget_data[CONF_ID]
+        storage = f"{widget_id.id}__widget"
+        cg.add_global(cg.RawStatement(f"static {widget_id.type} {storage};"))
+        obj = cg.Pvariable(widget_id, cg.RawExpression(f"&{storage}"))
+        cg.add(obj.set_gui(gui))
+        if trace:
+            cg.add(obj.set_trace_name(widget_data[CONF_ID].id))
+        cg.add(obj.set_page(page))
+        refs = style_refs(widget_data, shared_styles, styles_init)
+        styles_to_code(obj, widget_id.id, refs)
 
         w, h = widget_data.get(CONF_DIMENSIONS, (0, 0))
         cg.add(obj.set_dimensions(w, h))
@@ -740,15 +1703,155 @@ async def widget_to_code(widget):
 
         if widget_type in GUI_OBJECT_BUILDERS.keys():
             await GUI_OBJECT_BUILDERS[widget_type](obj, widget_data)
+        return storage, has_periodic_work(widget_data)
+
+
+def widget_table_to_code(name, storages):
+    """Static table of widgets, returned as (table, count)"""
+    entries = ", ".join(f"&{storage}" for storage in storages)
+    cg.add_global(
+        cg.RawStatement(f"static {GuiObject} *const {name}[] = {{{entries}}};")
+    )
+    return cg.RawExpression(name), len(storages)
+
+
+def font_source_path(config):
+    """Path of the TrueType file described by a font's `file` option"""
+    if config[font.CONF_TYPE] == font.TYPE_GFONTS:
+        return font._compute_gfonts_local_path(config)
+    return core.CORE.relative_config_path(config[font.CONF_PATH])
+
+
+async def font_to_code(config, glyphs):
+    size = config.get(CONF_SIZE)
+    if CONF_FONT_ID in config:
+        # Rasterize the file behind an existing ESPHome font.
+        source = next(
+            font_conf
+            for font_conf in core.CORE.config[font.DOMAIN]
+            if font_conf[CONF_ID].id == config[CONF_FONT_ID].id
+        )
+        if source[CONF_FILE][font.CONF_TYPE] == font.TYPE_LOCAL_BITMAP:
+            raise core.EsphomeError(
+                f"{config[CONF_ID]}: only TrueType fonts can be converted for the GUI"
+            )
+        path = font_source_path(source[CONF_FILE])
+        if size is None:
+            size = source[CONF_SIZE]
+    else:
+        path = font_source_path(config[CONF_FILE])
+    if size is None:
+        size = 20
+
+    codepoints = sorted(set(map(ord, config[CONF_GLYPHS])) | set(map(ord, glyphs)))
+    if not codepoints:
+        _LOGGER.warning(
+            "No text uses font %s and it declares no glyphs, including printable ASCII",
+            config[CONF_ID],
+        )
+        codepoints = list(range(0x20, 0x7F))
+
+    name = config[CONF_ID].id
+    generate_font(name, path, size, config[CONF_BPP], codepoints)
+    symbol = font_symbol(name)
+    cg.add_global(cg.RawStatement(f'extern "C" const lv_font_t {symbol};'))
+    cg.Pvariable(
+        config[CONF_ID], cg.RawExpression(f"&{symbol}"), lv_font_t.operator("const")
+    )
+
+
+async def image_to_code(config, gui_config):
+    resize = config.get(CONF_RESIZE)
+    if CONF_IMAGE_ID in config:
+        # Convert the file behind an existing ESPHome image.
+        source = next(
+            image_conf
+            for image_conf in core.CORE.config[image.DOMAIN]
+            if image_conf[CONF_ID].id == config[CONF_IMAGE_ID].id
+        )
+        file = source[CONF_FILE]
+        if file[image.CONF_SOURCE] != image.SOURCE_LOCAL or file[
+            CONF_PATH
+        ].lower().endswith(".svg"):
+            raise core.EsphomeError(
+                f"{config[CONF_ID]}: only bitmap images can be converted for the GUI"
+            )
+        path = core.CORE.relative_config_path(file[CONF_PATH])
+        if resize is None:
+            resize = source.get(CONF_RESIZE)
+    else:
+        path = core.CORE.relative_config_path(config[CONF_FILE])
+
+    name = config[CONF_ID].id
+    generate_image(
+        name,
+        path,
+        resize,
+        gui_config[CONF_COLOR_DEPTH],
+        gui_config[CONF_BYTE_ORDER] == "big_endian",
+        config.get(CONF_TRANSPARENCY),
+        config[CONF_COMPRESSION],
+    )
+    if config[CONF_COMPRESSION] == COMPRESSION_RLE:
+        cg.add_define("USE_GUI_IMAGE_RLE")
+    symbol = image_symbol(name)
+    cg.add_global(cg.RawStatement(f'extern "C" const lv_img_dsc_t {symbol};'))
+    cg.Pvariable(
+        config[CONF_ID], cg.RawExpression(f"&{symbol}"), lv_img_dsc_t.operator("const")
+    )
+
+
+async def diagnostics_to_code(gui, config):
+    cg.add_define("USE_GUI_DIAGNOSTICS")
+    var = cg.new_Pvariable(config[CONF_ID])
+    await cg.register_component(var, config)
+    cg.add(var.set_gui(gui))
+    for key in DIAGNOSTIC_SENSORS:
+        if key in config:
+            sens = await sensor.new_sensor(config[key])
+            cg.add(getattr(var, f"set_{key}_sensor")(sens))
+
+
+async def inputs_to_code(gui, config):
+    """Statically allocated input devices, handed to the gui as a table"""
+    cg.add_define("USE_GUI_INPUT")
+    storages = []
+    if CONF_ROTARY_ENCODERS in config:
+        cg.add_define("USE_GUI_ROTARY_ENCODER")
+    if CONF_TOUCHSCREENS in config:
+        cg.add_define("USE_GUI_TOUCHSCREEN")
+    for conf in config.get(CONF_ROTARY_ENCODERS, []):
+        var, storage = input_to_code(gui, conf)
+        cg.add(var.set_sensor(await cg.get_variable(conf[CONF_SENSOR])))
+        if CONF_BINARY_SENSOR in conf:
+            button = await cg.get_variable(conf[CONF_BINARY_SENSOR])
+            cg.add(var.set_button(button))
+        storages.append(storage)
+    for conf in config.get(CONF_TOUCHSCREENS, []):
+        var, storage = input_to_code(gui, conf)
+        screen = await cg.get_variable(conf[CONF_TOUCHSCREEN_ID])
+        cg.add(var.set_touchscreen(screen))
+        storages.append(storage)
+    table = f"{config[CONF_ID].id}__inputs"
+    entries = ", ".join(f"&{storage}" for storage in storages)
+    cg.add_global(
+        cg.RawStatement(f"static {GuiInput} *const {table}[] = {{{entries}}};")
+    )
+    cg.add(gui.set_inputs(cg.RawExpression(table), len(storages)))
+
+
+def input_to_code(gui, config):
+    input_id = config[CONF_ID]
+    storage = f"{input_id.id}__input"
+    cg.add_global(cg.RawStatement(f"static {input_id.type} {storage};"))
+    var = cg.Pvariable(input_id, cg.RawExpression(f"&{storage}"))
+    cg.add(var.set_gui(gui))
+    return var, storage
 
 
 async def to_code(config):
     cg.add_library("lvgl/lvgl", "^8.3.9")
     core.CORE.add_build_flag("-DLV_CONF_SKIP=1")
-    core.CORE.add_build_flag("-DLV_USE_USER_DATA=1")
-    core.CORE.add_build_flag("-DLV_USE_LOG=1")
-    # FIXME: Sync with ESPHome's log level
-    core.CORE.add_build_flag("-DLV_LOG_LEVEL=LV_LOG_LEVEL_INFO")
     core.CORE.add_build_flag("-DLV_BUILD_EXAMPLES=0")
     core.CORE.add_build_flag("-DLV_USE_DEMO_WIDGETS=0")
     core.CORE.add_build_flag("-DLV_USE_DEMO_KEYPAD_AND_ENCODER=0")
@@ -756,7 +1859,6 @@ async def to_code(config):
     core.CORE.add_build_flag("-DLV_USE_DEMO_STRESS=0")
     core.CORE.add_build_flag("-DLV_USE_DEMO_MUSIC=0")
     core.CORE.add_build_flag("-DLV_TICK_CUSTOM=0")
-    core.CORE.add_build_flag("-DLV_MEM_CUSTOM=0")
     core.CORE.add_build_flag("-DLV_DISP_DEF_REFR_PERIOD=30")
     core.CORE.add_build_flag("-DLV_INDEV_DEF_READ_PERIOD=30")
     core.CORE.add_build_flag("-DLV_DPI_DEF=130")
@@ -766,21 +1868,11 @@ async def to_code(config):
             core.CORE.add_build_flag("-DLV_COLOR_16_SWAP=1")
         else:
             core.CORE.add_build_flag("-DLV_COLOR_16_SWAP=0")
-    core.CORE.add_build_flag("-DLV_USE_THEME_DEFAULT=1")
-    core.CORE.add_build_flag("-DLV_USE_THEME_BASIC=0")
-    core.CORE.add_build_flag("-DLV_USE_THEME_MONO=0")
-
-    for use in lv_uses:
-        core.CORE.add_build_flag(f"-DLV_USE_{use}=1")
-
-    # FIXME: Needs proper integration with ESPHome's font component
-    core.CORE.add_build_flag("-DLV_FONT_MONTSERRAT_12=1")
-    core.CORE.add_build_flag("-DLV_FONT_MONTSERRAT_18=1")
-    core.CORE.add_build_flag("-DLV_FONT_MONTSERRAT_36=1")
-    core.CORE.add_build_flag("-DLV_FONT_MONTSERRAT_48=1")
-    core.CORE.add_build_flag("-DLV_USE_FONT_SUBPX=1")
-    core.CORE.add_build_flag("-DLV_FONT_SUBPX_BGR=0")
-    core.CORE.add_build_flag("-DLV_FONT_DEFAULT=\\'\\&lv_font_montserrat_36\\'")
+
+    # Only what the widget tree needs is compiled in, see analyze_features().
+    features = analyze_features(config)
+    for name, value in lv_conf_flags(config, features).items():
+        core.CORE.add_build_flag(f"-D{name}={value}")
 
     # Disable GPU accelerators for other architectures
     core.CORE.add_build_flag("-DLV_USE_GPU_ARM2D=0")
@@ -792,13 +1884,196 @@ async def to_code(config):
     core.CORE.add_build_flag("-DLV_USE_GPU_SDL=0")
     core.CORE.add_build_flag("-Isrc")
 
+    for font_conf in config.get(CONF_FONTS, []):
+        await font_to_code(font_conf, features["glyphs"][font_conf[CONF_ID].id])
+    remove_stale_fonts(features["glyphs"].keys())
+    for image_conf in config.get(CONF_IMAGES, []):
+        await image_to_code(image_conf, config)
+    remove_stale_images([conf[CONF_ID].id for conf in config.get(CONF_IMAGES, [])])
+
     gui = cg.new_Pvariable(config[CONF_ID])
     await cg.register_component(gui, config)
 
     disp = await cg.get_variable(config[CONF_DISPLAY_ID])
 
     cg.add(gui.set_display(disp))
+    cg.add(gui.set_buffer_mode(config[CONF_BUFFER_MODE]))
+    cg.add(gui.set_target_fps(config[CONF_TARGET_FPS]))
+    cg.add(gui.set_idle_policy(config[CONF_IDLE_POLICY]))
+    cg.add(gui.set_rotation_mode(config[CONF_ROTATION_MODE]))
+    if CONF_RENDER_TASK in config:
+        task = config[CONF_RENDER_TASK]
+        cg.add_define("USE_GUI_RENDER_TASK")
+        cg.add(
+            gui.set_render_task(
+                task[CONF_CORE], task[CONF_PRIORITY], task[CONF_STACK_SIZE]
+            )
+        )
+    if CONF_DRAW_BUFFER_LINES in config:
+        cg.add(gui.set_draw_buffer_lines(config[CONF_DRAW_BUFFER_LINES]))
+    if CONF_DRAW_BUFFER_PERCENT in config:
+        cg.add(gui.set_draw_buffer_percent(config[CONF_DRAW_BUFFER_PERCENT]))
+
+    if CONF_DIAGNOSTICS in config:
+        await diagnostics_to_code(gui, config[CONF_DIAGNOSTICS])
+    if CONF_ROTARY_ENCODERS in config or CONF_TOUCHSCREENS in config:
+        await inputs_to_code(gui, config)
+
+    memory = config[CONF_MEMORY]
+    if memory[CONF_ALLOCATOR] == ALLOCATOR_HEAP:
+        cg.add_define("USE_GUI_MEM_HEAP")
+        cg.add_define("GUI_MEM_INTERNAL_THRESHOLD", memory[CONF_INTERNAL_THRESHOLD])
+    elif memory[CONF_POOL_IN_PSRAM]:
+        cg.add_define("USE_GUI_MEM_POOL_PSRAM")
+
+    if CONF_TRACE in config:
+        cg.add_define("USE_GUI_TRACE")
+        trace = config[CONF_TRACE]
+        cg.add(gui.set_trace(trace[CONF_SIZE], trace.get(CONF_OUTPUT, "")))
+
+    if CONF_TEXT_CACHE in config:
+        cg.add_define("USE_GUI_TEXT_CACHE")
+        text_cache = config[CONF_TEXT_CACHE]
+        cg.add(
+            gui.set_text_cache(
+                text_cache[CONF_SIZE], text_cache.get(CONF_IN_PSRAM, False)
+            )
+        )
+
+    # Named styles are kept apart from the shared ones, so they can be
+    # changed from lambdas.
+    styles_init = []
+    for style_conf in config.get(CONF_STYLE_DEFINITIONS, []):
+        storage = f"{style_conf[CONF_ID].id}__style"
+        props = {key: value for key, value in style_conf.items() if key in STYLE_PROPS}
+        styles_init.extend(style_to_code(storage, props))
+        cg.Pvariable(style_conf[CONF_ID], cg.RawExpression(f"&{storage}"))
+    shared_styles = {}
+    # Screens are black unless configured otherwise, and styled by the gui's
+    # own properties, which those of a page override.
+    screen = {"bg_color": "lv_color_hex(0x000000)", **config}
+    screen_refs = style_refs(screen, shared_styles, styles_init)
+
+    gui_id = config[CONF_ID].id
+    # Without pages, the widgets form a single one.
+    pages_conf = config.get(CONF_PAGES, [{CONF_WIDGETS: config.get(CONF_WIDGETS)}])
+    pages = []
+    loop_widgets = []
+    for index, page_conf in enumerate(pages_conf):
+        storage = f"{gui_id}__page_{index + 1}"
+        cg.add_global(cg.RawStatement(f"static {GuiPage} {storage};"))
+        if CONF_ID in page_conf:
+            page = cg.Pvariable(page_conf[CONF_ID], cg.RawExpression(f"&{storage}"))
+            cg.add(page.set_policy(page_conf[CONF_POLICY]))
+        else:
+            page = cg.MockObj(storage)
+        cg.add(page.set_gui(gui))
+        refs = style_refs(page_conf, shared_styles, styles_init)
+        styles_to_code(page, storage, screen_refs + refs)
+
+        # Widgets aren't components of their own: their page sets them up,
+        # and the GuiComponent only runs those with periodic work from its
+        # loop().
+        widgets = []
+        for widget in page_conf[CONF_WIDGETS]:
+            widget_storage, periodic = await widget_to_code(
+                gui,
+                cg.RawExpression(f"&{storage}"),
+                widget,
+                shared_styles,
+                styles_init,
+                CONF_TRACE in config,
+            )
+            widgets.append(widget_storage)
+            if periodic:
+                loop_widgets.append(widget_storage)
+        if widgets:
+            cg.add(
+                page.set_widgets(
+                    *widget_table_to_code(f"{storage}__widgets", widgets)
+                )
+            )
+        pages.append(f"&{storage}")
+    table = f"{gui_id}__pages"
+    cg.add_global(
+        cg.RawStatement(
+            f"static {GuiPage} *const {table}[] = {{{', '.join(pages)}}};"
+        )
+    )
+    cg.add(gui.set_pages(cg.RawExpression(table), len(pages)))
+    if loop_widgets:
+        cg.add(
+            gui.set_loop_widgets(
+                *widget_table_to_code(f"{gui_id}__loop_widgets", loop_widgets)
+            )
+        )
+    cg.add(
+        gui.set_styles_init(
+            LambdaExpression(["\n".join(styles_init)], [], capture="")
+        )
+    )
+
 
-    if CONF_WIDGETS in config:
-        for widget in config[CONF_WIDGETS]:
-            await widget_to_code(widget)
+@automation.register_action(
+    "gui.dump_trace",
+    DumpTraceAction,
+    maybe_simple_id(
+        {
+            cv.GenerateID(): cv.use_id(GuiComponent),
+        }
+    ),
+)
+async def gui_dump_trace_to_code(config, action_id, template_arg, args):
+    var = cg.new_Pvariable(action_id, template_arg)
+    await cg.register_parented(var, config[CONF_ID])
+    return var
+
+
+@automation.register_action(
+    "gui.page.show",
+    ShowPageAction,
+    maybe_simple_id(
+        {
+            cv.Required(CONF_ID): cv.templatable(cv.use_id(GuiPage)),
+        }
+    ),
+)
+async def gui_page_show_to_code(config, action_id, template_arg, args):
+    var = cg.new_Pvariable(action_id, template_arg)
+    if isinstance(config[CONF_ID], core.Lambda):
+        template_ = await cg.templatable(config[CONF_ID], args, GuiPagePtr)
+        cg.add(var.set_page(template_))
+    else:
+        page = await cg.get_variable(config[CONF_ID])
+        cg.add(var.set_page(page))
+    return var
+
+
+@automation.register_action(
+    "gui.page.show_next",
+    ShowNextPageAction,
+    maybe_simple_id(
+        {
+            cv.GenerateID(): cv.use_id(GuiComponent),
+        }
+    ),
+)
+async def gui_page_show_next_to_code(config, action_id, template_arg, args):
+    var = cg.new_Pvariable(action_id, template_arg)
+    await cg.register_parented(var, config[CONF_ID])
+    return var
+
+
+@automation.register_action(
+    "gui.page.show_previous",
+    ShowPreviousPageAction,
+    maybe_simple_id(
+        {
+            cv.GenerateID(): cv.use_id(GuiComponent),
+        }
+    ),
+)
+async def gui_page_show_previous_to_code(config, action_id, template_arg, args):
+    var = cg.new_Pvariable(action_id, template_arg)
+    await cg.register_parented(var, config[CONF_ID])
+    return var
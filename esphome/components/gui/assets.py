@@ -0,0 +1,55 @@
+"""C sources generated at build time, such as fonts and images.
+
+Generating them can take a while, so they are cached in the data directory
+under a hash of everything they are generated from, and only copied into the
+build tree on subsequent runs.
+"""
+import hashlib
+from pathlib import Path
+
+from esphome.core import CORE
+from esphome.helpers import copy_file_if_changed
+
+
+def asset_key(path, *params):
+    """Hash of a source file's contents and the parameters of its conversion"""
+    h = hashlib.sha256()
+    h.update(Path(path).read_bytes())
+    h.update(repr(params).encode())
+    return h.hexdigest()[:16]
+
+
+def write_asset(kind, name, key, render):
+    """Copy the C source of an asset into the build tree, calling render() to
+    create it if there's no cached copy for the key yet.
+
+    Returns whether a cached copy was used."""
+    cache_dir = Path(CORE.data_dir) / "gui" / kind
+    cached = cache_dir / f"{name}-{key}.c"
+    hit = cached.is_file()
+    if not hit:
+        source = render()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{name}-*.c"):
+            stale.unlink()
+        cached.write_text(source, encoding="utf-8")
+    copy_file_if_changed(cached, CORE.relative_src_path(f"gui_{kind}", f"{name}.c"))
+    return hit
+
+
+def remove_stale_assets(kind, names):
+    """Delete generated assets which are no longer part of the configuration"""
+    assets_dir = Path(CORE.relative_src_path(f"gui_{kind}"))
+    if not assets_dir.is_dir():
+        return
+    for source in assets_dir.glob("*.c"):
+        if source.stem not in names:
+            source.unlink()
+
+
+def hex_lines(data, indent="    ", per_line=16):
+    """Bytes formatted as the body of a C array initializer"""
+    return "\n".join(
+        indent + ", ".join(f"0x{b:02x}" for b in data[i : i + per_line]) + ","
+        for i in range(0, len(data), per_line)
+    )
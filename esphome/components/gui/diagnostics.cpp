@@ -0,0 +1,103 @@
+#include "diagnostics.h"
+
+#ifdef USE_GUI_DIAGNOSTICS
+
+#include "esphome/core/log.h"
+#include "gui.h"
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.diagnostics";
+
+void GuiDiagnostics::update() {
+  // The previous snapshot hasn't been published yet.
+  if (this->requested_) return;
+  this->requested_ = true;
+  this->gui_->run([this]() {
+    this->snapshot_ = this->gui_->take_stats();
+    this->snapshot_.mem = get_memory_usage();
+    this->ready_.store(true, std::memory_order_release);
+  });
+  // Without a render task, the snapshot has been taken right away.
+  this->loop();
+}
+
+void GuiDiagnostics::loop() {
+  if (!this->requested_ || !this->ready_.load(std::memory_order_acquire))
+    return;
+  this->publish_(this->snapshot_);
+  this->ready_.store(false, std::memory_order_relaxed);
+  this->requested_ = false;
+}
+
+void GuiDiagnostics::publish_(const GuiStats &stats) {
+  if (this->fps_sensor_ != nullptr && stats.elapsed_ms > 0)
+    this->fps_sensor_->publish_state(stats.frames * 1000.0f /
+                                     stats.elapsed_ms);
+  publish_durations_(stats.render_us, this->render_time_min_sensor_,
+                     this->render_time_avg_sensor_,
+                     this->render_time_max_sensor_);
+  publish_durations_(stats.flush_us, this->flush_time_min_sensor_,
+                     this->flush_time_avg_sensor_,
+                     this->flush_time_max_sensor_);
+  if (this->invalidated_area_sensor_ != nullptr) {
+    uint64_t drawable_px = (uint64_t) stats.screen_px * stats.frames;
+    this->invalidated_area_sensor_->publish_state(
+        drawable_px > 0 ? stats.invalidated_px * 100.0f / drawable_px : 0.0f);
+  }
+  if (this->heap_used_sensor_ != nullptr)
+    this->heap_used_sensor_->publish_state(stats.mem.used);
+  if (this->heap_max_used_sensor_ != nullptr)
+    this->heap_max_used_sensor_->publish_state(stats.mem.max_used);
+  if (this->heap_fragmentation_sensor_ != nullptr)
+    this->heap_fragmentation_sensor_->publish_state(stats.mem.frag_pct);
+  if (this->timer_handler_runs_sensor_ != nullptr)
+    this->timer_handler_runs_sensor_->publish_state(stats.timer_handler_runs);
+  publish_durations_(stats.input_latency_us, this->input_latency_min_sensor_,
+                     this->input_latency_avg_sensor_,
+                     this->input_latency_max_sensor_);
+  if (this->text_cache_hits_sensor_ != nullptr)
+    this->text_cache_hits_sensor_->publish_state(stats.text_cache_hits);
+  if (this->text_cache_misses_sensor_ != nullptr)
+    this->text_cache_misses_sensor_->publish_state(stats.text_cache_misses);
+}
+
+void GuiDiagnostics::publish_durations_(const DurationStats &stats,
+                                        sensor::Sensor *min,
+                                        sensor::Sensor *avg,
+                                        sensor::Sensor *max) {
+  // Durations are published in milliseconds, NAN if there weren't any.
+  bool any = stats.count > 0;
+  if (min != nullptr) min->publish_state(any ? stats.min / 1000.0f : NAN);
+  if (avg != nullptr)
+    avg->publish_state(any ? stats.sum / 1000.0f / stats.count : NAN);
+  if (max != nullptr) max->publish_state(any ? stats.max / 1000.0f : NAN);
+}
+
+void GuiDiagnostics::dump_config() {
+  ESP_LOGCONFIG(TAG, "GUI Diagnostics:");
+  LOG_UPDATE_INTERVAL(this);
+  LOG_SENSOR("  ", "FPS", this->fps_sensor_);
+  LOG_SENSOR("  ", "Render Time Min", this->render_time_min_sensor_);
+  LOG_SENSOR("  ", "Render Time Avg", this->render_time_avg_sensor_);
+  LOG_SENSOR("  ", "Render Time Max", this->render_time_max_sensor_);
+  LOG_SENSOR("  ", "Flush Time Min", this->flush_time_min_sensor_);
+  LOG_SENSOR("  ", "Flush Time Avg", this->flush_time_avg_sensor_);
+  LOG_SENSOR("  ", "Flush Time Max", this->flush_time_max_sensor_);
+  LOG_SENSOR("  ", "Invalidated Area", this->invalidated_area_sensor_);
+  LOG_SENSOR("  ", "Heap Used", this->heap_used_sensor_);
+  LOG_SENSOR("  ", "Heap Max Used", this->heap_max_used_sensor_);
+  LOG_SENSOR("  ", "Heap Fragmentation", this->heap_fragmentation_sensor_);
+  LOG_SENSOR("  ", "Timer Handler Runs", this->timer_handler_runs_sensor_);
+  LOG_SENSOR("  ", "Input Latency Min", this->input_latency_min_sensor_);
+  LOG_SENSOR("  ", "Input Latency Avg", this->input_latency_avg_sensor_);
+  LOG_SENSOR("  ", "Input Latency Max", this->input_latency_max_sensor_);
+  LOG_SENSOR("  ", "Text Cache Hits", this->text_cache_hits_sensor_);
+  LOG_SENSOR("  ", "Text Cache Misses", this->text_cache_misses_sensor_);
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,152 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_DIAGNOSTICS
+
+#include <atomic>
+#include <cstdint>
+
+#include "esphome/components/sensor/sensor.h"
+#include "esphome/core/component.h"
+#include "memory.h"
+
+namespace esphome {
+namespace gui {
+
+class GuiComponent;
+
+/// Minimum, maximum and mean of a series of durations in microseconds.
+struct DurationStats {
+  uint32_t min{UINT32_MAX};
+  uint32_t max{0};
+  uint64_t sum{0};
+  uint32_t count{0};
+
+  void add(uint32_t value) {
+    if (value < this->min) this->min = value;
+    if (value > this->max) this->max = value;
+    this->sum += value;
+    this->count++;
+  }
+};
+
+/// Rendering statistics collected by GuiComponent since they were last taken.
+struct GuiStats {
+  uint32_t elapsed_ms{0};
+  uint32_t frames{0};
+  DurationStats render_us;
+  DurationStats flush_us;
+  /// Sum of the invalidated areas of all frames, in pixels.
+  uint64_t invalidated_px{0};
+  uint32_t screen_px{0};
+  uint32_t timer_handler_runs{0};
+  /// From the arrival of an input event until the frame showing it was
+  /// flushed.
+  DurationStats input_latency_us;
+  /// Labels drawn from the text cache, and rendered into it.
+  uint32_t text_cache_hits{0};
+  uint32_t text_cache_misses{0};
+  MemoryUsage mem;
+};
+
+/// Publishes the rendering statistics of a GuiComponent to sensors once per
+/// update interval.
+///
+/// Statistics are taken on the thread running LVGL, which may be the render
+/// task, and published from the main loop.
+class GuiDiagnostics : public PollingComponent {
+ public:
+  void update() override;
+  void loop() override;
+  void dump_config() override;
+
+  void set_gui(GuiComponent *gui) { this->gui_ = gui; }
+  void set_fps_sensor(sensor::Sensor *sensor) {
+    this->fps_sensor_ = sensor;
+  }
+  void set_render_time_min_sensor(sensor::Sensor *sensor) {
+    this->render_time_min_sensor_ = sensor;
+  }
+  void set_render_time_avg_sensor(sensor::Sensor *sensor) {
+    this->render_time_avg_sensor_ = sensor;
+  }
+  void set_render_time_max_sensor(sensor::Sensor *sensor) {
+    this->render_time_max_sensor_ = sensor;
+  }
+  void set_flush_time_min_sensor(sensor::Sensor *sensor) {
+    this->flush_time_min_sensor_ = sensor;
+  }
+  void set_flush_time_avg_sensor(sensor::Sensor *sensor) {
+    this->flush_time_avg_sensor_ = sensor;
+  }
+  void set_flush_time_max_sensor(sensor::Sensor *sensor) {
+    this->flush_time_max_sensor_ = sensor;
+  }
+  void set_invalidated_area_sensor(sensor::Sensor *sensor) {
+    this->invalidated_area_sensor_ = sensor;
+  }
+  void set_heap_used_sensor(sensor::Sensor *sensor) {
+    this->heap_used_sensor_ = sensor;
+  }
+  void set_heap_max_used_sensor(sensor::Sensor *sensor) {
+    this->heap_max_used_sensor_ = sensor;
+  }
+  void set_heap_fragmentation_sensor(sensor::Sensor *sensor) {
+    this->heap_fragmentation_sensor_ = sensor;
+  }
+  void set_timer_handler_runs_sensor(sensor::Sensor *sensor) {
+    this->timer_handler_runs_sensor_ = sensor;
+  }
+  void set_input_latency_min_sensor(sensor::Sensor *sensor) {
+    this->input_latency_min_sensor_ = sensor;
+  }
+  void set_input_latency_avg_sensor(sensor::Sensor *sensor) {
+    this->input_latency_avg_sensor_ = sensor;
+  }
+  void set_input_latency_max_sensor(sensor::Sensor *sensor) {
+    this->input_latency_max_sensor_ = sensor;
+  }
+  void set_text_cache_hits_sensor(sensor::Sensor *sensor) {
+    this->text_cache_hits_sensor_ = sensor;
+  }
+  void set_text_cache_misses_sensor(sensor::Sensor *sensor) {
+    this->text_cache_misses_sensor_ = sensor;
+  }
+
+ protected:
+  void publish_(const GuiStats &stats);
+  static void publish_durations_(const DurationStats &stats,
+                                 sensor::Sensor *min, sensor::Sensor *avg,
+                                 sensor::Sensor *max);
+
+  GuiComponent *gui_{nullptr};
+  sensor::Sensor *fps_sensor_{nullptr};
+  sensor::Sensor *render_time_min_sensor_{nullptr};
+  sensor::Sensor *render_time_avg_sensor_{nullptr};
+  sensor::Sensor *render_time_max_sensor_{nullptr};
+  sensor::Sensor *flush_time_min_sensor_{nullptr};
+  sensor::Sensor *flush_time_avg_sensor_{nullptr};
+  sensor::Sensor *flush_time_max_sensor_{nullptr};
+  sensor::Sensor *invalidated_area_sensor_{nullptr};
+  sensor::Sensor *heap_used_sensor_{nullptr};
+  sensor::Sensor *heap_max_used_sensor_{nullptr};
+  sensor::Sensor *heap_fragmentation_sensor_{nullptr};
+  sensor::Sensor *timer_handler_runs_sensor_{nullptr};
+  sensor::Sensor *input_latency_min_sensor_{nullptr};
+  sensor::Sensor *input_latency_avg_sensor_{nullptr};
+  sensor::Sensor *input_latency_max_sensor_{nullptr};
+  sensor::Sensor *text_cache_hits_sensor_{nullptr};
+  sensor::Sensor *text_cache_misses_sensor_{nullptr};
+
+  /// Set on the main loop when statistics were requested, until published.
+  bool requested_{false};
+  /// Set by the LVGL thread once snapshot_ has been filled in.
+  std::atomic<bool> ready_{false};
+  GuiStats snapshot_;
+};
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,186 @@
+"""Conversion of TrueType fonts into LVGL fonts holding only the glyphs in use.
+
+Generated fonts are plain C sources in LVGL's `fmt_txt` format, like the ones
+produced by lv_font_conv. They are cached by a hash of their inputs, so a
+rebuild only rasterizes fonts whose file, size, bpp or glyphs changed.
+"""
+import logging
+from pathlib import Path
+
+from .assets import asset_key, hex_lines, remove_stale_assets, write_asset
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bump whenever the generated source changes, to invalidate cached fonts.
+GENERATOR_VERSION = 1
+
+
+def font_symbol(name):
+    """Name of the lv_font_t generated for the font with the given ID"""
+    return f"gui_font_{name}"
+
+
+def _pack(values, bpp):
+    """Pack pixel values MSB first, rows aren't padded to whole bytes"""
+    data = bytearray()
+    acc = bits = 0
+    for value in values:
+        acc = (acc << bpp) | value
+        bits += bpp
+        if bits == 8:
+            data.append(acc)
+            acc = bits = 0
+    if bits:
+        data.append(acc << (8 - bits))
+    return bytes(data)
+
+
+def _rasterize(path, size, bpp, codepoints):
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.truetype(str(path), size)
+    ascent, descent = font.getmetrics()
+    glyphs = []
+    for codepoint in codepoints:
+        char = chr(codepoint)
+        left, top, right, bottom = font.getbbox(char)
+        width, height = max(right - left, 0), max(bottom - top, 0)
+        bitmap = b""
+        if width > 0 and height > 0:
+            img = Image.new("L", (width, height))
+            ImageDraw.Draw(img).text((-left, -top), char, font=font, fill=255)
+            bitmap = _pack([v >> (8 - bpp) for v in img.getdata()], bpp)
+        glyphs.append(
+            {
+                "codepoint": codepoint,
+                # Advance width is stored in 1/16 pixels, in 12 bits.
+                "adv_w": min(round(font.getlength(char) * 16), 0xFFF),
+                "box_w": width,
+                "box_h": height,
+                "ofs_x": left,
+                # Distance of the bitmap's bottom edge above the baseline
+                "ofs_y": ascent - bottom,
+                "bitmap": bitmap,
+            }
+        )
+    return ascent, descent, glyphs
+
+
+def _cmaps(codepoints):
+    """Split the sorted codepoints into sparse maps, each spanning less than
+    64k code points as offsets are stored in 16 bits."""
+    cmaps = []
+    for glyph_id, codepoint in enumerate(codepoints, start=1):
+        if not cmaps or codepoint - cmaps[-1]["range_start"] > 0xFFFF:
+            cmaps.append(
+                {"range_start": codepoint, "glyph_id_start": glyph_id, "offsets": []}
+            )
+        cmaps[-1]["offsets"].append(codepoint - cmaps[-1]["range_start"])
+    return cmaps
+
+
+def _font_source(name, source, size, bpp, ascent, descent, glyphs):
+    bitmap = bytearray()
+    glyph_dsc = [
+        "    {.bitmap_index = 0, .adv_w = 0, .box_w = 0, .box_h = 0, .ofs_x = 0, .ofs_y = 0} /* id = 0 reserved */,"
+    ]
+    for glyph in glyphs:
+        glyph_dsc.append(
+            f"    {{.bitmap_index = {len(bitmap)}, .adv_w = {glyph['adv_w']}, "
+            f".box_w = {glyph['box_w']}, .box_h = {glyph['box_h']}, "
+            f".ofs_x = {glyph['ofs_x']}, .ofs_y = {glyph['ofs_y']}}} "
+            f"/* U+{glyph['codepoint']:04X} */,"
+        )
+        bitmap += glyph["bitmap"]
+    if not bitmap:
+        bitmap.append(0)
+
+    cmaps = _cmaps([glyph["codepoint"] for glyph in glyphs])
+    lists = []
+    entries = []
+    for index, cmap in enumerate(cmaps):
+        offsets = ", ".join(map(str, cmap["offsets"]))
+        lists.append(f"static const uint16_t unicode_list_{index}[] = {{{offsets}}};")
+        entries.append(
+            f"    {{.range_start = {cmap['range_start']}, "
+            f".range_length = {cmap['offsets'][-1] + 1}, "
+            f".glyph_id_start = {cmap['glyph_id_start']}, "
+            f".unicode_list = unicode_list_{index}, .glyph_id_ofs_list = NULL, "
+            f".list_length = {len(cmap['offsets'])}, "
+            f".type = LV_FONT_FMT_TXT_CMAP_SPARSE_TINY}},"
+        )
+
+    newline = "\n"
+    return f"""/* Generated by the esphome gui component, do not edit.
+ * Source: {source}, size: {size}, bpp: {bpp}, glyphs: {len(glyphs)}
+ */
+#include "lvgl.h"
+
+static LV_ATTRIBUTE_LARGE_CONST const uint8_t glyph_bitmap[] = {{
+{hex_lines(bitmap)}
+}};
+
+static const lv_font_fmt_txt_glyph_dsc_t glyph_dsc[] = {{
+{newline.join(glyph_dsc)}
+}};
+
+{newline.join(lists)}
+
+static const lv_font_fmt_txt_cmap_t cmaps[] = {{
+{newline.join(entries)}
+}};
+
+#if LVGL_VERSION_MAJOR == 8
+static lv_font_fmt_txt_glyph_cache_t cache;
+#endif
+
+static const lv_font_fmt_txt_dsc_t font_dsc = {{
+    .glyph_bitmap = glyph_bitmap,
+    .glyph_dsc = glyph_dsc,
+    .cmaps = cmaps,
+    .kern_dsc = NULL,
+    .kern_scale = 0,
+    .cmap_num = {len(cmaps)},
+    .bpp = {bpp},
+    .kern_classes = 0,
+    .bitmap_format = 0,
+#if LVGL_VERSION_MAJOR == 8
+    .cache = &cache,
+#endif
+}};
+
+const lv_font_t {font_symbol(name)} = {{
+    .get_glyph_dsc = lv_font_get_glyph_dsc_fmt_txt,
+    .get_glyph_bitmap = lv_font_get_bitmap_fmt_txt,
+    .line_height = {ascent + descent},
+    .base_line = {descent},
+    .subpx = LV_FONT_SUBPX_NONE,
+    .underline_position = {-max(descent // 2, 1)},
+    .underline_thickness = {max(size // 16, 1)},
+    .dsc = &font_dsc,
+}};
+"""
+
+
+def generate_font(name, path, size, bpp, codepoints):
+    """Write the C source of a font into the build tree, rasterizing it only
+    if no cached copy for the same inputs exists."""
+
+    def render():
+        ascent, descent, glyphs = _rasterize(path, size, bpp, codepoints)
+        _LOGGER.info(
+            "GUI font %s: %u glyphs, %u bytes of bitmaps",
+            name,
+            len(glyphs),
+            sum(len(glyph["bitmap"]) for glyph in glyphs),
+        )
+        return _font_source(name, Path(path).name, size, bpp, ascent, descent, glyphs)
+
+    key = asset_key(path, GENERATOR_VERSION, size, bpp, codepoints)
+    if write_asset("fonts", name, key, render):
+        _LOGGER.info("GUI font %s: %u glyphs (cached)", name, len(codepoints))
+
+
+def remove_stale_fonts(names):
+    """Delete generated fonts which are no longer part of the configuration"""
+    remove_stale_assets("fonts", names)
@@ -4,6 +4,14 @@ namespace esphome {
 namespace gui {
 
 static const char *const TAG = "gui";
+// Upper bound for how long the loop may skip the LVGL timer handler.
+static const uint32_t IDLE_MAX_SLEEP_MS = 500;
+// Share of the screen height used for the draw buffer when rotating in
+// software without a configured draw buffer.
+static const uint32_t ROTATION_BUFFER_DIVIDER = 10;
+static const uint32_t MEMORY_REPORT_INTERVAL_MS = 10000;
+// Peak LVGL memory usage above which running out becomes a concern.
+static const uint32_t MEMORY_WARN_PERCENT = 90;
 using namespace display;
 
 void GuiComponent::setup() {
@@ -14,38 +22,404 @@ void GuiComponent::setup() {
   ESP_LOGI(TAG, "[init_lv_drv] Memory buffer length %u", len);
 
   lv_init();
+#ifdef USE_GUI_IMAGE_RLE
+  register_rle_image_decoder();
+#endif
+
+  if (this->display_->get_rotation() != DISPLAY_ROTATION_0_DEGREES) {
+    if (this->rotation_mode_ != ROTATION_MODE_SOFTWARE &&
+        this->display_->use_hardware_rotation()) {
+      ESP_LOGD(TAG, "Display is rotated by the panel");
+    } else {
+      if (this->rotation_mode_ == ROTATION_MODE_HARDWARE)
+        ESP_LOGW(TAG, "Display can't rotate by itself, rotating in software");
+      this->software_rotation_ = true;
+    }
+  }
+
+  uint8_t *first = this->display_->get_buffer();
+  uint8_t *second = nullptr;
+  uint32_t lines = this->get_draw_buffer_lines_();
+  if (lines > 0) {
+    // Partial rendering: LVGL draws into small strips which are then written
+    // to the display one at a time.
+    len = lines * this->display_->get_width();
+    first = this->allocate_draw_buffer_(len);
+    if (this->buffer_mode_ == BUFFER_MODE_DOUBLE)
+      second = this->allocate_draw_buffer_(len);
+    if (first == nullptr) {
+      ESP_LOGE(TAG, "Could not allocate draw buffer!");
+      this->mark_failed();
+      return;
+    }
+    ESP_LOGI(TAG, "Draw buffer: %u lines, %u bytes", lines,
+             len * sizeof(lv_color_t) * (second != nullptr ? 2 : 1));
+  } else if (this->buffer_mode_ == BUFFER_MODE_DOUBLE) {
+    second = this->display_->allocate_back_buffer();
+  }
+  if (this->buffer_mode_ == BUFFER_MODE_DOUBLE && second == nullptr) {
+    ESP_LOGW(TAG, "Falling back to single buffer mode");
+    this->buffer_mode_ = BUFFER_MODE_SINGLE;
+  }
 
-  lv_disp_draw_buf_init(&this->draw_buf_, this->display_->get_buffer(), NULL,
-                        len);
+  lv_disp_draw_buf_init(&this->draw_buf_, first, second, len);
   lv_disp_drv_init(&this->disp_drv_);
   this->disp_drv_.hor_res = this->display_->get_width();
   this->disp_drv_.ver_res = this->display_->get_height();
-  this->disp_drv_.direct_mode = true;
+  this->disp_drv_.direct_mode = lines == 0;
   this->disp_drv_.full_refresh = false;  // Will trigger the watchdog if set.
   this->disp_drv_.flush_cb = refresh;
+  if (this->buffer_mode_ == BUFFER_MODE_DOUBLE)
+    this->disp_drv_.wait_cb = wait;
   this->disp_drv_.draw_buf = &this->draw_buf_;
-  this->disp_drv_.sw_rotate = true;
+  // Rotation is done by the panel or while flushing, LVGL renders upright.
+  this->disp_drv_.sw_rotate = false;
   this->disp_drv_.user_data = this;
+#ifdef USE_GUI_DIAGNOSTICS
+  this->disp_drv_.monitor_cb = monitor_cb_;
+#endif
+#ifdef USE_GUI_TRACE
+  if (this->trace_.init(this->trace_size_)) {
+    this->disp_drv_.rounder_cb = rounder_cb_;
+  } else {
+    ESP_LOGW(TAG, "Could not allocate redraw trace buffer");
+  }
+#endif
 
   lv_disp_ = lv_disp_drv_register(&this->disp_drv_);
+#if !LV_USE_THEME_DEFAULT && LV_USE_THEME_BASIC
+  // LVGL only applies the default theme by itself.
+  lv_disp_set_theme(this->lv_disp_, lv_theme_basic_init(this->lv_disp_));
+#endif
+  lv_timer_set_period(this->lv_disp_->refr_timer, 1000 / this->target_fps_);
+#ifdef USE_GUI_DIAGNOSTICS
+  lv_timer_set_cb(this->lv_disp_->refr_timer, refr_timer_cb_);
+  this->stats_since_ = esphome::millis();
+#endif
 
-  lv_obj_set_style_bg_color(lv_scr_act(), lv_color_hex(0x000000), LV_PART_MAIN);
+#ifdef USE_GUI_INPUT
+  lv_group_t *group = nullptr;
+  for (size_t i = 0; i < this->input_count_; i++) {
+    GuiInput *input = this->inputs_[i];
+    input->setup(1000 / this->target_fps_);
+    if (input->get_type() != LV_INDEV_TYPE_ENCODER) continue;
+    // Encoders move the focus through a single group, which objects that
+    // can be focused join as their pages are created.
+    if (group == nullptr) {
+      group = lv_group_create();
+      lv_group_set_default(group);
+    }
+    lv_indev_set_group(input->get_indev(), group);
+  }
+#endif
+#ifdef USE_GUI_TEXT_CACHE
+  if (!this->text_cache_.init(this->text_cache_size_,
+                              this->text_cache_in_psram_))
+    ESP_LOGW(TAG, "Could not allocate text cache");
+#endif
+  if (this->styles_init_ != nullptr) this->styles_init_();
+  for (size_t i = 0; i < this->page_count_; i++) {
+    if (this->pages_[i]->get_policy() == PAGE_POLICY_EAGER)
+      this->pages_[i]->create();
+  }
+  if (this->page_count_ > 0) this->load_page_(this->pages_[0]);
   this->high_freq_.start();
   this->last_loop_ = esphome::millis();
+  this->set_interval("memory", MEMORY_REPORT_INTERVAL_MS, [this]() {
+    this->run([this]() { this->report_memory_(); });
+  });
 }
 
-void GuiComponent::loop() { 
+void GuiComponent::report_memory_() {
+  MemoryUsage usage = get_memory_usage();
+  // Small increments aren't worth a log line each.
+  if (usage.max_used <= this->reported_max_used_ * 17 / 16) return;
+  this->reported_max_used_ = usage.max_used;
+  if (usage.total == 0) {
+    ESP_LOGI(TAG, "LVGL memory peak: %u bytes", (unsigned) usage.max_used);
+    return;
+  }
+  unsigned percent = usage.max_used * 100 / usage.total;
+  if (percent >= MEMORY_WARN_PERCENT) {
+    ESP_LOGW(TAG,
+             "LVGL memory peak: %u of %u bytes (%u%%), close to running out",
+             (unsigned) usage.max_used, (unsigned) usage.total, percent);
+  } else {
+    ESP_LOGI(TAG, "LVGL memory peak: %u of %u bytes (%u%%)",
+             (unsigned) usage.max_used, (unsigned) usage.total, percent);
+  }
+}
+
+uint32_t GuiComponent::get_draw_buffer_lines_() {
+  uint32_t height = this->display_->get_height();
+  uint32_t lines = this->draw_buffer_lines_;
+  if (this->draw_buffer_percent_ > 0.0f)
+    lines = height * this->draw_buffer_percent_;
+  if (this->draw_buffer_lines_ > 0 || this->draw_buffer_percent_ > 0.0f) {
+    lines = std::max(std::min(lines, height), (uint32_t) 1);
+  } else if (this->software_rotation_) {
+    // LVGL would render upright straight into the rotated buffer.
+    lines = std::max(height / ROTATION_BUFFER_DIVIDER, (uint32_t) 1);
+    ESP_LOGW(TAG, "Rotating in software requires a draw buffer, using %u lines",
+             lines);
+  }
+  return lines;
+}
+
+uint8_t *GuiComponent::allocate_draw_buffer_(uint32_t pixels) {
+  ExternalRAMAllocator<lv_color_t> allocator(
+      ExternalRAMAllocator<lv_color_t>::ALLOW_FAILURE);
+  return (uint8_t *)allocator.allocate(pixels);
+}
+
+void GuiComponent::loop() {
+  for (size_t i = 0; i < this->loop_widget_count_; i++)
+    this->loop_widgets_[i]->loop();
+#ifdef USE_GUI_INPUT
+  for (size_t i = 0; i < this->input_count_; i++) this->inputs_[i]->loop();
+#endif
+#ifdef USE_GUI_RENDER_TASK
+  if (this->use_render_task_) {
+    // Started from the first loop() rather than setup(), so that widgets
+    // have been created on the main thread by the time it runs.
+    if (!this->render_task_.is_running()) {
+      this->render_task_.start([this]() { return this->render_task_loop_(); });
+      this->high_freq_.stop();
+    }
+    std::vector<std::function<void()>> commands;
+    this->loop_queue_lock_.lock();
+    commands.swap(this->loop_queue_);
+    this->loop_queue_lock_.unlock();
+    for (auto &command : commands) command();
+    return;
+  }
+#endif
   uint32_t now = esphome::millis();
+  if (this->idle_policy_ == IDLE_POLICY_SLEEP && !this->flush_pending_ &&
+      this->lv_disp_->inv_p == 0 && (int32_t)(this->next_run_ - now) > 0)
+    return;
+
+  uint32_t wait = this->run_lvgl_(now);
+  if (this->idle_policy_ == IDLE_POLICY_BUSY) return;
+
+  // Nothing is invalidated and no LVGL timer is due within the next frame,
+  // so let the rest of ESPHome have the CPU until then. Widget updates
+  // and input wake the loop up again.
+  uint32_t frame_time = 1000 / this->target_fps_;
+  this->next_run_ = now + wait;
+  if (wait > frame_time && !this->flush_pending_ &&
+      this->lv_disp_->inv_p == 0) {
+    this->high_freq_.stop();
+  } else {
+    this->high_freq_.start();
+  }
+}
+
+uint32_t GuiComponent::run_lvgl_(uint32_t now) {
   lv_tick_inc(now - this->last_loop_);
-  lv_timer_handler();
   this->last_loop_ = now;
+  this->check_flush_();
+#ifdef USE_GUI_DIAGNOSTICS
+  this->stats_.timer_handler_runs++;
+#endif
+#ifdef USE_GUI_INPUT
+  for (size_t i = 0; i < this->input_count_; i++) this->inputs_[i]->poll();
+#endif
+  uint32_t wait = lv_timer_handler();
+#ifdef USE_GUI_INPUT
+  // The input didn't change anything on screen, there's no frame to wait for.
+  if (this->input_pending_ && this->lv_disp_->inv_p == 0)
+    this->input_pending_ = false;
+#endif
+  return std::min(wait, IDLE_MAX_SLEEP_MS);
+}
+
+#ifdef USE_GUI_INPUT
+void GuiComponent::input_read(uint32_t time_us) {
+  if (!this->input_pending_) {
+    this->input_pending_ = true;
+    this->input_time_us_ = time_us;
+  }
+  // Draw the result right away rather than at the next refresh period.
+  lv_timer_ready(this->lv_disp_->refr_timer);
+}
+#endif
+
+void GuiComponent::wake() {
+#ifdef USE_GUI_RENDER_TASK
+  if (this->use_render_task_) {
+    this->render_task_.notify();
+    return;
+  }
+#endif
+  this->next_run_ = esphome::millis();
+  this->high_freq_.start();
+}
+
+void GuiComponent::run(std::function<void()> &&command, const char *source) {
+  // Without a display, LVGL has nothing to draw widgets on.
+  if (this->is_failed()) return;
+#ifdef USE_GUI_RENDER_TASK
+  if (this->render_task_.is_running()) {
+    this->render_task_.enqueue(std::move(command), source);
+    return;
+  }
+#endif
+#ifdef USE_GUI_TRACE
+  const char *previous = this->trace_source_;
+  if (source != nullptr) this->trace_source_ = source;
+  command();
+  this->trace_source_ = previous;
+#else
+  command();
+#endif
+}
+
+void GuiComponent::run_in_loop(std::function<void()> &&command) {
+#ifdef USE_GUI_RENDER_TASK
+  if (this->render_task_.is_running()) {
+    this->loop_queue_lock_.lock();
+    this->loop_queue_.push_back(std::move(command));
+    this->loop_queue_lock_.unlock();
+    return;
+  }
+#endif
+  command();
+}
+
+void GuiComponent::show_page(GuiPage *page) {
+  this->run([this, page]() { this->load_page_(page); });
+}
+
+void GuiComponent::show_next_page() {
+  this->run([this]() {
+    if (this->page_count_ == 0) return;
+    size_t index = (this->active_page_index_() + 1) % this->page_count_;
+    this->load_page_(this->pages_[index]);
+  });
+}
+
+void GuiComponent::show_previous_page() {
+  this->run([this]() {
+    if (this->page_count_ == 0) return;
+    size_t index = this->active_page_index_() + this->page_count_ - 1;
+    this->load_page_(this->pages_[index % this->page_count_]);
+  });
+}
+
+void GuiComponent::load_page_(GuiPage *page) {
+  if (page == this->active_page_) return;
+  GuiPage *previous = this->active_page_;
+  page->create();
+  // At boot, the screen LVGL starts with is deleted as well.
+  bool delete_previous = previous == nullptr ||
+                         previous->get_policy() == PAGE_POLICY_DESTROY;
+  if (previous != nullptr && delete_previous) previous->release();
+  lv_scr_load_anim(page->get_screen(), LV_SCR_LOAD_ANIM_NONE, 0, 0,
+                   delete_previous);
+  this->active_page_ = page;
 }
 
+size_t GuiComponent::active_page_index_() {
+  for (size_t i = 0; i < this->page_count_; i++) {
+    if (this->pages_[i] == this->active_page_) return i;
+  }
+  return 0;
+}
+
+#ifdef USE_GUI_RENDER_TASK
+void GuiComponent::set_render_task(int core, uint32_t priority,
+                                   uint32_t stack_size) {
+  this->use_render_task_ = true;
+  this->render_task_.set_core(core);
+  this->render_task_.set_priority(priority);
+  this->render_task_.set_stack_size(stack_size);
+}
+
+uint32_t GuiComponent::render_task_loop_() {
+  uint32_t wait = this->run_lvgl_(esphome::millis());
+  if (this->idle_policy_ == IDLE_POLICY_BUSY || this->flush_pending_ ||
+      this->lv_disp_->inv_p != 0)
+    return 1;
+  return wait;
+}
+#endif
+
+#ifdef USE_GUI_TRACE
+void GuiComponent::dump_trace() {
+  this->run([this]() { this->trace_.dump(); });
+}
+
+void GuiComponent::rounder_cb_(lv_disp_drv_t *disp_drv, lv_area_t *area) {
+  GuiComponent *gui = (GuiComponent *)(disp_drv->user_data);
+  // LVGL also rounds the areas it's about to render, only invalidations are
+  // of interest. The area itself is left as it is.
+  if (gui->lv_disp_ == nullptr || gui->lv_disp_->rendering_in_progress)
+    return;
+  const char *source = gui->trace_source_;
+#ifdef USE_GUI_RENDER_TASK
+  // Commands queued for the render task carry their source along.
+  if (source == nullptr && gui->render_task_.is_running())
+    source = gui->render_task_.get_source();
+#endif
+  gui->trace_.add(TRACE_EVENT_INVALIDATE, area, source, gui->frame_count_,
+                  micros());
+}
+#endif
+
 void GuiComponent::dump_config() {
+  if (this->lv_disp_ == nullptr) {
+    ESP_LOGCONFIG(TAG, "Setup failed, could not allocate draw buffer");
+    return;
+  }
   auto drv = this->lv_disp_;
   ESP_LOGCONFIG(TAG, "LVGL driver.hor_res: %i", drv->driver->hor_res);
   ESP_LOGCONFIG(TAG, "LVGL driver.ver_res: %i", drv->driver->ver_res);
-  ESP_LOGCONFIG(TAG, "LVGL driver.rotation: %i", drv->driver->rotated);
+  ESP_LOGCONFIG(TAG, "Rotation: %s",
+                this->software_rotation_ ? "software" : "none or by the panel");
+  ESP_LOGCONFIG(TAG, "Partial display updates: %s",
+                YESNO(this->display_->supports_partial_update()));
+  ESP_LOGCONFIG(TAG, "Double buffered: %s",
+                YESNO(this->buffer_mode_ == BUFFER_MODE_DOUBLE));
+  ESP_LOGCONFIG(TAG, "Render mode: %s",
+                drv->driver->direct_mode ? "direct" : "partial");
+  ESP_LOGCONFIG(TAG, "Target FPS: %u", this->target_fps_);
+#ifdef USE_GUI_MEM_HEAP
+  ESP_LOGCONFIG(TAG, "LVGL memory: heap, blocks over %u bytes in external RAM",
+                GUI_MEM_INTERNAL_THRESHOLD);
+#elif defined(USE_GUI_MEM_POOL_PSRAM)
+  ESP_LOGCONFIG(TAG, "LVGL memory: %u byte pool in external RAM",
+                (unsigned) LV_MEM_SIZE);
+#else
+  ESP_LOGCONFIG(TAG, "LVGL memory: %u byte pool", (unsigned) LV_MEM_SIZE);
+#endif
+#ifdef USE_GUI_RENDER_TASK
+  if (this->use_render_task_) {
+    ESP_LOGCONFIG(TAG, "Render task: core %i, priority %u, stack %u bytes",
+                  this->render_task_.get_core(),
+                  this->render_task_.get_priority(),
+                  this->render_task_.get_stack_size());
+  }
+#endif
+#ifdef USE_GUI_TEXT_CACHE
+  ESP_LOGCONFIG(TAG, "Text cache: %u bytes in %s RAM",
+                (unsigned) this->text_cache_.get_size(),
+                this->text_cache_.is_in_psram() ? "external" : "internal");
+#endif
+#ifdef USE_GUI_TRACE
+  ESP_LOGCONFIG(TAG, "Redraw trace: %u events", this->trace_.get_size());
+#endif
+  ESP_LOGCONFIG(TAG, "Idle policy: %s",
+                this->idle_policy_ == IDLE_POLICY_SLEEP ? "sleep" : "busy");
+  ESP_LOGCONFIG(TAG, "Pages: %u, widgets with periodic work: %u",
+                (unsigned) this->page_count_,
+                (unsigned) this->loop_widget_count_);
+  for (size_t i = 0; i < this->page_count_; i++)
+    this->pages_[i]->dump_config();
+#ifdef USE_GUI_INPUT
+  for (size_t i = 0; i < this->input_count_; i++)
+    this->inputs_[i]->dump_config();
+#endif
 }
 #if LV_USE_LOG
 void GuiComponent::lv_esp_log(const char *buf) {
@@ -56,15 +430,145 @@ void GuiComponent::lv_esp_log(const char *buf) {
 void HOT GuiComponent::refresh(lv_disp_drv_t *disp_drv, const lv_area_t *area,
                                lv_color_t *buf) {
   GuiComponent *gui = (GuiComponent *)(disp_drv->user_data);
+#if defined(USE_GUI_DIAGNOSTICS) || defined(USE_GUI_TRACE)
+  uint32_t frame = gui->frame_count_;
+  uint32_t start = micros();
   gui->refresh_internal_(disp_drv, area, buf);
+  uint32_t elapsed = micros() - start;
+#ifdef USE_GUI_DIAGNOSTICS
+  gui->frame_flush_us_ += elapsed;
+#endif
+#ifdef USE_GUI_TRACE
+  gui->trace_.add(TRACE_EVENT_FLUSH, area, nullptr, frame, start, elapsed);
+#endif
+#else
+  gui->refresh_internal_(disp_drv, area, buf);
+#endif
 }
 
+void GuiComponent::wait(lv_disp_drv_t *disp_drv) {
+  GuiComponent *gui = (GuiComponent *)(disp_drv->user_data);
+#ifdef USE_GUI_DIAGNOSTICS
+  uint32_t start = micros();
+  gui->check_flush_();
+  gui->frame_flush_us_ += micros() - start;
+#else
+  gui->check_flush_();
+#endif
+}
+
+#ifdef USE_GUI_DIAGNOSTICS
+GuiStats GuiComponent::take_stats() {
+  uint32_t now = esphome::millis();
+  GuiStats stats = this->stats_;
+  stats.elapsed_ms = now - this->stats_since_;
+  stats.screen_px = this->disp_drv_.hor_res * this->disp_drv_.ver_res;
+#ifdef USE_GUI_TEXT_CACHE
+  this->text_cache_.take_counts(&stats.text_cache_hits,
+                                &stats.text_cache_misses);
+#endif
+  this->stats_ = GuiStats();
+  this->stats_since_ = now;
+  return stats;
+}
+
+void GuiComponent::refr_timer_cb_(lv_timer_t *timer) {
+  // Wraps LVGL's own refresh timer, so the time of a whole frame is known.
+  // Whatever of it wasn't spent flushing was spent rendering.
+  lv_disp_t *disp = (lv_disp_t *) timer->user_data;
+  GuiComponent *gui = (GuiComponent *) disp->driver->user_data;
+  uint32_t frames = gui->frame_count_;
+  gui->frame_flush_us_ = 0;
+  uint32_t start = micros();
+  _lv_disp_refr_timer(timer);
+  uint32_t elapsed = micros() - start;
+  if (gui->frame_count_ == frames) return;
+  uint32_t flush = std::min(gui->frame_flush_us_, elapsed);
+  gui->stats_.frames++;
+  gui->stats_.render_us.add(elapsed - flush);
+  gui->stats_.flush_us.add(flush);
+}
+
+void GuiComponent::monitor_cb_(lv_disp_drv_t *disp_drv, uint32_t time,
+                               uint32_t px) {
+  GuiComponent *gui = (GuiComponent *)(disp_drv->user_data);
+  gui->stats_.invalidated_px += px;
+}
+#endif
+
 void HOT GuiComponent::refresh_internal_(lv_disp_drv_t *disp_drv,
                                          const lv_area_t *area,
                                          lv_color_t *buf) {
-  GuiComponent *gui = (GuiComponent *)(disp_drv->user_data);
-  gui->display_->update();
-  lv_disp_flush_ready(disp_drv);
+  bool last = lv_disp_flush_is_last(disp_drv);
+  bool partial = this->display_->supports_partial_update();
+  Rect rect(area->x1, area->y1, lv_area_get_width(area),
+            lv_area_get_height(area));
+
+  if (!disp_drv->direct_mode) {
+    // Each strip is either streamed straight to the panel or copied into
+    // the display's buffer, which is then sent per strip or once per frame.
+    if (partial && !this->software_rotation_) {
+      this->frame_bytes_ += this->display_->write_area(rect, (uint8_t *)buf);
+    } else {
+      if (this->software_rotation_) {
+        // Rotated in a single pass while copying, rect becomes the window
+        // of the unrotated panel to update.
+        rect = this->display_->blit_rotated_area(rect, (uint8_t *)buf);
+      } else {
+        this->display_->blit_area(rect, (uint8_t *)buf);
+      }
+      if (partial) {
+        this->frame_bytes_ += this->display_->update_area(rect);
+      } else if (last) {
+        this->frame_bytes_ += this->display_->update_area(Rect());
+      }
+    }
+  } else if (partial || last) {
+    // Drivers which can only send the whole buffer are flushed once per frame
+    // rather than once per invalidated area.
+    if (!partial) rect = Rect();
+    if (this->buffer_mode_ == BUFFER_MODE_DOUBLE) {
+      this->frame_bytes_ +=
+          this->display_->start_update_area(rect, (uint8_t *)buf);
+    } else {
+      this->frame_bytes_ += this->display_->update_area(rect);
+    }
+  }
+
+  if (last) {
+    ESP_LOGV(TAG, "Frame %u flushed %u bytes", this->frame_count_,
+             this->frame_bytes_);
+    this->last_frame_bytes_ = this->frame_bytes_;
+    this->total_bytes_ += this->frame_bytes_;
+    this->frame_bytes_ = 0;
+    this->frame_count_++;
+#ifdef USE_GUI_INPUT
+    if (this->input_pending_) {
+      this->input_pending_ = false;
+      this->last_input_latency_us_ = micros() - this->input_time_us_;
+      ESP_LOGV(TAG, "Input to flush: %u us", this->last_input_latency_us_);
+#ifdef USE_GUI_DIAGNOSTICS
+      this->stats_.input_latency_us.add(this->last_input_latency_us_);
+#endif
+    }
+#endif
+    this->frame_callback_.call();
+  }
+
+  if (this->buffer_mode_ == BUFFER_MODE_DOUBLE) {
+    // LVGL keeps rendering into the other buffer; the flush is reported
+    // as done once the driver has finished the transfer.
+    this->flush_pending_ = true;
+    this->check_flush_();
+  } else {
+    lv_disp_flush_ready(disp_drv);
+  }
+}
+
+void GuiComponent::check_flush_() {
+  if (!this->flush_pending_ || this->display_->is_update_busy()) return;
+  this->flush_pending_ = false;
+  lv_disp_flush_ready(&this->disp_drv_);
 }
 
 }  // namespace gui
@@ -1,8 +1,16 @@
 #pragma once
 
 #include "esphome.h"
+#include "diagnostics.h"
 #include "gui_objects.h"
+#include "image_decoder.h"
+#include "input.h"
 #include "lvgl.h"
+#include "memory.h"
+#include "page.h"
+#include "render_task.h"
+#include "text_cache.h"
+#include "trace.h"
 
 namespace esphome {
 
@@ -14,6 +22,29 @@ class DisplayBuffer;
 namespace gui {
 using namespace display;
 
+enum BufferMode {
+  BUFFER_MODE_SINGLE = 0,
+  BUFFER_MODE_DOUBLE,
+};
+
+enum IdlePolicy {
+  /// Run the LVGL timer handler on every loop iteration.
+  IDLE_POLICY_BUSY = 0,
+  /// Only run the timer handler when LVGL has work due, and release
+  /// the high frequency loop while the screen is idle.
+  IDLE_POLICY_SLEEP,
+};
+
+enum RotationMode {
+  /// Let the panel rotate when its driver supports it, rotate in software
+  /// otherwise.
+  ROTATION_MODE_AUTO = 0,
+  /// Prefer the panel's rotation, warning when it has to fall back to software.
+  ROTATION_MODE_HARDWARE,
+  /// Rotate every flushed area into the display buffer.
+  ROTATION_MODE_SOFTWARE,
+};
+
 class GuiComponent : public Component {
  public:
   void setup() override;
@@ -27,24 +58,226 @@ class GuiComponent : public Component {
 #endif
 
   void set_display(DisplayBuffer *display) { this->display_ = display; }
+  void set_buffer_mode(BufferMode mode) { this->buffer_mode_ = mode; }
+  void set_draw_buffer_lines(uint32_t lines) {
+    this->draw_buffer_lines_ = lines;
+  }
+  void set_draw_buffer_percent(float percent) {
+    this->draw_buffer_percent_ = percent;
+  }
+  void set_target_fps(uint32_t fps) { this->target_fps_ = fps; }
+  void set_idle_policy(IdlePolicy policy) { this->idle_policy_ = policy; }
+  void set_rotation_mode(RotationMode mode) { this->rotation_mode_ = mode; }
+  /// Fill in the styles shared by objects, once LVGL is initialized.
+  void set_styles_init(void (*styles_init)()) {
+    this->styles_init_ = styles_init;
+  }
+  /// Pages of the GUI. The first one is shown at boot.
+  void set_pages(GuiPage *const *pages, size_t count) {
+    this->pages_ = pages;
+    this->page_count_ = count;
+  }
+  /// Objects with periodic work, i.e. a bound sensor, run from loop().
+  void set_loop_widgets(GuiObject *const *widgets, size_t count) {
+    this->loop_widgets_ = widgets;
+    this->loop_widget_count_ = count;
+  }
+
+#ifdef USE_GUI_INPUT
+  /// Input devices which LVGL reads.
+  void set_inputs(GuiInput *const *inputs, size_t count) {
+    this->inputs_ = inputs;
+    this->input_count_ = count;
+  }
+  /// Note that LVGL has read an input event which arrived at time_us, so the
+  /// next frame is drawn right away and its latency measured. Must be called
+  /// from the thread running LVGL.
+  void input_read(uint32_t time_us);
+  /// Microseconds from the arrival of the last input event which changed the
+  /// screen until the frame showing the change was flushed.
+  uint32_t get_last_input_latency_us() {
+    return this->last_input_latency_us_;
+  }
+#endif
+
+  /// Run the LVGL timer handler on the next loop iteration, e.g. after input
+  /// arrived while the GUI was idle.
+  void wake();
+  /// Run a command which calls into LVGL. When a render task is running the
+  /// command is queued for it, otherwise it is run right away. Redraws it
+  /// causes are named after source in the redraw trace. Commands are
+  /// dropped if setup() failed.
+  void run(std::function<void()> &&command, const char *source = nullptr);
+  /// Run a command on the main loop, e.g. to pass an LVGL event on to other
+  /// components. When a render task is running, the command is queued until
+  /// the next loop(), otherwise it is run right away.
+  void run_in_loop(std::function<void()> &&command);
+
+  /// Show a page, from any thread. The page shown before is deleted if its
+  /// policy says so.
+  void show_page(GuiPage *page);
+  void show_next_page();
+  void show_previous_page();
+
+#ifdef USE_GUI_RENDER_TASK
+  void set_render_task(int core, uint32_t priority, uint32_t stack_size);
+#endif
+#ifdef USE_GUI_TEXT_CACHE
+  void set_text_cache(size_t size, bool in_psram) {
+    this->text_cache_size_ = size;
+    this->text_cache_in_psram_ = in_psram;
+  }
+  TextCache *get_text_cache() { return &this->text_cache_; }
+#endif
+#ifdef USE_GUI_TRACE
+  void set_trace(uint32_t size, const std::string &output) {
+    this->trace_size_ = size;
+    this->trace_.set_output(output);
+  }
+  /// Name invalidations caused by LVGL calls from now on after source, until
+  /// it's reset with nullptr. Must be called from the thread running LVGL.
+  void set_trace_source(const char *source) { this->trace_source_ = source; }
+  /// Dump the redraw trace to the log, or to the trace's output file.
+  void dump_trace();
+#endif
   static void refresh(lv_disp_drv_t *disp_drv, const lv_area_t *area,
                           lv_color_t *buf);
+  static void wait(lv_disp_drv_t *disp_drv);
+
+  /// Number of bytes sent to the display during the last complete frame.
+  uint32_t get_last_frame_bytes() { return this->last_frame_bytes_; }
+  /// Number of bytes sent to the display since boot.
+  uint64_t get_total_bytes() { return this->total_bytes_; }
+  uint32_t get_frame_count() { return this->frame_count_; }
+  /// Call back from the thread running LVGL once a frame has been flushed.
+  void add_on_frame_callback(std::function<void()> &&callback) {
+    this->frame_callback_.add(std::move(callback));
+  }
+#ifdef USE_GUI_DIAGNOSTICS
+  /// Statistics collected since the previous call. Must be called from the
+  /// thread running LVGL, see run().
+  GuiStats take_stats();
+#endif
 
  protected:
   void refresh_internal_(lv_disp_drv_t *disp_drv, const lv_area_t *area,
                     lv_color_t *buf);
+  void check_flush_();
+  uint32_t run_lvgl_(uint32_t now);
+#ifdef USE_GUI_RENDER_TASK
+  uint32_t render_task_loop_();
+#endif
+#ifdef USE_GUI_DIAGNOSTICS
+  static void refr_timer_cb_(lv_timer_t *timer);
+  static void monitor_cb_(lv_disp_drv_t *disp_drv, uint32_t time,
+                          uint32_t px);
+#endif
+#ifdef USE_GUI_TRACE
+  static void rounder_cb_(lv_disp_drv_t *disp_drv, lv_area_t *area);
+#endif
+  /// Load the page's screen. Must be called from the thread running LVGL.
+  void load_page_(GuiPage *page);
+  /// Index of the active page in pages_.
+  size_t active_page_index_();
+  /// Log LVGL's peak memory usage whenever it has grown noticeably.
+  void report_memory_();
+  uint32_t get_draw_buffer_lines_();
+  uint8_t *allocate_draw_buffer_(uint32_t pixels);
 
   DisplayBuffer *display_{nullptr};
+  BufferMode buffer_mode_{BUFFER_MODE_SINGLE};
+  bool flush_pending_{false};
+  uint32_t draw_buffer_lines_{0};
+  float draw_buffer_percent_{0.0f};
+  uint32_t target_fps_{30};
+  IdlePolicy idle_policy_{IDLE_POLICY_SLEEP};
+  RotationMode rotation_mode_{ROTATION_MODE_AUTO};
+  bool software_rotation_{false};
+  void (*styles_init_)(){nullptr};
+  GuiPage *const *pages_{nullptr};
+  size_t page_count_{0};
+  GuiPage *active_page_{nullptr};
+  GuiObject *const *loop_widgets_{nullptr};
+  size_t loop_widget_count_{0};
+#ifdef USE_GUI_INPUT
+  GuiInput *const *inputs_{nullptr};
+  size_t input_count_{0};
+  /// Set from the first input event read until the next frame is flushed.
+  bool input_pending_{false};
+  uint32_t input_time_us_{0};
+  uint32_t last_input_latency_us_{0};
+#endif
+#ifdef USE_GUI_RENDER_TASK
+  bool use_render_task_{false};
+  RenderTask render_task_;
+  /// Commands queued by run_in_loop().
+  std::vector<std::function<void()>> loop_queue_;
+  RenderLock loop_queue_lock_;
+#endif
 
   lv_disp_t *lv_disp_{nullptr};
   lv_disp_drv_t disp_drv_{};
   lv_disp_draw_buf_t draw_buf_{};
-  lv_disp_rot_t get_lv_rotation();
+
+  uint32_t frame_bytes_{0};
+  uint32_t last_frame_bytes_{0};
+  uint64_t total_bytes_{0};
+  uint32_t frame_count_{0};
+  CallbackManager<void()> frame_callback_;
+  size_t reported_max_used_{0};
+#ifdef USE_GUI_DIAGNOSTICS
+  GuiStats stats_;
+  uint32_t stats_since_{0};
+  /// Time spent in the flush and wait callbacks during the current frame.
+  uint32_t frame_flush_us_{0};
+#endif
+#ifdef USE_GUI_TEXT_CACHE
+  TextCache text_cache_;
+  size_t text_cache_size_{0};
+  bool text_cache_in_psram_{false};
+#endif
+#ifdef USE_GUI_TRACE
+  RedrawTrace trace_;
+  uint32_t trace_size_{0};
+  const char *trace_source_{nullptr};
+#endif
 
  private:
   HighFrequencyLoopRequester high_freq_;
   uint32_t last_loop_{0};
+  uint32_t next_run_{0};
 };
 
+template<typename... Ts> class ShowPageAction : public Action<Ts...> {
+ public:
+  TEMPLATABLE_VALUE(GuiPage *, page)
+
+  void play(Ts... x) override {
+    GuiPage *page = this->page_.value(x...);
+    if (page != nullptr) page->show();
+  }
+};
+
+template<typename... Ts>
+class ShowNextPageAction : public Action<Ts...>, public Parented<GuiComponent> {
+ public:
+  void play(Ts... x) override { this->parent_->show_next_page(); }
+};
+
+template<typename... Ts>
+class ShowPreviousPageAction : public Action<Ts...>,
+                               public Parented<GuiComponent> {
+ public:
+  void play(Ts... x) override { this->parent_->show_previous_page(); }
+};
+
+#ifdef USE_GUI_TRACE
+template<typename... Ts>
+class DumpTraceAction : public Action<Ts...>, public Parented<GuiComponent> {
+ public:
+  void play(Ts... x) override { this->parent_->dump_trace(); }
+};
+#endif
+
 }  // namespace gui
 }  // namespace esphome
\ No newline at end of file
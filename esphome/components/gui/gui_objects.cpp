@@ -1,4 +1,11 @@
 #include "gui_objects.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstdarg>
+#include <cstring>
+
+#include "gui.h"
 #include "lvgl.h"
 
 namespace esphome {
@@ -6,39 +13,170 @@ namespace gui {
 
 static const char *const TAG = "gui.object";
 
+/// Sensor binding
+
+#ifdef USE_SENSOR
+void SensorBinding::bind(sensor::Sensor *sensor,
+                         std::function<void(float)> &&apply) {
+  this->apply_ = std::move(apply);
+  sensor->add_on_state_callback([this](float state) {
+    this->state_ = state;
+    this->pending_ = true;
+  });
+}
+
+void SensorBinding::loop() {
+  if (!this->pending_) return;
+  uint32_t now = millis();
+  if (now - this->last_update_ < this->min_update_interval_) return;
+  this->pending_ = false;
+  if (!std::isnan(this->shown_) &&
+      fabsf(this->state_ - this->shown_) <= this->deadband_)
+    return;
+  this->shown_ = this->state_;
+  this->last_update_ = now;
+  this->apply_(this->state_);
+}
+#endif
+
 /// GUI Object
 
-inline void GuiObject::update() {
+void GuiObject::update() {
   if (this->obj == nullptr) return;
-  ESP_LOGV(TAG, "\tsetting object's position and size");
-  ESP_LOGV(TAG, "\t\tcoordinates: (%i, %i)", this->x_, this->y_);
-  ESP_LOGV(TAG, "\t\tdimensions: (%i, %i)", this->w_, this->h_);
-  lv_obj_set_pos(this->obj, this->x_, this->y_);
-  lv_obj_set_size(this->obj, this->w_, this->h_);
+  if (this->dirty_ == DIRTY_NONE) {
+    this->skipped_updates_++;
+    return;
+  }
+  this->applied_updates_++;
+  if (this->dirty_ & DIRTY_POSITION) {
+    ESP_LOGV(TAG, "\t\tcoordinates: (%i, %i)", this->x_, this->y_);
+    lv_obj_set_pos(this->obj, this->x_, this->y_);
+  }
+  if (this->dirty_ & DIRTY_SIZE) {
+    ESP_LOGV(TAG, "\t\tdimensions: (%i, %i)", this->w_, this->h_);
+    lv_obj_set_size(this->obj, this->w_, this->h_);
+  }
+  if (this->dirty_ & DIRTY_TEXT) {
+    this->apply_text_();
+  }
+  if (this->dirty_ & DIRTY_STYLE) {
+    for (size_t i = 0; i < this->style_count_; i++)
+      lv_obj_add_style(this->obj, this->styles_[i].style,
+                       this->styles_[i].selector);
+  }
+  this->dirty_ = DIRTY_NONE;
 }
 void GuiObject::set_coords(int x, int y) {
+  if (x == this->x_ && y == this->y_) return;
   this->x_ = x;
   this->y_ = y;
+  this->dirty_ |= DIRTY_POSITION;
 }
 void GuiObject::set_dimensions(int w, int h) {
+  if (w == this->w_ && h == this->h_) return;
   this->w_ = w;
   this->h_ = h;
+  this->dirty_ |= DIRTY_SIZE;
 }
-lv_obj_t *GuiObject::setup() {
-  lv_style_init(&this->style);
+void GuiObject::set_text(const char *val) {
+  if (this->text_ == val) return;
+  this->text_ = val;
+  this->dirty_ |= DIRTY_TEXT;
+}
+lv_obj_t *GuiObject::get_screen_() {
+  if (this->page_ != nullptr) return this->page_->get_screen();
   return lv_scr_act();
 }
+void GuiObject::release() {
+  this->obj = nullptr;
+  this->dirty_ = DIRTY_ALL;
+}
+#ifdef USE_SENSOR
+void GuiObject::set_sensor(sensor::Sensor *sensor, uint32_t min_update_interval,
+                           float deadband) {
+  this->sensor_binding_ = new SensorBinding();  // NOLINT
+  this->sensor_binding_->set_min_update_interval(min_update_interval);
+  this->sensor_binding_->set_deadband(deadband);
+  this->sensor_binding_->bind(
+      sensor, [this](float value) { this->apply_value_(value); });
+}
+#endif
+void GuiObject::loop() {
+#ifdef USE_SENSOR
+  if (this->sensor_binding_ != nullptr) this->sensor_binding_->loop();
+#endif
+}
+void GuiObject::run_(std::function<void()> &&command) {
+  if (this->gui_ == nullptr) {
+    command();
+    return;
+  }
+#ifdef USE_GUI_TRACE
+  // Attribute whatever the command invalidates to this object.
+  this->gui_->run(std::move(command), this->trace_name_);
+#else
+  this->gui_->run(std::move(command));
+#endif
+}
+
+void GuiObject::run_in_loop_(std::function<void()> &&command) {
+  if (this->gui_ == nullptr) {
+    command();
+    return;
+  }
+  this->gui_->run_in_loop(std::move(command));
+}
 
 /// GUI Label
 
-void GuiLabel::update() {
-  if (this->obj == nullptr) return;
-  GuiObject::update();
-  lv_label_set_text(this->obj, this->text_.c_str());
+#ifdef USE_LABEL
+void GuiLabel::apply_text_() {
+  if (this->text_buffer_ != nullptr) {
+    ESP_LOGV(TAG, "\tCalling lv_label_set_text_static");
+    lv_label_set_text_static(this->obj, this->text_buffer_);
+    return;
+  }
   ESP_LOGV(TAG, "\tCalling lv_label_set_text");
+  lv_label_set_text(this->obj, this->text_.c_str());
+}
+void GuiLabel::set_text_buffer(char *buffer, size_t capacity) {
+  this->text_buffer_ = buffer;
+  this->text_capacity_ = capacity;
+  this->text_buffer_[0] = '\0';
+  this->staging_buffer_()[0] = '\0';
+}
+void GuiLabel::set_text(const char *val) {
+  if (this->text_buffer_ == nullptr) {
+    GuiObject::set_text(val);
+    return;
+  }
+  if (strncmp(this->text_buffer_, val, this->text_capacity_ - 1) == 0) return;
+  strncpy(this->text_buffer_, val, this->text_capacity_ - 1);
+  this->text_buffer_[this->text_capacity_ - 1] = '\0';
+  this->dirty_ |= DIRTY_TEXT;
+}
+const char *GuiLabel::get_text() {
+  if (this->text_buffer_ != nullptr) return this->text_buffer_;
+  return GuiObject::get_text();
+}
+char *GuiLabel::lock_staging_() {
+#ifdef USE_GUI_RENDER_TASK
+  this->staging_lock_.lock();
+#endif
+  return this->staging_buffer_();
+}
+void GuiLabel::unlock_staging_() {
+#ifdef USE_GUI_RENDER_TASK
+  this->staging_lock_.unlock();
+#endif
+}
+void GuiLabel::commit_text_buffer_() {
+  this->set_text(this->lock_staging_());
+  this->unlock_staging_();
+  this->update();
 }
 void GuiLabel::setup() {
-  lv_obj_t *screen = GuiObject::setup();
+  lv_obj_t *screen = this->get_screen_();
 
   if (screen == nullptr) {
     // Exit with a warning. Due to different timings etc., it may happen that
@@ -48,27 +186,88 @@ void GuiLabel::setup() {
     return;
   }
   this->obj = lv_label_create(screen);
+#ifdef USE_GUI_TEXT_CACHE
+  if (this->cache_)
+    lv_obj_add_event_cb(
+        this->obj, draw_cached_cb_,
+        (lv_event_code_t) (LV_EVENT_DRAW_MAIN | LV_EVENT_PREPROCESS), this);
+#endif
   this->update();
 }
-void GuiLabel::loop() {}
+#ifdef USE_GUI_TEXT_CACHE
+void GuiLabel::draw_cached_cb_(lv_event_t *event) {
+  GuiLabel *label = (GuiLabel *)lv_event_get_user_data(event);
+  TextCache *cache = label->gui_->get_text_cache();
+  // Runs before the label draws itself, which is skipped on success.
+  if (cache->draw(lv_event_get_target(event), lv_event_get_draw_ctx(event)))
+    lv_event_stop_processing(event);
+}
+#endif
 void GuiLabel::dump_config() {
   if (this->obj == nullptr) return;
 
   ESP_LOGCONFIG(TAG, "Label created at (%i, %i)", this->x_, this->y_);
+  ESP_LOGCONFIG(TAG, "  Updates applied: %u, skipped: %u",
+                this->applied_updates_, this->skipped_updates_);
 }
 
 void GuiLabel::print(const char *text) {
-  this->set_text(text);
-  this->update();
+  if (this->text_buffer_ != nullptr) {
+    char *staging = this->lock_staging_();
+    strncpy(staging, text, this->text_capacity_ - 1);
+    staging[this->text_capacity_ - 1] = '\0';
+    this->unlock_staging_();
+    this->run_([this]() { this->commit_text_buffer_(); });
+    return;
+  }
+  this->run_([this, text = std::string(text)]() {
+    this->set_text(text.c_str());
+    this->update();
+  });
 }
 void GuiLabel::print(int x, int y, const char *text) {
-  this->set_text(text);
-  this->set_coords(x, y);
-  this->update();
+  if (this->text_buffer_ != nullptr) {
+    char *staging = this->lock_staging_();
+    strncpy(staging, text, this->text_capacity_ - 1);
+    staging[this->text_capacity_ - 1] = '\0';
+    this->unlock_staging_();
+    this->run_([this, x, y]() {
+      this->set_coords(x, y);
+      this->commit_text_buffer_();
+    });
+    return;
+  }
+  this->run_([this, x, y, text = std::string(text)]() {
+    this->set_text(text.c_str());
+    this->set_coords(x, y);
+    this->update();
+  });
+}
+void GuiLabel::printf(const char *format, ...) {
+  va_list arg;
+  va_start(arg, format);
+  if (this->text_buffer_ != nullptr) {
+    vsnprintf(this->lock_staging_(), this->text_capacity_, format, arg);
+    this->unlock_staging_();
+    va_end(arg);
+    this->run_([this]() { this->commit_text_buffer_(); });
+    return;
+  }
+  char buffer[256];
+  vsnprintf(buffer, sizeof(buffer), format, arg);
+  va_end(arg);
+  this->print(buffer);
 }
 
 #ifdef USE_TIME
 void GuiLabel::strftime(const char *format, ESPTime time) {
+  if (this->text_buffer_ != nullptr) {
+    size_t ret =
+        time.strftime(this->lock_staging_(), this->text_capacity_, format);
+    this->unlock_staging_();
+    if (ret > 0) this->run_([this]() { this->commit_text_buffer_(); });
+    return;
+  }
   char buffer[64] = {0};
   size_t ret = time.strftime(buffer, sizeof(buffer), format);
 
@@ -76,65 +275,244 @@ void GuiLabel::strftime(const char *format, ESPTime time) {
   ESP_LOGVV(TAG, "\tstrftime result: %i", ret);
 
   if (ret > 0) {
-    this->set_text(buffer);
-    this->update();
+    this->print(buffer);
   }
 }
 void GuiLabel::strftime(int x, int y, const char *format, ESPTime time) {
-  this->strftime(format, time);
-  this->update();
+  char buffer[64] = {0};
+  size_t ret = time.strftime(buffer, sizeof(buffer), format);
+  if (ret > 0) {
+    this->print(x, y, buffer);
+  }
 }
 #endif
+#endif
 
 /// GUI Checkbox
 
 #ifdef USE_CHECKBOX
 void GuiCheckbox::setup() {
-  lv_obj_t *screen = GuiObject::setup();
+  lv_obj_t *screen = this->get_screen_();
   if (screen == nullptr) {
     ESP_LOGW(TAG, "Failed to get screen pointer");
     return;
   }
-  this->obj = lv_checkbox_create(lv_scr_act());
+  this->obj = lv_checkbox_create(screen);
 
-  lv_checkbox_set_text_static(this->obj, this->get_text());
   lv_obj_set_style_text_font(this->obj, &lv_font_montserrat_18,
                              LV_PART_MAIN | LV_STATE_DEFAULT);
 
-  this->switch_state = this->switch_->get_initial_state();
-  this->switch_->add_on_state_callback(switch_event_callback);
+  this->apply_state_(this->switch_->state);
   lv_obj_add_event_cb(this->obj, this->gui_event_callback,
                       LV_EVENT_VALUE_CHANGED, (void *)this);
   this->update();
 }
 
-void GuiCheckbox::loop() {
-  bool state = this->switch_->state;
-  if (state != this->switch_state) {
-    ((state) ? lv_obj_add_state(this->obj, LV_STATE_CHECKED)
-             : lv_obj_clear_state(this->obj, LV_STATE_CHECKED));
-    this->switch_state = state;
+void GuiCheckbox::set_switch(switch_::Switch *sw) {
+  this->switch_ = sw;
+  // Registered once, as the checkbox may be created more than once.
+  this->switch_->add_on_state_callback([this](bool state) {
+    this->run_([this, state]() { this->apply_state_(state); });
+  });
+}
+
+void GuiCheckbox::apply_state_(bool state) {
+  // The checkbox is shown with the switch's state when it is created.
+  if (this->obj == nullptr) return;
+  // Also ends the round trip of a click: the switch reports the state the
+  // checkbox already shows.
+  if (lv_obj_has_state(this->obj, LV_STATE_CHECKED) == state) return;
+  if (state) {
+    lv_obj_add_state(this->obj, LV_STATE_CHECKED);
+  } else {
+    lv_obj_clear_state(this->obj, LV_STATE_CHECKED);
   }
 }
 
-void GuiCheckbox::gui_event_callback(lv_event_t *event) {
-  lv_obj_t *target = (lv_obj_t *)lv_event_get_target(event);
-  GuiCheckbox *sw = (GuiCheckbox *)event->user_data;
-  bool state = (lv_obj_get_state(target) & LV_STATE_CHECKED);
+void GuiCheckbox::apply_text_() {
+  lv_checkbox_set_text(this->obj, this->text_.c_str());
 }
 
-void GuiCheckbox::switch_event_callback(bool state) {}
+void GuiCheckbox::gui_event_callback(lv_event_t *event) {
+  GuiCheckbox *checkbox = (GuiCheckbox *)lv_event_get_user_data(event);
+  bool state = lv_obj_has_state(lv_event_get_target(event), LV_STATE_CHECKED);
+  checkbox->run_in_loop_([checkbox, state]() {
+    // Nothing to do if the switch is the one which changed the checkbox.
+    if (checkbox->switch_->state == state) return;
+    if (state) {
+      checkbox->switch_->turn_on();
+    } else {
+      checkbox->switch_->turn_off();
+    }
+  });
+}
 
 void GuiCheckbox::dump_config() {
   ESP_LOGCONFIG(TAG, "Checkbox created at (%i, %i)", this->x_, this->y_);
 }
 #endif
 
+/// GUI Bar
+
+#ifdef USE_BAR
+void GuiBar::setup() {
+  lv_obj_t *screen = this->get_screen_();
+  if (screen == nullptr) return;
+
+  this->obj = lv_bar_create(screen);
+  lv_bar_set_range(this->obj, this->min_value_, this->max_value_);
+  lv_bar_set_mode(this->obj, this->mode_);
+  lv_bar_set_value(this->obj, (int32_t)this->value_, LV_ANIM_OFF);
+  this->update();
+}
+void GuiBar::set_value(float value) {
+  this->value_ = value;
+  this->run_([this, value]() {
+    if (this->obj == nullptr) return;
+    lv_bar_set_value(this->obj, (int32_t)value, this->animated_);
+  });
+}
+void GuiBar::dump_config() {
+  ESP_LOGCONFIG(TAG, "Bar created at (%i, %i)", this->x_, this->y_);
+  ESP_LOGCONFIG(TAG, "  Range: %i - %i", this->min_value_, this->max_value_);
+}
+#endif
+
+/// GUI Image
+
+#ifdef USE_IMG
+void GuiImage::setup() {
+  lv_obj_t *screen = this->get_screen_();
+  if (screen == nullptr) return;
+
+  this->obj = lv_img_create(screen);
+  if (this->src_ != nullptr) lv_img_set_src(this->obj, this->src_);
+  this->update();
+}
+void GuiImage::set_src(const lv_img_dsc_t *src) {
+  this->src_ = src;
+  this->run_([this, src]() {
+    if (this->obj == nullptr) return;
+    lv_img_set_src(this->obj, src);
+  });
+}
+void GuiImage::dump_config() {
+  ESP_LOGCONFIG(TAG, "Image created at (%i, %i)", this->x_, this->y_);
+  if (this->src_ != nullptr)
+    ESP_LOGCONFIG(TAG, "  Size: %ux%u", this->src_->header.w,
+                  this->src_->header.h);
+}
+#endif
+
+/// GUI Chart
+
+#ifdef USE_CHART
+// Values are scaled to the range of the chart, with this resolution.
+static const lv_coord_t CHART_RESOLUTION = 1000;
+
+void GuiChart::setup() {
+  lv_obj_t *screen = this->get_screen_();
+  if (screen == nullptr) return;
+
+  this->obj = lv_chart_create(screen);
+  lv_chart_set_type(this->obj, LV_CHART_TYPE_LINE);
+  // New columns overwrite the oldest ones in place, so only they are
+  // redrawn. Scrolling would redraw the whole plot for every column.
+  lv_chart_set_update_mode(this->obj, LV_CHART_UPDATE_MODE_CIRCULAR);
+  lv_chart_set_point_count(this->obj, this->point_count_);
+  lv_chart_set_range(this->obj, LV_CHART_AXIS_PRIMARY_Y, 0, CHART_RESOLUTION);
+  // Columns are a pixel or two wide, too narrow to mark their points.
+  lv_obj_set_style_size(this->obj, 0, LV_PART_INDICATOR);
+  for (auto &series : this->series_) {
+    series.series =
+        lv_chart_add_series(this->obj, series.color, LV_CHART_AXIS_PRIMARY_Y);
+    lv_chart_set_ext_y_array(this->obj, series.series, series.points);
+    lv_chart_set_x_start_point(this->obj, series.series, series.next);
+  }
+  this->update();
+}
+
+void GuiChart::release() {
+  GuiObject::release();
+  for (auto &series : this->series_) series.series = nullptr;
+}
+
+void GuiChart::add_series(sensor::Sensor *sensor, lv_color_t color,
+                          lv_coord_t *points) {
+  std::fill(points, points + this->point_count_, LV_CHART_POINT_NONE);
+  Series series;
+  series.points = points;
+  series.color = color;
+  this->series_.push_back(series);
+  size_t index = this->series_.size() - 1;
+  sensor->add_on_state_callback(
+      [this, index](float value) { this->add_sample_(index, value); });
+}
+
+void GuiChart::add_sample_(size_t index, float value) {
+  Series &series = this->series_[index];
+  if (!std::isnan(value)) {
+    if (std::isnan(series.min) || value < series.min) {
+      series.min = value;
+      series.min_at = series.samples;
+    }
+    if (std::isnan(series.max) || value > series.max) {
+      series.max = value;
+      series.max_at = series.samples;
+    }
+  }
+  if (++series.samples < this->samples_per_column_) return;
+
+  // In the order they arrived, so the line keeps its shape when columns
+  // are wide enough to tell the points apart.
+  lv_coord_t min = this->to_coord_(series.min);
+  lv_coord_t max = this->to_coord_(series.max);
+  bool rising = series.min_at <= series.max_at;
+  series.min = NAN;
+  series.max = NAN;
+  series.samples = 0;
+  this->run_([this, index, min, max, rising]() {
+    this->push_column_(index, rising ? min : max, rising ? max : min);
+  });
+}
+
+void GuiChart::push_column_(size_t index, lv_coord_t first,
+                            lv_coord_t second) {
+  Series &series = this->series_[index];
+  if (series.series != nullptr) {
+    // Writes into the ring buffer, invalidating the column only.
+    lv_chart_set_next_value(this->obj, series.series, first);
+    lv_chart_set_next_value(this->obj, series.series, second);
+  } else {
+    series.points[series.next] = first;
+    series.points[series.next + 1] = second;
+  }
+  series.next = (series.next + 2) % this->point_count_;
+}
+
+lv_coord_t GuiChart::to_coord_(float value) {
+  if (std::isnan(value)) return LV_CHART_POINT_NONE;
+  float scaled = (value - this->min_value_) * CHART_RESOLUTION /
+                 (this->max_value_ - this->min_value_);
+  return (lv_coord_t) clamp(scaled, 0.0f, (float) CHART_RESOLUTION);
+}
+
+void GuiChart::dump_config() {
+  ESP_LOGCONFIG(TAG, "Chart created at (%i, %i)", this->x_, this->y_);
+  ESP_LOGCONFIG(TAG, "  Range: %.1f - %.1f", this->min_value_,
+                this->max_value_);
+  ESP_LOGCONFIG(TAG, "  %u series, %u columns of %u samples each",
+                (unsigned) this->series_.size(),
+                (unsigned) this->point_count_ / 2,
+                (unsigned) this->samples_per_column_);
+}
+#endif
+
 /// GUI Meter
 
 #ifdef USE_METER
 void GuiMeter::setup() {
-  lv_obj_t *screen = GuiObject::setup();
+  lv_obj_t *screen = this->get_screen_();
   if (screen == nullptr) return;
 
   lv_obj_t *meter = lv_meter_create(screen);
@@ -176,14 +554,27 @@ void GuiMeter::setup() {
   lv_meter_set_indicator_end_value(meter, indic, 100);
 
   /*Add a needle line indicator*/
-  indic = lv_meter_add_needle_line(meter, scale, 4,
-                                   lv_palette_main(LV_PALETTE_GREY), -10);
+  this->needle_ = lv_meter_add_needle_line(
+      meter, scale, 4, lv_palette_main(LV_PALETTE_GREY), -10);
+  lv_meter_set_indicator_value(meter, this->needle_, (int32_t)this->value_);
 
   this->obj = std::move(meter);
   this->update();
 }
-void GuiMeter::loop() {}
-void GuiMeter::dump_config() {}
+void GuiMeter::set_value(float value) {
+  this->value_ = value;
+  this->run_([this, value]() {
+    if (this->obj == nullptr || this->needle_ == nullptr) return;
+    lv_meter_set_indicator_value(this->obj, this->needle_, (int32_t)value);
+  });
+}
+void GuiMeter::release() {
+  GuiObject::release();
+  this->needle_ = nullptr;
+}
+void GuiMeter::dump_config() {
+  ESP_LOGCONFIG(TAG, "Meter created at (%i, %i)", this->x_, this->y_);
+}
 #endif
 
 }  // namespace gui
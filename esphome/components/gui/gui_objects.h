@@ -2,6 +2,7 @@
 
 #include "esphome.h"
 #include "lvgl.h"
+#include "render_task.h"
 
 #ifdef USE_METER
 // #include "esphome/components/sensor/sensor.h"
@@ -11,66 +12,208 @@
 namespace esphome {
 namespace gui {
 
+class GuiComponent;
+class GuiPage;
+
+#ifdef USE_SENSOR
+/// Binds a widget to a sensor. Only the latest state is kept; it is passed
+/// on to the widget at most once per min_update_interval, and only when it
+/// differs from the value shown by more than deadband.
+class SensorBinding {
+ public:
+  void bind(sensor::Sensor* sensor, std::function<void(float)>&& apply);
+  void set_min_update_interval(uint32_t interval) {
+    this->min_update_interval_ = interval;
+  }
+  void set_deadband(float deadband) { this->deadband_ = deadband; }
+  void loop();
+
+ protected:
+  std::function<void(float)> apply_;
+  uint32_t min_update_interval_{0};
+  float deadband_{0.0f};
+  float state_{NAN};
+  float shown_{NAN};
+  bool pending_{false};
+  uint32_t last_update_{0};
+};
+#endif
+
+/// Attributes of a GuiObject which have changed since the last update().
+enum GuiObjectDirty : uint8_t {
+  DIRTY_NONE = 0,
+  DIRTY_POSITION = 1 << 0,
+  DIRTY_SIZE = 1 << 1,
+  DIRTY_TEXT = 1 << 2,
+  DIRTY_STYLE = 1 << 3,
+  DIRTY_ALL = DIRTY_POSITION | DIRTY_SIZE | DIRTY_TEXT | DIRTY_STYLE,
+};
+
+/// A style and the parts and states of an object it applies to. Styles are
+/// generated from the configuration as static objects, shared by all objects
+/// with the same properties.
+struct GuiStyleRef {
+  lv_style_t* style;
+  lv_style_selector_t selector;
+};
+
+/// Color of an ESPHome `color`, for use in styles.
+inline lv_color_t lv_color_from(const Color& color) {
+  return lv_color_make(color.r, color.g, color.b);
+}
+
 class GuiObject {
  protected:
+  GuiComponent* gui_{nullptr};
+  GuiPage* page_{nullptr};
   int x_ = 0;
   int y_ = 0;
   int w_ = 0;
   int h_ = 0;
-  lv_style_t style;
   lv_obj_t* obj{nullptr};
+  const GuiStyleRef* styles_{nullptr};
+  size_t style_count_{0};
   std::string text_{""};
-
-  lv_obj_t* setup();
+  uint8_t dirty_{DIRTY_ALL};
+  uint32_t applied_updates_{0};
+  uint32_t skipped_updates_{0};
+#ifdef USE_GUI_TRACE
+  const char* trace_name_{nullptr};
+#endif
+
+  /// The screen of the object's page, or the active one if it has no page.
+  /// nullptr if LVGL isn't initialized.
+  lv_obj_t* get_screen_();
+  /// Push the text to LVGL; called by update() when it has changed.
+  virtual void apply_text_() {}
+#ifdef USE_SENSOR
+  SensorBinding* sensor_binding_{nullptr};
+  /// Show a new sensor value; called by the sensor binding.
+  virtual void apply_value_(float value) {}
+#endif
+  /// Run an LVGL command through the parent GuiComponent, so that it is safe
+  /// to call from the main loop while a render task is running.
+  void run_(std::function<void()>&& command);
+  /// Run a command on the main loop, e.g. to pass an LVGL event on to other
+  /// components. See GuiComponent::run_in_loop().
+  void run_in_loop_(std::function<void()>&& command);
 
  public:
+  /// Create the LVGL object. Called by the GuiComponent once LVGL is
+  /// initialized, in the order the objects are configured in.
+  virtual void setup() {}
+  /// Pass the latest state of a bound sensor on. Only called for objects
+  /// which have one, see GuiComponent::set_loop_widgets().
+  virtual void loop();
+  virtual void dump_config() {}
+  /// Forget the LVGL object, which is deleted along with its screen. The
+  /// attributes are kept, so setup() can create it again.
+  virtual void release();
+
+  void set_gui(GuiComponent* gui) { this->gui_ = gui; }
+  void set_page(GuiPage* page) { this->page_ = page; }
+  /// Styles added to the object when it's created, in order of precedence.
+  void set_styles(const GuiStyleRef* styles, size_t count) {
+    this->styles_ = styles;
+    this->style_count_ = count;
+  }
+#ifdef USE_GUI_TRACE
+  /// Name of the object in redraw traces.
+  void set_trace_name(const char* name) { this->trace_name_ = name; }
+#endif
+#ifdef USE_SENSOR
+  void set_sensor(sensor::Sensor* sensor, uint32_t min_update_interval,
+                  float deadband);
+#endif
+  /// Push changed attributes to LVGL. Attributes which haven't changed since
+  /// the last call are not touched, so LVGL doesn't invalidate the object.
   void update();
   void set_coords(int x, int y);
   void set_dimensions(int w, int h);
-  void set_text(const char* val) { this->text_ = val; }
+  void set_text(const char* val);
   inline const char* get_text() { return this->text_.c_str(); }
+
+  /// Number of update() calls which had changes to push to LVGL.
+  uint32_t get_applied_updates() { return this->applied_updates_; }
+  /// Number of update() calls skipped because nothing had changed.
+  uint32_t get_skipped_updates() { return this->skipped_updates_; }
 };
 
-class GuiLabel : public GuiObject, public Component {
+#ifdef USE_LABEL
+class GuiLabel : public GuiObject {
  protected:
+  void apply_text_() override;
+  /// Copy text staged in the second half of the text buffer into the first
+  /// one, which LVGL displays, and update the label if it changed.
+  void commit_text_buffer_();
+  char* staging_buffer_() { return this->text_buffer_ + this->text_capacity_; }
+  /// Lock the staging area for writing or copying it, and return it.
+  char* lock_staging_();
+  void unlock_staging_();
+
+  // Fixed-capacity text buffer. Holds the displayed text followed by a
+  // staging area of the same size which new text is formatted into.
+  char* text_buffer_{nullptr};
+  size_t text_capacity_{0};
+  const char* format_{"%.1f"};
+#ifdef USE_GUI_RENDER_TASK
+  // Text is staged from the main loop and committed on the render task.
+  RenderLock staging_lock_;
+#endif
+  bool cache_{false};
+#ifdef USE_GUI_TEXT_CACHE
+  /// Draws the label from the gui's text cache where possible.
+  static void draw_cached_cb_(lv_event_t* event);
+#endif
+#ifdef USE_SENSOR
+  void apply_value_(float value) override { this->printf(this->format_, value); }
+#endif
+
  public:
-  void update();
+  /// Use a fixed-capacity buffer, at least 2 * capacity bytes long, for the
+  /// text instead of std::string. LVGL then references the buffer directly
+  /// and label updates don't allocate memory.
+  void set_text_buffer(char* buffer, size_t capacity);
+  void set_text(const char* val);
+  const char* get_text();
+  /// printf-style format used to show the value of a bound sensor.
+  void set_format(const char* format) { this->format_ = format; }
+  /// Draw the label from the gui's text cache, see TextCache.
+  void set_cache(bool cache) { this->cache_ = cache; }
+
   void setup() override;
-  void loop() override;
   void dump_config() override;
-  float get_setup_priority() const override {
-    return setup_priority::AFTER_BLUETOOTH;
-  }
 
   void print(const char* text);
   void print(int x, int y, const char* text);
+  void printf(const char* format, ...) __attribute__((format(printf, 2, 3)));
 #ifdef USE_TIME
   void strftime(const char* format, ESPTime time);
   void strftime(int x, int y, const char* format, ESPTime time);
 #endif
 };
+#endif
 
 #ifdef USE_CHECKBOX
-class GuiCheckbox : public GuiObject, public Component {
+/// Checkbox bound to a switch in both directions: the switch's state changes
+/// are pushed to the checkbox, and clicking the checkbox turns the switch on
+/// or off.
+class GuiCheckbox : public GuiObject {
  protected:
   switch_::Switch* switch_;
-  bool switch_state;
+  void apply_text_() override;
+  /// Show the state of the switch, unless it is already shown.
+  void apply_state_(bool state);
 
  public:
   void setup() override;
-  void loop() override;
   void dump_config() override;
-  float get_setup_priority() const override {
-    return setup_priority::AFTER_BLUETOOTH;
-  }
 
-  void set_switch(switch_::Switch* sw) { this->switch_ = sw; }
+  void set_switch(switch_::Switch* sw);
+  switch_::Switch* get_switch() { return this->switch_; }
   // Callback for events generated from the UI (e.g., someone clicked the UI,
   // and now need to update switch value)
   static void gui_event_callback(lv_event_t* event);
-  // Callback for events generated from the switch (e.g., someone changed switch
-  // via Home Assistant and now need to update GUI)
-  static void switch_event_callback(bool state);
 };
 #endif
 
@@ -78,6 +221,29 @@ class GuiCheckbox : public GuiObject, public Component {
 #endif
 
 #ifdef USE_BAR
+class GuiBar : public GuiObject {
+ protected:
+  int32_t min_value_{0};
+  int32_t max_value_{100};
+  lv_bar_mode_t mode_{LV_BAR_MODE_NORMAL};
+  lv_anim_enable_t animated_{LV_ANIM_ON};
+  float value_{0.0f};
+#ifdef USE_SENSOR
+  void apply_value_(float value) override { this->set_value(value); }
+#endif
+
+ public:
+  void setup() override;
+  void dump_config() override;
+
+  void set_range(int32_t min_value, int32_t max_value) {
+    this->min_value_ = min_value;
+    this->max_value_ = max_value;
+  }
+  void set_mode(lv_bar_mode_t mode) { this->mode_ = mode; }
+  void set_animated(lv_anim_enable_t animated) { this->animated_ = animated; }
+  void set_value(float value);
+};
 #endif
 
 #ifdef USE_BUTTON
@@ -89,7 +255,18 @@ class GuiCheckbox : public GuiObject, public Component {
 #ifdef USE_DROPDOWN
 #endif
 
-#ifdef USE_IMAGE
+#ifdef USE_IMG
+class GuiImage : public GuiObject {
+ protected:
+  const lv_img_dsc_t* src_{nullptr};
+
+ public:
+  void setup() override;
+  void dump_config() override;
+
+  /// Show another image, typically one generated from `images`.
+  void set_src(const lv_img_dsc_t* src);
+};
 #endif
 
 #ifdef USE_ROLLER
@@ -114,6 +291,57 @@ class GuiCheckbox : public GuiObject, public Component {
 #endif
 
 #ifdef USE_CHART
+/// Plots the history of sensors. Samples are decimated as they arrive: each
+/// column of the chart shows the minimum and maximum of a number of samples,
+/// kept in a ring buffer of fixed size which LVGL draws from directly. The
+/// plot sweeps across the chart rather than scrolling, so a new column only
+/// redraws its own part of the chart.
+class GuiChart : public GuiObject {
+ protected:
+  struct Series {
+    /// Ring buffer of 2 * columns points, a minimum and a maximum each.
+    lv_coord_t* points;
+    lv_color_t color;
+    lv_chart_series_t* series{nullptr};
+    /// Point written next. Owned by the thread running LVGL.
+    uint16_t next{0};
+    /// Column being collected. Owned by the main loop.
+    float min{NAN};
+    float max{NAN};
+    uint16_t min_at{0};
+    uint16_t max_at{0};
+    uint16_t samples{0};
+  };
+
+  float min_value_{0.0f};
+  float max_value_{100.0f};
+  uint16_t point_count_{2};
+  uint16_t samples_per_column_{1};
+  std::vector<Series> series_;
+
+  void release() override;
+  void add_sample_(size_t index, float value);
+  /// Append a column, from the thread running LVGL.
+  void push_column_(size_t index, lv_coord_t first, lv_coord_t second);
+  lv_coord_t to_coord_(float value);
+
+ public:
+  void setup() override;
+  void dump_config() override;
+
+  void set_range(float min_value, float max_value) {
+    this->min_value_ = min_value;
+    this->max_value_ = max_value;
+  }
+  /// Number of columns, and of samples shown by each of them.
+  void set_columns(uint16_t columns, uint16_t samples_per_column) {
+    this->point_count_ = 2 * columns;
+    this->samples_per_column_ = samples_per_column;
+  }
+  /// Plot a sensor. points must hold 2 * columns values.
+  void add_series(sensor::Sensor* sensor, lv_color_t color,
+                  lv_coord_t* points);
+};
 #endif
 
 #ifdef USE_COLORWHEEL
@@ -135,17 +363,21 @@ class GuiCheckbox : public GuiObject, public Component {
 #endif
 
 #ifdef USE_METER
-class GuiMeter : public GuiObject, public Component {
+class GuiMeter : public GuiObject {
  protected:
   // std::vector<esphome::sensor::Sensor *> sensors_;
-  
+  lv_meter_indicator_t* needle_{nullptr};
+  float value_{0.0f};
+  void release() override;
+#ifdef USE_SENSOR
+  void apply_value_(float value) override { this->set_value(value); }
+#endif
+
  public:
+  /// Move the needle to the given value on the meter's scale.
+  void set_value(float value);
   void setup() override;
-  void loop() override;
   void dump_config() override;
-  float get_setup_priority() const override {
-    return setup_priority::AFTER_BLUETOOTH;
-  }
 };
 #endif
 
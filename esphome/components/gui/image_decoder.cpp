@@ -0,0 +1,96 @@
+#include "image_decoder.h"
+
+#ifdef USE_GUI_IMAGE_RLE
+
+#include <algorithm>
+#include <cstring>
+
+namespace esphome {
+namespace gui {
+
+// The image data starts with a table holding the offset of every row
+// (uint32, little endian), followed by the rows. A row is a sequence of
+// packets, each starting with a count byte: with bit 7 set, the next pixel
+// repeats (count & 0x7F) + 1 times, otherwise count + 1 literal pixels
+// follow.
+
+static size_t rle_pixel_size(lv_img_cf_t cf) {
+  return cf == IMG_CF_RLE_ALPHA ? LV_IMG_PX_SIZE_ALPHA_BYTE : sizeof(lv_color_t);
+}
+
+static lv_res_t rle_info(lv_img_decoder_t *decoder, const void *src,
+                         lv_img_header_t *header) {
+  if (lv_img_src_get_type(src) != LV_IMG_SRC_VARIABLE) return LV_RES_INV;
+  const lv_img_dsc_t *img = static_cast<const lv_img_dsc_t *>(src);
+  switch (img->header.cf) {
+    case IMG_CF_RLE:
+      header->cf = LV_IMG_CF_RAW;
+      break;
+    case IMG_CF_RLE_ALPHA:
+      header->cf = LV_IMG_CF_RAW_ALPHA;
+      break;
+    case IMG_CF_RLE_CHROMA_KEYED:
+      header->cf = LV_IMG_CF_RAW_CHROMA_KEYED;
+      break;
+    default:
+      return LV_RES_INV;
+  }
+  header->always_zero = 0;
+  header->w = img->header.w;
+  header->h = img->header.h;
+  return LV_RES_OK;
+}
+
+static lv_res_t rle_open(lv_img_decoder_t *decoder,
+                         lv_img_decoder_dsc_t *dsc) {
+  // No decoded image to hand out, LVGL falls back to rle_read_line().
+  dsc->img_data = nullptr;
+  return LV_RES_OK;
+}
+
+static lv_res_t rle_read_line(lv_img_decoder_t *decoder,
+                              lv_img_decoder_dsc_t *dsc, lv_coord_t x,
+                              lv_coord_t y, lv_coord_t len, uint8_t *buf) {
+  const lv_img_dsc_t *img = static_cast<const lv_img_dsc_t *>(dsc->src);
+  const size_t px_size = rle_pixel_size(img->header.cf);
+  uint32_t offset;
+  memcpy(&offset, img->data + y * sizeof(uint32_t), sizeof(offset));
+  const uint8_t *in = img->data + offset;
+
+  lv_coord_t skip = x;
+  while (len > 0) {
+    const uint8_t count = *in++;
+    const bool run = count & 0x80;
+    lv_coord_t n = (count & 0x7F) + 1;
+    const uint8_t *next = in + (run ? px_size : n * px_size);
+    if (skip >= n) {
+      skip -= n;
+      in = next;
+      continue;
+    }
+    n = std::min<lv_coord_t>(n - skip, len);
+    if (run) {
+      for (lv_coord_t i = 0; i < n; i++, buf += px_size)
+        memcpy(buf, in, px_size);
+    } else {
+      memcpy(buf, in + skip * px_size, n * px_size);
+      buf += n * px_size;
+    }
+    skip = 0;
+    len -= n;
+    in = next;
+  }
+  return LV_RES_OK;
+}
+
+void register_rle_image_decoder() {
+  lv_img_decoder_t *decoder = lv_img_decoder_create();
+  lv_img_decoder_set_info_cb(decoder, rle_info);
+  lv_img_decoder_set_open_cb(decoder, rle_open);
+  lv_img_decoder_set_read_line_cb(decoder, rle_read_line);
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,26 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_IMAGE_RLE
+
+#include "lvgl.h"
+
+namespace esphome {
+namespace gui {
+
+/// Color formats of images compressed at build time, see images.py. Pixels
+/// are decoded to LV_IMG_CF_TRUE_COLOR, LV_IMG_CF_TRUE_COLOR_ALPHA and
+/// LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED respectively.
+static const lv_img_cf_t IMG_CF_RLE = LV_IMG_CF_USER_ENCODED_0;
+static const lv_img_cf_t IMG_CF_RLE_ALPHA = LV_IMG_CF_USER_ENCODED_1;
+static const lv_img_cf_t IMG_CF_RLE_CHROMA_KEYED = LV_IMG_CF_USER_ENCODED_2;
+
+/// Register the LVGL image decoder for RLE compressed images. They are
+/// decoded line by line while drawing, so no RAM is needed for the pixels.
+void register_rle_image_decoder();
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,196 @@
+"""Conversion of images into LVGL image descriptors in the display's native
+color format, so no pixel conversion happens on the device.
+
+Pixels are stored the way lv_color_t holds them for the configured
+LV_COLOR_DEPTH and LV_COLOR_16_SWAP, followed by an alpha byte per pixel for
+images with an alpha channel. RLE compressed images are decoded line by line
+by the decoder in image_decoder.cpp.
+"""
+import logging
+from pathlib import Path
+
+from esphome.core import EsphomeError
+
+from .assets import asset_key, hex_lines, remove_stale_assets, write_asset
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bump whenever the generated source changes, to invalidate cached images.
+GENERATOR_VERSION = 1
+
+TRANSPARENCY_OPAQUE = "opaque"
+TRANSPARENCY_ALPHA = "alpha"
+TRANSPARENCY_CHROMA_KEY = "chroma_key"
+
+COMPRESSION_NONE = "none"
+COMPRESSION_RLE = "rle"
+
+# Color formats of uncompressed images, and of RLE compressed ones as
+# defined in image_decoder.h.
+COLOR_FORMATS = {
+    (COMPRESSION_NONE, TRANSPARENCY_OPAQUE): "LV_IMG_CF_TRUE_COLOR",
+    (COMPRESSION_NONE, TRANSPARENCY_ALPHA): "LV_IMG_CF_TRUE_COLOR_ALPHA",
+    (COMPRESSION_NONE, TRANSPARENCY_CHROMA_KEY): "LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED",
+    (COMPRESSION_RLE, TRANSPARENCY_OPAQUE): "LV_IMG_CF_USER_ENCODED_0",
+    (COMPRESSION_RLE, TRANSPARENCY_ALPHA): "LV_IMG_CF_USER_ENCODED_1",
+    (COMPRESSION_RLE, TRANSPARENCY_CHROMA_KEY): "LV_IMG_CF_USER_ENCODED_2",
+}
+
+# LV_COLOR_CHROMA_KEY, pure green
+CHROMA_KEY = (0, 255, 0)
+
+# Longest run or literal sequence of a single RLE packet
+RLE_MAX_COUNT = 128
+
+
+def image_symbol(name):
+    """Name of the lv_img_dsc_t generated for the image with the given ID"""
+    return f"gui_image_{name}"
+
+
+def encode_color(r, g, b, color_depth, swap):
+    """Bytes of an lv_color_t, matching lv_color_make()"""
+    if color_depth == 32:
+        return bytes((b, g, r, 0xFF))
+    if color_depth == 16:
+        value = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+        return value.to_bytes(2, "big" if swap else "little")
+    if color_depth == 8:
+        return bytes(((r >> 5) << 5 | (g >> 5) << 2 | b >> 6,))
+    return bytes((int((r | g | b) >= 0x80),))
+
+
+def _convert(path, resize, color_depth, swap, transparency):
+    from PIL import Image
+
+    image = Image.open(path)
+    if resize is not None:
+        image.thumbnail(resize)
+    image = image.convert("RGBA")
+    if image.width > 2047 or image.height > 2047:
+        # Dimensions are stored in 11 bits.
+        raise EsphomeError(f"{path}: images can't be larger than 2047x2047 pixels")
+    if transparency is None:
+        transparency = (
+            TRANSPARENCY_ALPHA
+            if image.getextrema()[3][0] < 0xFF
+            else TRANSPARENCY_OPAQUE
+        )
+
+    pixels = []
+    for r, g, b, a in image.getdata():
+        if transparency == TRANSPARENCY_CHROMA_KEY and a < 0x80:
+            r, g, b = CHROMA_KEY
+        pixel = encode_color(r, g, b, color_depth, swap)
+        if transparency == TRANSPARENCY_ALPHA:
+            # 32 bit colors carry alpha in the color itself.
+            pixel = pixel[:3] + bytes((a,)) if color_depth == 32 else pixel + bytes((a,))
+        pixels.append(pixel)
+    return image.width, image.height, transparency, pixels
+
+
+def _rle_row(pixels):
+    """Packets of a row: a count byte with bit 7 set is followed by a pixel
+    repeated (count & 0x7F) + 1 times, otherwise count + 1 literal pixels
+    follow."""
+    data = bytearray()
+    literals = []
+
+    def flush_literals():
+        while literals:
+            chunk = literals[:RLE_MAX_COUNT]
+            del literals[:RLE_MAX_COUNT]
+            data.append(len(chunk) - 1)
+            for pixel in chunk:
+                data.extend(pixel)
+
+    i = 0
+    while i < len(pixels):
+        run = 1
+        while (
+            i + run < len(pixels)
+            and run < RLE_MAX_COUNT
+            and pixels[i + run] == pixels[i]
+        ):
+            run += 1
+        if run >= 2:
+            flush_literals()
+            data.append(0x80 | (run - 1))
+            data += pixels[i]
+        else:
+            literals.append(pixels[i])
+        i += run
+    flush_literals()
+    return data
+
+
+def _rle(width, height, pixels):
+    """Offsets of every row (uint32, little endian) followed by the rows"""
+    rows = [_rle_row(pixels[y * width : (y + 1) * width]) for y in range(height)]
+    offset = 4 * height
+    table = bytearray()
+    for row in rows:
+        table += offset.to_bytes(4, "little")
+        offset += len(row)
+    return bytes(table) + b"".join(rows)
+
+
+def _image_source(name, source, width, height, color_format, data):
+    return f"""/* Generated by the esphome gui component, do not edit.
+ * Source: {source}, {width}x{height}, {color_format}
+ */
+#include "lvgl.h"
+
+static LV_ATTRIBUTE_LARGE_CONST const uint8_t data[] __attribute__((aligned(4))) = {{
+{hex_lines(data)}
+}};
+
+const lv_img_dsc_t {image_symbol(name)} = {{
+    .header.cf = {color_format},
+    .header.always_zero = 0,
+    .header.reserved = 0,
+    .header.w = {width},
+    .header.h = {height},
+    .data_size = {len(data)},
+    .data = data,
+}};
+"""
+
+
+def generate_image(
+    name, path, resize, color_depth, swap, transparency, compression
+):
+    """Write the C source of an image into the build tree, converting it only
+    if no cached copy for the same inputs exists."""
+
+    def render():
+        width, height, used_transparency, pixels = _convert(
+            path, resize, color_depth, swap, transparency
+        )
+        raw = b"".join(pixels)
+        data = raw
+        if compression == COMPRESSION_RLE:
+            data = _rle(width, height, pixels)
+            if len(data) >= len(raw):
+                _LOGGER.warning(
+                    "GUI image %s doesn't compress well, %u bytes compressed, %u uncompressed",
+                    name,
+                    len(data),
+                    len(raw),
+                )
+        _LOGGER.info(
+            "GUI image %s: %ux%u, %s, %u bytes", name, width, height, used_transparency, len(data)
+        )
+        color_format = COLOR_FORMATS[(compression, used_transparency)]
+        return _image_source(name, Path(path).name, width, height, color_format, data)
+
+    key = asset_key(
+        path, GENERATOR_VERSION, resize, color_depth, swap, transparency, compression
+    )
+    if write_asset("images", name, key, render):
+        _LOGGER.info("GUI image %s (cached)", name)
+
+
+def remove_stale_images(names):
+    """Delete generated images which are no longer part of the configuration"""
+    remove_stale_assets("images", names)
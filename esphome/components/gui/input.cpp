@@ -0,0 +1,119 @@
+#include "input.h"
+
+#ifdef USE_GUI_INPUT
+
+#include "esphome/core/hal.h"
+#include "esphome/core/log.h"
+#include "gui.h"
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.input";
+// How long the high frequency loop is kept after the last event, so that
+// a knob being turned is followed without lag.
+static const uint32_t INPUT_ACTIVE_MS = 1000;
+
+void GuiInput::setup(uint32_t read_period) {
+  lv_indev_drv_init(&this->drv_);
+  this->drv_.type = this->type_;
+  this->drv_.read_cb = read_cb_;
+  this->drv_.user_data = this;
+  this->indev_ = lv_indev_drv_register(&this->drv_);
+  lv_timer_set_period(this->drv_.read_timer, read_period);
+  // Resumed by poll() once there is something to read.
+  lv_timer_pause(this->drv_.read_timer);
+}
+
+void GuiInput::poll() {
+  if (this->indev_ == nullptr || this->queue_.empty()) return;
+  lv_timer_resume(this->drv_.read_timer);
+  lv_timer_ready(this->drv_.read_timer);
+}
+
+void GuiInput::loop() {
+  if (this->active_ &&
+      esphome::millis() - this->last_event_ > INPUT_ACTIVE_MS) {
+    this->high_freq_.stop();
+    this->active_ = false;
+  }
+}
+
+void GuiInput::dump_config() {
+  ESP_LOGCONFIG(TAG, "Input: %s, %u events dropped",
+                this->type_ == LV_INDEV_TYPE_ENCODER ? "rotary encoder"
+                                                     : "touchscreen",
+                (unsigned) this->dropped_);
+}
+
+void GuiInput::push_(const InputEvent &event) {
+  if (!this->queue_.push(event)) {
+    this->dropped_++;
+    ESP_LOGV(TAG, "Event queue full, dropped event");
+  }
+  this->high_freq_.start();
+  this->active_ = true;
+  this->last_event_ = esphome::millis();
+  this->gui_->wake();
+}
+
+void GuiInput::read_cb_(lv_indev_drv_t *drv, lv_indev_data_t *data) {
+  GuiInput *input = (GuiInput *) drv->user_data;
+  InputEvent event;
+  data->enc_diff = 0;
+  if (input->queue_.pop(event)) {
+    input->state_ = event;
+    data->enc_diff = event.diff;
+    input->gui_->input_read(event.time_us);
+  }
+  data->point.x = input->state_.x;
+  data->point.y = input->state_.y;
+  data->state =
+      input->state_.pressed ? LV_INDEV_STATE_PRESSED : LV_INDEV_STATE_RELEASED;
+  data->continue_reading = !input->queue_.empty();
+  // LVGL keeps polling while pressed to detect long presses, and until a
+  // scroll thrown by a released pointer has come to rest.
+  if (data->continue_reading || input->state_.pressed) return;
+  if (input->type_ == LV_INDEV_TYPE_POINTER &&
+      input->indev_->proc.types.pointer.scroll_obj != nullptr)
+    return;
+  lv_timer_pause(drv->read_timer);
+}
+
+#ifdef USE_GUI_ROTARY_ENCODER
+void GuiRotaryEncoder::set_sensor(rotary_encoder::RotaryEncoderSensor *sensor) {
+  sensor->add_on_clockwise_callback([this]() { this->push_state_(1); });
+  sensor->add_on_anticlockwise_callback([this]() { this->push_state_(-1); });
+}
+
+#ifdef USE_BINARY_SENSOR
+void GuiRotaryEncoder::set_button(binary_sensor::BinarySensor *button) {
+  button->add_on_state_callback([this](bool state) {
+    this->pressed_ = state;
+    this->push_state_(0);
+  });
+}
+#endif
+
+void GuiRotaryEncoder::push_state_(int16_t diff) {
+  this->push_({diff, 0, 0, this->pressed_, micros()});
+}
+#endif
+
+#ifdef USE_GUI_TOUCHSCREEN
+void GuiTouchscreen::touch(touchscreen::TouchPoint tp) {
+  this->x_ = tp.x;
+  this->y_ = tp.y;
+  this->push_({0, tp.x, tp.y, true, micros()});
+}
+
+void GuiTouchscreen::release() {
+  // LVGL expects the point where the pointer was lifted.
+  this->push_({0, this->x_, this->y_, false, micros()});
+}
+#endif
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,154 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_INPUT
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+
+#include "esphome/core/helpers.h"
+#include "lvgl.h"
+
+#ifdef USE_GUI_ROTARY_ENCODER
+#include "esphome/components/rotary_encoder/rotary_encoder.h"
+#ifdef USE_BINARY_SENSOR
+#include "esphome/components/binary_sensor/binary_sensor.h"
+#endif
+#endif
+#ifdef USE_GUI_TOUCHSCREEN
+#include "esphome/components/touchscreen/touchscreen.h"
+#endif
+
+namespace esphome {
+namespace gui {
+
+class GuiComponent;
+
+/// State of an input device after a change.
+struct InputEvent {
+  /// Detents turned since the previous event, encoders only.
+  int16_t diff;
+  /// Touched point, pointers only.
+  uint16_t x;
+  uint16_t y;
+  bool pressed;
+  /// micros() when the event arrived, to measure input latency.
+  uint32_t time_us;
+};
+
+/// Queue of fixed size between exactly one producer and one consumer thread,
+/// which neither of them ever waits on.
+template<typename T, size_t N> class EventQueue {
+ public:
+  /// Returns false, dropping the item, if the queue is full.
+  bool push(const T &item) {
+    size_t head = this->head_.load(std::memory_order_relaxed);
+    size_t next = (head + 1) % N;
+    if (next == this->tail_.load(std::memory_order_acquire)) return false;
+    this->items_[head] = item;
+    this->head_.store(next, std::memory_order_release);
+    return true;
+  }
+  bool pop(T &item) {
+    size_t tail = this->tail_.load(std::memory_order_relaxed);
+    if (tail == this->head_.load(std::memory_order_acquire)) return false;
+    item = this->items_[tail];
+    this->tail_.store((tail + 1) % N, std::memory_order_release);
+    return true;
+  }
+  bool empty() const {
+    return this->tail_.load(std::memory_order_acquire) ==
+           this->head_.load(std::memory_order_acquire);
+  }
+
+ protected:
+  T items_[N];
+  std::atomic<size_t> head_{0};
+  std::atomic<size_t> tail_{0};
+};
+
+/// An LVGL input device fed by ESPHome callbacks.
+///
+/// Events are queued on the main loop and wake the GuiComponent, which has
+/// LVGL read them right away. LVGL only polls the device while it is pressed
+/// or a scroll is still moving, rather than every LV_INDEV_DEF_READ_PERIOD.
+class GuiInput {
+ public:
+  explicit GuiInput(lv_indev_type_t type) : type_(type) {}
+
+  void set_gui(GuiComponent *gui) { this->gui_ = gui; }
+  lv_indev_type_t get_type() const { return this->type_; }
+  lv_indev_t *get_indev() const { return this->indev_; }
+
+  /// Register the LVGL input device, polled every read_period ms while
+  /// pressed. Must be called from the thread running LVGL.
+  void setup(uint32_t read_period);
+  /// Have LVGL read the device on this timer handler run if events are
+  /// waiting. Must be called from the thread running LVGL.
+  void poll();
+  /// Release the high frequency loop once the device has been idle a while.
+  void loop();
+  void dump_config();
+
+ protected:
+  /// Queue an event, from the main loop.
+  void push_(const InputEvent &event);
+  static void read_cb_(lv_indev_drv_t *drv, lv_indev_data_t *data);
+
+  GuiComponent *gui_{nullptr};
+  lv_indev_type_t type_;
+  lv_indev_drv_t drv_{};
+  lv_indev_t *indev_{nullptr};
+  EventQueue<InputEvent, 16> queue_;
+  /// State last read by LVGL.
+  InputEvent state_{};
+  uint32_t dropped_{0};
+  /// Kept while the device is in use, so that ESPHome calls back without
+  /// waiting for the next regular loop iteration.
+  HighFrequencyLoopRequester high_freq_;
+  bool active_{false};
+  uint32_t last_event_{0};
+};
+
+#ifdef USE_GUI_ROTARY_ENCODER
+/// Navigates between the objects which can be focused, and edits them.
+class GuiRotaryEncoder : public GuiInput {
+ public:
+  GuiRotaryEncoder() : GuiInput(LV_INDEV_TYPE_ENCODER) {}
+
+  void set_sensor(rotary_encoder::RotaryEncoderSensor *sensor);
+#ifdef USE_BINARY_SENSOR
+  /// Button which presses the focused object, or toggles editing it.
+  void set_button(binary_sensor::BinarySensor *button);
+#endif
+
+ protected:
+  void push_state_(int16_t diff);
+
+  bool pressed_{false};
+};
+#endif
+
+#ifdef USE_GUI_TOUCHSCREEN
+class GuiTouchscreen : public GuiInput, public touchscreen::TouchListener {
+ public:
+  GuiTouchscreen() : GuiInput(LV_INDEV_TYPE_POINTER) {}
+
+  void set_touchscreen(touchscreen::Touchscreen *touchscreen) {
+    touchscreen->register_listener(this);
+  }
+  void touch(touchscreen::TouchPoint tp) override;
+  void release() override;
+
+ protected:
+  uint16_t x_{0};
+  uint16_t y_{0};
+};
+#endif
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
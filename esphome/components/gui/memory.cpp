@@ -0,0 +1,126 @@
+#include "memory.h"
+
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+
+#include "esphome/core/defines.h"
+#include "esphome/core/helpers.h"
+#include "esphome/core/log.h"
+#include "lvgl.h"
+
+#ifdef USE_ESP32
+#include <esp_heap_caps.h>
+#endif
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.memory";
+
+#ifdef USE_GUI_MEM_HEAP
+/// Precedes every block handed to LVGL, which doesn't pass sizes to free(),
+/// so usage can be tracked.
+struct alignas(8) BlockHeader {
+  size_t size;
+};
+
+static size_t used_bytes = 0;
+static size_t max_used_bytes = 0;
+#endif
+
+MemoryUsage get_memory_usage() {
+  MemoryUsage usage;
+#ifdef USE_GUI_MEM_HEAP
+  usage.used = used_bytes;
+  usage.max_used = max_used_bytes;
+#ifdef USE_ESP32
+  size_t free_size = heap_caps_get_free_size(MALLOC_CAP_8BIT);
+  usage.total = used_bytes + free_size;
+  if (free_size > 0)
+    usage.frag_pct = 100 - heap_caps_get_largest_free_block(MALLOC_CAP_8BIT) *
+                               100 / free_size;
+#endif
+#else
+  lv_mem_monitor_t mon;
+  lv_mem_monitor(&mon);
+  usage.total = mon.total_size;
+  usage.used = mon.total_size - mon.free_size;
+  usage.max_used = mon.max_used;
+  usage.frag_pct = mon.frag_pct;
+#endif
+  return usage;
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+using esphome::ExternalRAMAllocator;
+
+#ifdef USE_GUI_MEM_HEAP
+using esphome::gui::BlockHeader;
+using esphome::gui::max_used_bytes;
+using esphome::gui::used_bytes;
+
+extern "C" void *gui_mem_alloc(size_t size) {
+  size_t total = sizeof(BlockHeader) + size;
+  uint8_t *block = nullptr;
+  if (size <= GUI_MEM_INTERNAL_THRESHOLD) {
+#ifdef USE_ESP32
+    block = static_cast<uint8_t *>(
+        heap_caps_malloc(total, MALLOC_CAP_INTERNAL | MALLOC_CAP_8BIT));
+#else
+    block = static_cast<uint8_t *>(malloc(total));  // NOLINT
+#endif
+  }
+  if (block == nullptr) {
+    // Large blocks, and small ones once internal RAM is exhausted.
+    ExternalRAMAllocator<uint8_t> allocator(
+        ExternalRAMAllocator<uint8_t>::ALLOW_FAILURE);
+    block = allocator.allocate(total);
+  }
+  if (block == nullptr) return nullptr;
+  reinterpret_cast<BlockHeader *>(block)->size = size;
+  used_bytes += size;
+  max_used_bytes = std::max(max_used_bytes, used_bytes);
+  return block + sizeof(BlockHeader);
+}
+
+extern "C" void gui_mem_free(void *ptr) {
+  if (ptr == nullptr) return;
+  uint8_t *block = static_cast<uint8_t *>(ptr) - sizeof(BlockHeader);
+  used_bytes -= reinterpret_cast<BlockHeader *>(block)->size;
+  free(block);  // NOLINT
+}
+
+extern "C" void *gui_mem_realloc(void *ptr, size_t size) {
+  if (ptr == nullptr) return gui_mem_alloc(size);
+  if (size == 0) {
+    gui_mem_free(ptr);
+    return nullptr;
+  }
+  // Rather than realloc(), so the block moves between internal and external
+  // RAM when it crosses the threshold.
+  void *moved = gui_mem_alloc(size);
+  if (moved == nullptr) return nullptr;
+  const BlockHeader *header = reinterpret_cast<const BlockHeader *>(
+      static_cast<uint8_t *>(ptr) - sizeof(BlockHeader));
+  memcpy(moved, ptr, std::min(header->size, size));
+  gui_mem_free(ptr);
+  return moved;
+}
+#endif
+
+extern "C" void *gui_mem_pool_alloc(size_t size) {
+  ExternalRAMAllocator<uint8_t> allocator(
+      ExternalRAMAllocator<uint8_t>::ALLOW_FAILURE);
+  uint8_t *pool = allocator.allocate(size);
+  if (pool == nullptr) {
+    // LVGL can't run without its pool, and lv_init() doesn't check for it.
+    ESP_LOGE(esphome::gui::TAG,
+             "Could not allocate LVGL memory pool of %u bytes",
+             (unsigned) size);
+    abort();
+  }
+  return pool;
+}
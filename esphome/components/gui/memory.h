@@ -0,0 +1,45 @@
+#pragma once
+
+// Included by LVGL's own (C) sources as LV_MEM_CUSTOM_INCLUDE or
+// LV_MEM_POOL_INCLUDE, depending on the configured allocator.
+
+#include <stddef.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+/// LV_MEM_CUSTOM_ALLOC: blocks larger than GUI_MEM_INTERNAL_THRESHOLD go to
+/// external RAM where available, smaller ones stay in internal RAM.
+void *gui_mem_alloc(size_t size);
+/// LV_MEM_CUSTOM_FREE
+void gui_mem_free(void *ptr);
+/// LV_MEM_CUSTOM_REALLOC
+void *gui_mem_realloc(void *ptr, size_t size);
+/// LV_MEM_POOL_ALLOC: allocates LVGL's memory pool in external RAM.
+void *gui_mem_pool_alloc(size_t size);
+
+#ifdef __cplusplus
+}
+
+#include <cstdint>
+
+namespace esphome {
+namespace gui {
+
+/// Memory used by LVGL, whichever allocator it is configured with.
+struct MemoryUsage {
+  /// Size of the pool, or of the heap LVGL allocates from. 0 if unknown.
+  size_t total{0};
+  size_t used{0};
+  /// Highest value of used since boot.
+  size_t max_used{0};
+  uint8_t frag_pct{0};
+};
+
+/// Must be called from the thread running LVGL.
+MemoryUsage get_memory_usage();
+
+}  // namespace gui
+}  // namespace esphome
+#endif
@@ -0,0 +1,38 @@
+#include "page.h"
+
+#include "esphome/core/log.h"
+#include "gui.h"
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.page";
+
+void GuiPage::show() { this->gui_->show_page(this); }
+
+void GuiPage::create() {
+  if (this->screen_ != nullptr) return;
+  this->screen_ = lv_obj_create(nullptr);
+  for (size_t i = 0; i < this->style_count_; i++)
+    lv_obj_add_style(this->screen_, this->styles_[i].style,
+                     this->styles_[i].selector);
+  for (size_t i = 0; i < this->widget_count_; i++) this->widgets_[i]->setup();
+}
+
+void GuiPage::release() {
+  if (this->screen_ == nullptr) return;
+  for (size_t i = 0; i < this->widget_count_; i++) this->widgets_[i]->release();
+  this->screen_ = nullptr;
+}
+
+void GuiPage::dump_config() {
+  static const char *const POLICIES[] = {"eager", "lazy", "destroy"};
+  ESP_LOGCONFIG(TAG, "Page: %u widgets, %s, %s",
+                (unsigned) this->widget_count_, POLICIES[this->policy_],
+                this->screen_ != nullptr ? "created" : "not created");
+  for (size_t i = 0; i < this->widget_count_; i++)
+    this->widgets_[i]->dump_config();
+}
+
+}  // namespace gui
+}  // namespace esphome
@@ -0,0 +1,65 @@
+#pragma once
+
+#include <cstddef>
+
+#include "gui_objects.h"
+#include "lvgl.h"
+
+namespace esphome {
+namespace gui {
+
+class GuiComponent;
+
+enum PagePolicy {
+  /// Created at boot and kept.
+  PAGE_POLICY_EAGER = 0,
+  /// Created when first shown and kept.
+  PAGE_POLICY_LAZY,
+  /// Created whenever shown, deleted again when another page is shown.
+  PAGE_POLICY_DESTROY,
+};
+
+/// A screen and the objects on it. Only the objects of the page shown are
+/// drawn; pages which haven't been created don't take any LVGL memory.
+class GuiPage {
+ public:
+  void set_gui(GuiComponent *gui) { this->gui_ = gui; }
+  void set_policy(PagePolicy policy) { this->policy_ = policy; }
+  /// Objects on the page, in order.
+  void set_widgets(GuiObject *const *widgets, size_t count) {
+    this->widgets_ = widgets;
+    this->widget_count_ = count;
+  }
+  /// Styles of the screen, in order of precedence.
+  void set_styles(const GuiStyleRef *styles, size_t count) {
+    this->styles_ = styles;
+    this->style_count_ = count;
+  }
+
+  PagePolicy get_policy() const { return this->policy_; }
+  /// The page's screen, nullptr unless it is created.
+  lv_obj_t *get_screen() const { return this->screen_; }
+
+  /// Show the page, from any thread.
+  void show();
+
+  /// Create the screen and the objects on it, unless it exists already.
+  /// Must be called from the thread running LVGL.
+  void create();
+  /// Forget the screen and the objects on it, which the caller has LVGL
+  /// delete. They are created again by the next create().
+  void release();
+  void dump_config();
+
+ protected:
+  GuiComponent *gui_{nullptr};
+  PagePolicy policy_{PAGE_POLICY_EAGER};
+  GuiObject *const *widgets_{nullptr};
+  size_t widget_count_{0};
+  const GuiStyleRef *styles_{nullptr};
+  size_t style_count_{0};
+  lv_obj_t *screen_{nullptr};
+};
+
+}  // namespace gui
+}  // namespace esphome
@@ -0,0 +1,94 @@
+#include "render_task.h"
+
+#ifdef USE_GUI_RENDER_TASK
+
+#include "esphome/core/log.h"
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.render_task";
+
+void RenderLock::lock() { this->mutex_.lock(); }
+void RenderLock::unlock() { this->mutex_.unlock(); }
+
+bool RenderTask::start(std::function<uint32_t()> &&body) {
+  if (this->running_) return true;
+  this->body_ = std::move(body);
+#ifdef USE_HOST
+  this->thread_ = std::thread([this]() { this->run_(); });
+  this->thread_.detach();
+#else
+  BaseType_t core = this->core_;
+  if (core >= portNUM_PROCESSORS) core = tskNO_AFFINITY;
+  BaseType_t res =
+      xTaskCreatePinnedToCore(task_func_, "gui_render", this->stack_size_,
+                              this, this->priority_, &this->handle_, core);
+  if (res != pdPASS) {
+    ESP_LOGE(TAG, "Could not create render task");
+    return false;
+  }
+#endif
+  this->running_ = true;
+  ESP_LOGD(TAG, "Render task started");
+  return true;
+}
+
+#ifndef USE_HOST
+void RenderTask::task_func_(void *arg) { ((RenderTask *)arg)->run_(); }
+#endif
+
+void RenderTask::enqueue(std::function<void()> &&command,
+                         const char *source) {
+  this->queue_lock_.lock();
+  this->queue_.push_back(Command{std::move(command), source});
+  this->queue_lock_.unlock();
+  this->notify();
+}
+
+void RenderTask::notify() {
+#ifdef USE_HOST
+  {
+    std::lock_guard<std::mutex> guard(this->wake_mutex_);
+    this->notified_ = true;
+  }
+  this->wake_.notify_one();
+#else
+  if (this->handle_ != nullptr) xTaskNotifyGive(this->handle_);
+#endif
+}
+
+void RenderTask::sleep_(uint32_t ms) {
+#ifdef USE_HOST
+  std::unique_lock<std::mutex> guard(this->wake_mutex_);
+  this->wake_.wait_for(guard, std::chrono::milliseconds(ms),
+                       [this]() { return this->notified_; });
+  this->notified_ = false;
+#else
+  TickType_t ticks = pdMS_TO_TICKS(ms);
+  ulTaskNotifyTake(pdTRUE, ticks > 0 ? ticks : 1);
+#endif
+}
+
+void RenderTask::run_() {
+  while (true) {
+    // Swap the queue out so that producers are only blocked for as long
+    // as it takes to move the pointers around.
+    this->queue_lock_.lock();
+    this->pending_.swap(this->queue_);
+    this->queue_lock_.unlock();
+    for (auto &command : this->pending_) {
+      this->source_ = command.source;
+      command.run();
+    }
+    this->source_ = nullptr;
+    this->pending_.clear();
+
+    this->sleep_(this->body_());
+  }
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,105 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_RENDER_TASK
+
+#include <atomic>
+#include <functional>
+#include <vector>
+
+#ifdef USE_HOST
+#include <condition_variable>
+#include <mutex>
+#include <thread>
+#else
+#include <freertos/FreeRTOS.h>
+#include <freertos/task.h>
+#endif
+
+#include "esphome/core/helpers.h"
+
+namespace esphome {
+namespace gui {
+
+/// Mutex which, unlike esphome::Mutex, also locks on the host platform.
+class RenderLock {
+ public:
+  void lock();
+  void unlock();
+
+ protected:
+#ifdef USE_HOST
+  std::mutex mutex_;
+#else
+  Mutex mutex_;
+#endif
+};
+
+/// Runs the GUI rendering loop on its own thread: a pinned FreeRTOS task on
+/// ESP32, or a std::thread on the host platform.
+///
+/// Other threads must not call LVGL directly while the task is running.
+/// Instead, they queue commands with enqueue(); the queue is drained by the
+/// render task before each iteration of the rendering loop.
+class RenderTask {
+ public:
+  void set_core(int core) { this->core_ = core; }
+  void set_priority(uint32_t priority) { this->priority_ = priority; }
+  void set_stack_size(uint32_t stack_size) { this->stack_size_ = stack_size; }
+  int get_core() const { return this->core_; }
+  uint32_t get_priority() const { return this->priority_; }
+  uint32_t get_stack_size() const { return this->stack_size_; }
+
+  /// Start calling body() in a loop. Its return value is the number of
+  /// milliseconds to sleep before the next call, unless woken up earlier.
+  bool start(std::function<uint32_t()> &&body);
+  bool is_running() const { return this->running_; }
+
+  /// Queue a command to be run on the render task and wake it up. source
+  /// names what the command changes, see get_source().
+  void enqueue(std::function<void()> &&command, const char *source = nullptr);
+  /// Source of the command being run, nullptr in between. Must be called
+  /// from the render task.
+  const char *get_source() const { return this->source_; }
+  /// Wake the render task up before its sleep time has elapsed.
+  void notify();
+
+ protected:
+  void run_();
+  void sleep_(uint32_t ms);
+#ifndef USE_HOST
+  static void task_func_(void *arg);
+#endif
+
+  int core_{1};
+  uint32_t priority_{5};
+  uint32_t stack_size_{8192};
+  /// Set by the main thread once the task has been created.
+  std::atomic<bool> running_{false};
+
+  struct Command {
+    std::function<void()> run;
+    const char *source;
+  };
+
+  std::function<uint32_t()> body_;
+  std::vector<Command> queue_;
+  std::vector<Command> pending_;
+  const char *source_{nullptr};
+  RenderLock queue_lock_;
+
+#ifdef USE_HOST
+  std::thread thread_;
+  std::mutex wake_mutex_;
+  std::condition_variable wake_;
+  bool notified_{false};
+#else
+  TaskHandle_t handle_{nullptr};
+#endif
+};
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
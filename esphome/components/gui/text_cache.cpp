@@ -0,0 +1,233 @@
+#include "text_cache.h"
+
+#ifdef USE_GUI_TEXT_CACHE
+
+#include <cstdlib>
+#include <cstring>
+
+#include "esphome/core/helpers.h"
+
+namespace esphome {
+namespace gui {
+
+// Entries are aligned so their bitmaps can be accessed a color at a time.
+static const size_t ENTRY_ALIGN = 4;
+
+template<typename T> static uint32_t hash_value(uint32_t hash, const T &value) {
+  // FNV-1a
+  const uint8_t *bytes = reinterpret_cast<const uint8_t *>(&value);
+  for (size_t i = 0; i < sizeof(T); i++) hash = (hash ^ bytes[i]) * 16777619;
+  return hash;
+}
+
+bool TextCache::init(size_t size, bool in_psram) {
+  if (in_psram) {
+    ExternalRAMAllocator<uint8_t> allocator(
+        ExternalRAMAllocator<uint8_t>::ALLOW_FAILURE);
+    this->buffer_ = allocator.allocate(size);
+  } else {
+    this->buffer_ = static_cast<uint8_t *>(malloc(size));  // NOLINT
+  }
+  if (this->buffer_ == nullptr) return false;
+  this->size_ = size;
+  this->in_psram_ = in_psram;
+  return true;
+}
+
+bool TextCache::draw(lv_obj_t *obj, lv_draw_ctx_t *draw_ctx) {
+  // render_() has LVGL draw the label the usual way.
+  if (this->rendering_ || this->buffer_ == nullptr || !is_cacheable_(obj))
+    return false;
+  const char *text = lv_label_get_text(obj);
+  uint32_t key = key_(obj, text);
+  Entry *entry = this->find_(key, text);
+  if (entry != nullptr) {
+    this->hits_++;
+  } else {
+    this->misses_++;
+    lv_coord_t w = lv_obj_get_width(obj);
+    lv_coord_t h = lv_obj_get_height(obj);
+    size_t bitmap_size = (size_t) w * h * sizeof(lv_color_t);
+    entry = this->allocate_(bitmap_size + strlen(text) + 1);
+    if (entry == nullptr) return false;
+    entry->key = key;
+    entry->img.header.always_zero = 0;
+    entry->img.header.cf = LV_IMG_CF_TRUE_COLOR;
+    entry->img.header.w = w;
+    entry->img.header.h = h;
+    entry->img.data_size = bitmap_size;
+    entry->img.data = this->buffer_ + entry->offset;
+    strcpy((char *) this->buffer_ + entry->offset + bitmap_size, text);
+    if (!this->render_(obj, entry)) return false;
+  }
+  entry->last_used = ++this->clock_;
+
+  lv_draw_img_dsc_t img_dsc;
+  lv_draw_img_dsc_init(&img_dsc);
+  lv_draw_img(draw_ctx, &img_dsc, &obj->coords, &entry->img);
+  return true;
+}
+
+void TextCache::take_counts(uint32_t *hits, uint32_t *misses) {
+  *hits = this->hits_;
+  *misses = this->misses_;
+  this->hits_ = 0;
+  this->misses_ = 0;
+}
+
+bool TextCache::is_cacheable_(lv_obj_t *obj) {
+  // The bitmap has to cover the object, without anything showing through.
+  if (lv_obj_get_style_bg_opa(obj, LV_PART_MAIN) < LV_OPA_COVER ||
+      lv_obj_get_style_radius(obj, LV_PART_MAIN) != 0 ||
+      lv_obj_get_style_blend_mode(obj, LV_PART_MAIN) != LV_BLEND_MODE_NORMAL)
+    return false;
+  // Shadows and outlines are drawn around the object.
+  if (_lv_obj_get_ext_draw_size(obj) > 0) return false;
+  // Scrolling text moves on every frame.
+  lv_label_long_mode_t mode = lv_label_get_long_mode(obj);
+  return mode != LV_LABEL_LONG_SCROLL &&
+         mode != LV_LABEL_LONG_SCROLL_CIRCULAR &&
+         lv_obj_get_scroll_y(obj) == 0;
+}
+
+uint32_t TextCache::key_(lv_obj_t *obj, const char *text) {
+  // Everything the main part of a label is drawn from, besides its text.
+  const uint32_t part = LV_PART_MAIN;
+  uint32_t hash = 2166136261;
+  hash = hash_value(hash, lv_obj_get_width(obj));
+  hash = hash_value(hash, lv_obj_get_height(obj));
+  hash = hash_value(hash, lv_label_get_long_mode(obj));
+  hash = hash_value(hash, lv_label_get_recolor(obj));
+  hash = hash_value(hash, lv_obj_get_style_text_font(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_text_color(obj, part).full);
+  hash = hash_value(hash, lv_obj_get_style_text_opa(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_text_letter_space(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_text_line_space(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_text_align(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_text_decor(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_bg_color(obj, part).full);
+  hash = hash_value(hash, lv_obj_get_style_bg_grad_color(obj, part).full);
+  hash = hash_value(hash, lv_obj_get_style_bg_grad_dir(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_bg_main_stop(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_bg_grad_stop(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_bg_img_src(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_border_color(obj, part).full);
+  hash = hash_value(hash, lv_obj_get_style_border_width(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_border_opa(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_border_side(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_pad_left(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_pad_right(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_pad_top(obj, part));
+  hash = hash_value(hash, lv_obj_get_style_pad_bottom(obj, part));
+  for (const char *c = text; *c != '\0'; c++) hash = hash_value(hash, *c);
+  return hash;
+}
+
+TextCache::Entry *TextCache::find_(uint32_t key, const char *text) {
+  for (auto &entry : this->entries_) {
+    if (!entry.used || entry.key != key) continue;
+    const char *entry_text = (const char *) this->buffer_ + entry.offset +
+                             entry.img.data_size;
+    if (strcmp(entry_text, text) == 0) return &entry;
+  }
+  return nullptr;
+}
+
+TextCache::Entry *TextCache::allocate_(size_t size) {
+  size = (size + ENTRY_ALIGN - 1) & ~(ENTRY_ALIGN - 1);
+  if (size > this->size_) return nullptr;
+  while (true) {
+    Entry *slot = nullptr;
+    for (auto &entry : this->entries_) {
+      if (!entry.used) {
+        slot = &entry;
+        break;
+      }
+    }
+    size_t offset;
+    if (slot != nullptr && this->find_gap_(size, &offset)) {
+      slot->used = true;
+      slot->offset = offset;
+      slot->size = size;
+      return slot;
+    }
+    // Make room by dropping the entry which was drawn longest ago.
+    Entry *oldest = nullptr;
+    for (auto &entry : this->entries_) {
+      if (entry.used &&
+          (oldest == nullptr || entry.last_used < oldest->last_used))
+        oldest = &entry;
+    }
+    if (oldest == nullptr) return nullptr;
+    this->evict_(oldest);
+  }
+}
+
+bool TextCache::find_gap_(size_t size, size_t *offset) {
+  // There are few entries, so the lowest gap which fits is simply searched
+  // for by moving past whichever entry is in the way.
+  size_t start = 0;
+  while (start + size <= this->size_) {
+    const Entry *blocking = nullptr;
+    for (const auto &entry : this->entries_) {
+      if (entry.used && entry.offset < start + size &&
+          entry.offset + entry.size > start) {
+        blocking = &entry;
+        break;
+      }
+    }
+    if (blocking == nullptr) {
+      *offset = start;
+      return true;
+    }
+    start = blocking->offset + blocking->size;
+  }
+  return false;
+}
+
+void TextCache::evict_(Entry *entry) {
+  entry->used = false;
+  // LVGL's image cache may still refer to the bitmap.
+  lv_img_cache_invalidate_src(&entry->img);
+}
+
+bool TextCache::render_(lv_obj_t *obj, Entry *entry) {
+  // As lv_canvas_draw_text() does: LVGL draws into the bitmap through a
+  // display of its own, which covers just the object.
+  lv_area_t area = obj->coords;
+  lv_disp_drv_t drv;
+  lv_disp_drv_init(&drv);
+  drv.hor_res = lv_area_get_width(&area);
+  drv.ver_res = lv_area_get_height(&area);
+  lv_disp_t disp;
+  memset(&disp, 0, sizeof(disp));
+  disp.driver = &drv;
+
+  lv_draw_ctx_t *draw_ctx = (lv_draw_ctx_t *) lv_mem_alloc(drv.draw_ctx_size);
+  if (draw_ctx == nullptr) {
+    this->evict_(entry);
+    return false;
+  }
+  drv.draw_ctx_init(&drv, draw_ctx);
+  drv.draw_ctx = draw_ctx;
+  draw_ctx->buf = (void *) entry->img.data;
+  draw_ctx->buf_area = &area;
+  draw_ctx->clip_area = &area;
+
+  lv_disp_t *refreshing = _lv_refr_get_disp_refreshing();
+  _lv_refr_set_disp_refreshing(&disp);
+  this->rendering_ = true;
+  lv_event_send(obj, LV_EVENT_DRAW_MAIN, draw_ctx);
+  this->rendering_ = false;
+  _lv_refr_set_disp_refreshing(refreshing);
+
+  drv.draw_ctx_deinit(&drv, draw_ctx);
+  lv_mem_free(draw_ctx);
+  lv_img_cache_invalidate_src(&entry->img);
+  return true;
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,73 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_TEXT_CACHE
+
+#include <cstddef>
+#include <cstdint>
+
+#include "lvgl.h"
+
+namespace esphome {
+namespace gui {
+
+/// Labels as they were last drawn, kept as bitmaps in a buffer of fixed size
+/// and evicted least recently used first.
+///
+/// A label showing text it has shown before is copied from its bitmap
+/// instead of having each glyph blended again. Only labels on an opaque,
+/// square background without shadow or outline are cached: their bitmap
+/// then covers the whole object and is copied without blending, others are
+/// drawn as usual. All methods must be called from the thread running LVGL.
+class TextCache {
+ public:
+  /// Allocate the buffer, in external RAM if in_psram and available.
+  bool init(size_t size, bool in_psram);
+  /// Draw the main part of a label from the cache, rendering it into the
+  /// cache first if needed. Returns false if LVGL has to draw it as usual.
+  bool draw(lv_obj_t *obj, lv_draw_ctx_t *draw_ctx);
+
+  size_t get_size() const { return this->size_; }
+  bool is_in_psram() const { return this->in_psram_; }
+  /// Labels drawn from the cache and rendered into it since the previous
+  /// call.
+  void take_counts(uint32_t *hits, uint32_t *misses);
+
+ protected:
+  struct Entry {
+    bool used;
+    uint32_t key;
+    uint32_t last_used;
+    /// Bitmap followed by the text, in buffer_.
+    size_t offset;
+    size_t size;
+    lv_img_dsc_t img;
+  };
+  static const size_t MAX_ENTRIES = 16;
+
+  static bool is_cacheable_(lv_obj_t *obj);
+  static uint32_t key_(lv_obj_t *obj, const char *text);
+  Entry *find_(uint32_t key, const char *text);
+  /// Reserve size bytes, evicting entries until they fit.
+  Entry *allocate_(size_t size);
+  bool find_gap_(size_t size, size_t *offset);
+  void evict_(Entry *entry);
+  /// Have LVGL draw the label into the entry's bitmap.
+  bool render_(lv_obj_t *obj, Entry *entry);
+
+  uint8_t *buffer_{nullptr};
+  size_t size_{0};
+  bool in_psram_{false};
+  Entry entries_[MAX_ENTRIES]{};
+  uint32_t clock_{0};
+  /// Set while the cache has LVGL draw a label into it.
+  bool rendering_{false};
+  uint32_t hits_{0};
+  uint32_t misses_{0};
+};
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,107 @@
+#include "trace.h"
+
+#ifdef USE_GUI_TRACE
+
+#include <cinttypes>
+#include <cstdio>
+
+#include "esphome/core/helpers.h"
+#include "esphome/core/log.h"
+
+namespace esphome {
+namespace gui {
+
+static const char *const TAG = "gui.trace";
+
+bool RedrawTrace::init(uint32_t size) {
+  ExternalRAMAllocator<TraceEvent> allocator(
+      ExternalRAMAllocator<TraceEvent>::ALLOW_FAILURE);
+  this->events_ = allocator.allocate(size);
+  if (this->events_ == nullptr) return false;
+  this->size_ = size;
+  return true;
+}
+
+void RedrawTrace::add(TraceEventType type, const lv_area_t *area,
+                      const char *source, uint32_t frame,
+                      uint32_t timestamp_us, uint32_t duration_us) {
+  if (this->events_ == nullptr) return;
+  TraceEvent &event = this->events_[this->head_];
+  event.timestamp_us = timestamp_us;
+  event.duration_us = duration_us;
+  event.source = source;
+  event.area = *area;
+  event.frame = frame;
+  event.type = type;
+  this->head_ = (this->head_ + 1) % this->size_;
+  if (this->count_ < this->size_) this->count_++;
+}
+
+int RedrawTrace::format_event_(char *buffer, size_t size,
+                               const TraceEvent &event) {
+  const lv_area_t &a = event.area;
+  if (event.type == TRACE_EVENT_FLUSH) {
+    return snprintf(buffer, size,
+                    "{\"name\":\"flush\",\"cat\":\"gui\",\"ph\":\"X\","
+                    "\"ts\":%" PRIu32 ",\"dur\":%" PRIu32
+                    ",\"pid\":1,\"tid\":1,\"args\":{\"frame\":%" PRIu32
+                    ",\"x\":%d,\"y\":%d,\"w\":%d,\"h\":%d}}",
+                    event.timestamp_us, event.duration_us, event.frame, a.x1,
+                    a.y1, lv_area_get_width(&a), lv_area_get_height(&a));
+  }
+  // Invalidations are named after their source, so they can be told apart
+  // at a glance.
+  return snprintf(buffer, size,
+                  "{\"name\":\"%s\",\"cat\":\"invalidate\",\"ph\":\"i\","
+                  "\"s\":\"t\",\"ts\":%" PRIu32
+                  ",\"pid\":1,\"tid\":1,\"args\":{\"frame\":%" PRIu32
+                  ",\"x\":%d,\"y\":%d,\"w\":%d,\"h\":%d}}",
+                  event.source != nullptr ? event.source : "lvgl",
+                  event.timestamp_us, event.frame, a.x1, a.y1,
+                  lv_area_get_width(&a), lv_area_get_height(&a));
+}
+
+void RedrawTrace::dump() {
+  if (this->events_ == nullptr) return;
+  FILE *file = nullptr;
+#ifdef USE_HOST
+  if (!this->output_.empty()) {
+    file = fopen(this->output_.c_str(), "w");
+    if (file == nullptr)
+      ESP_LOGW(TAG, "Could not open %s for writing", this->output_.c_str());
+  }
+#endif
+  if (file != nullptr) {
+    fputs("{\"traceEvents\":[\n", file);
+  } else {
+    // Logged line by line, so the JSON is what's left after stripping the
+    // log prefixes.
+    ESP_LOGI(TAG, "Dumping %" PRIu32 " events:", this->count_);
+    ESP_LOGI(TAG, "{\"traceEvents\":[");
+  }
+  char buffer[192];
+  uint32_t first = (this->head_ + this->size_ - this->count_) % this->size_;
+  for (uint32_t i = 0; i < this->count_; i++) {
+    const TraceEvent &event = this->events_[(first + i) % this->size_];
+    format_event_(buffer, sizeof(buffer), event);
+    const char *separator = i + 1 < this->count_ ? "," : "";
+    if (file != nullptr) {
+      fprintf(file, "%s%s\n", buffer, separator);
+    } else {
+      ESP_LOGI(TAG, "%s%s", buffer, separator);
+    }
+  }
+  if (file != nullptr) {
+    fputs("]}\n", file);
+    fclose(file);
+    ESP_LOGI(TAG, "Wrote %" PRIu32 " events to %s", this->count_,
+             this->output_.c_str());
+  } else {
+    ESP_LOGI(TAG, "]}");
+  }
+}
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
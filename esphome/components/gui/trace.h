@@ -0,0 +1,60 @@
+#pragma once
+
+#include "esphome/core/defines.h"
+
+#ifdef USE_GUI_TRACE
+
+#include <cstdint>
+#include <string>
+
+#include "lvgl.h"
+
+namespace esphome {
+namespace gui {
+
+enum TraceEventType : uint8_t {
+  /// An area was invalidated, by source if known.
+  TRACE_EVENT_INVALIDATE = 0,
+  /// An area was sent to the display.
+  TRACE_EVENT_FLUSH,
+};
+
+struct TraceEvent {
+  uint32_t timestamp_us;
+  uint32_t duration_us;
+  const char *source;
+  lv_area_t area;
+  uint32_t frame;
+  TraceEventType type;
+};
+
+/// Ring buffer of the most recent invalidations and flushes, which can be
+/// dumped in the Chrome trace event format understood by chrome://tracing
+/// and Perfetto.
+class RedrawTrace {
+ public:
+  /// Allocate room for the given number of events.
+  bool init(uint32_t size);
+  void set_output(const std::string &output) { this->output_ = output; }
+  uint32_t get_size() const { return this->size_; }
+
+  void add(TraceEventType type, const lv_area_t *area, const char *source,
+           uint32_t frame, uint32_t timestamp_us, uint32_t duration_us = 0);
+  /// Write all events held to the log, or to the output file on the host.
+  void dump();
+
+ protected:
+  static int format_event_(char *buffer, size_t size, const TraceEvent &event);
+
+  TraceEvent *events_{nullptr};
+  uint32_t size_{0};
+  /// Index the next event is written to.
+  uint32_t head_{0};
+  uint32_t count_{0};
+  std::string output_{};
+};
+
+}  // namespace gui
+}  // namespace esphome
+
+#endif
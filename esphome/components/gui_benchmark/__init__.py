@@ -0,0 +1,127 @@
+import esphome.codegen as cg
+import esphome.config_validation as cv
+import esphome.final_validate as fv
+from esphome.components import gui
+from esphome.components.headless import display as headless_display
+from esphome.const import CONF_DURATION, CONF_ID, CONF_INTERVAL, CONF_NAME
+
+CODEOWNERS = ["@lukasz-tuz"]
+DEPENDENCIES = ["gui", "display"]
+
+CONF_GUI_ID = "gui_id"
+CONF_DISPLAY_ID = "display_id"
+CONF_WARMUP = "warmup"
+CONF_OUTPUT = "output"
+CONF_EXIT_WHEN_DONE = "exit_when_done"
+CONF_SCENARIOS = "scenarios"
+CONF_WIDGET_ID = "widget_id"
+
+CONF_CLOCK = "clock"
+CONF_LABEL_PRINT = "label_print"
+CONF_CHECKBOX_TOGGLE = "checkbox_toggle"
+CONF_METER_SWEEP = "meter_sweep"
+
+gui_benchmark_ns = cg.esphome_ns.namespace("gui_benchmark")
+GuiBenchmark = gui_benchmark_ns.class_("GuiBenchmark", cg.Component)
+ScenarioType = gui_benchmark_ns.enum("ScenarioType")
+
+# Scenario type, widget class it drives and default interval between steps.
+SCENARIOS = {
+    CONF_CLOCK: (ScenarioType.SCENARIO_CLOCK, gui.GuiLabel, "1s"),
+    CONF_LABEL_PRINT: (ScenarioType.SCENARIO_LABEL_PRINT, gui.GuiLabel, "50ms"),
+    CONF_CHECKBOX_TOGGLE: (
+        ScenarioType.SCENARIO_CHECKBOX_TOGGLE,
+        gui.GuiCheckbox,
+        "250ms",
+    ),
+    CONF_METER_SWEEP: (ScenarioType.SCENARIO_METER_SWEEP, gui.GuiMeter, "20ms"),
+}
+
+
+def scenario_schema(widget_class, interval):
+    return cv.Schema(
+        {
+            cv.Required(CONF_WIDGET_ID): cv.use_id(widget_class),
+            cv.Optional(CONF_NAME): cv.string,
+            cv.Optional(
+                CONF_INTERVAL, default=interval
+            ): cv.positive_time_period_milliseconds,
+        }
+    )
+
+
+SCENARIO_SCHEMA = cv.All(
+    cv.Schema(
+        {
+            cv.Optional(key): scenario_schema(cls, interval)
+            for key, (_, cls, interval) in SCENARIOS.items()
+        }
+    ),
+    cv.has_exactly_one_key(*SCENARIOS),
+)
+
+CONFIG_SCHEMA = cv.All(
+    cv.COMPONENT_SCHEMA.extend(
+        {
+            cv.GenerateID(): cv.declare_id(GuiBenchmark),
+            cv.GenerateID(CONF_GUI_ID): cv.use_id(gui.GuiComponent),
+            cv.GenerateID(CONF_DISPLAY_ID): cv.use_id(
+                headless_display.HeadlessDisplay
+            ),
+            cv.Optional(
+                CONF_WARMUP, default="1s"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(
+                CONF_DURATION, default="10s"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(CONF_OUTPUT): cv.string,
+            cv.Optional(CONF_EXIT_WHEN_DONE, default=False): cv.boolean,
+            cv.Required(CONF_SCENARIOS): cv.All(
+                cv.ensure_list(SCENARIO_SCHEMA), cv.Length(min=1)
+            ),
+        }
+    ),
+    cv.only_on(["host"]),
+)
+
+
+def validate_gui(config):
+    # The benchmark reads the gui's and the display's statistics from the main
+    # loop, which would race with a render task updating them.
+    fconf = fv.full_config.get()
+    path = fconf.get_path_for_id(config[CONF_GUI_ID])[:-1]
+    if gui.CONF_RENDER_TASK in fconf.get_config_for_path(path):
+        raise cv.Invalid(
+            f"{gui.CONF_RENDER_TASK} can't be used with the GUI benchmark",
+            path=[CONF_GUI_ID],
+        )
+    return config
+
+
+FINAL_VALIDATE_SCHEMA = validate_gui
+
+
+async def to_code(config):
+    var = cg.new_Pvariable(config[CONF_ID])
+    await cg.register_component(var, config)
+
+    parent = await cg.get_variable(config[CONF_GUI_ID])
+    cg.add(var.set_gui(parent))
+    disp = await cg.get_variable(config[CONF_DISPLAY_ID])
+    cg.add(var.set_display(disp))
+
+    cg.add(var.set_warmup(config[CONF_WARMUP]))
+    cg.add(var.set_duration(config[CONF_DURATION]))
+    if CONF_OUTPUT in config:
+        cg.add(var.set_output(config[CONF_OUTPUT]))
+    cg.add(var.set_exit_when_done(config[CONF_EXIT_WHEN_DONE]))
+
+    for scenario in config[CONF_SCENARIOS]:
+        for key, conf in scenario.items():
+            widget = await cg.get_variable(conf[CONF_WIDGET_ID])
+            name = conf.get(CONF_NAME, f"{key}_{conf[CONF_WIDGET_ID]}")
+            cg.add(
+                var.add_scenario(
+                    name, SCENARIOS[key][0], widget, conf[CONF_INTERVAL]
+                )
+            )
@@ -0,0 +1,204 @@
+#include "gui_benchmark.h"
+
+#ifdef USE_HOST
+
+#include <algorithm>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#ifdef __GLIBC__
+#include <malloc.h>
+#endif
+
+#include "esphome/core/hal.h"
+#include "esphome/core/log.h"
+#include "esphome/core/time.h"
+
+namespace esphome {
+namespace gui_benchmark {
+
+static const char *const TAG = "gui_benchmark";
+
+/// Bytes of the process' heap in use, 0 if unknown.
+static size_t heap_used() {
+#if defined(__GLIBC__) && (__GLIBC__ > 2 || __GLIBC_MINOR__ >= 33)
+  return mallinfo2().uordblks;
+#else
+  return 0;
+#endif
+}
+
+void GuiBenchmark::setup() {
+  // Frames are flushed once LVGL has rendered them, which is when it holds on to the most memory.
+  this->gui_->add_on_frame_callback([this]() { this->sample_memory_(); });
+}
+
+void GuiBenchmark::loop() {
+  if (this->done_) return;
+  uint32_t now = millis();
+  if (!this->running_) {
+    // Give the GUI time to draw its initial screen first.
+    if (now < this->warmup_) return;
+    this->high_freq_.start();
+    this->start_scenario_(now);
+    return;
+  }
+
+  const Scenario &scenario = this->scenarios_[this->current_];
+  if (now - this->started_at_ >= this->duration_) {
+    this->finish_scenario_(now);
+    return;
+  }
+  if (now - this->last_step_ >= scenario.interval) {
+    this->last_step_ = now;
+    this->step_scenario_(scenario);
+    this->step_count_++;
+  }
+}
+
+void GuiBenchmark::start_scenario_(uint32_t now) {
+  if (this->current_ >= this->scenarios_.size()) {
+    this->write_results_();
+    return;
+  }
+  ESP_LOGI(TAG, "Running scenario '%s'", this->scenarios_[this->current_].name.c_str());
+  this->running_ = true;
+  this->started_at_ = now;
+  this->last_step_ = now;
+  this->step_count_ = 0;
+  this->start_frames_ = this->gui_->get_frame_count();
+  this->start_bytes_ = this->gui_->get_total_bytes();
+  this->display_->reset_stats();
+  gui::MemoryUsage usage = gui::get_memory_usage();
+  this->start_max_used_ = usage.max_used;
+  this->peak_mem_ = usage.used;
+  this->peak_heap_ = heap_used();
+}
+
+void GuiBenchmark::step_scenario_(const Scenario &scenario) {
+  switch (scenario.type) {
+#ifdef USE_LABEL
+    case SCENARIO_CLOCK: {
+      auto *label = static_cast<gui::GuiLabel *>(scenario.target);
+#ifdef USE_TIME
+      label->strftime("%H:%M:%S", ESPTime::from_epoch_local(this->step_count_ * scenario.interval / 1000));
+#else
+      char buffer[16];
+      uint32_t seconds = this->step_count_ * scenario.interval / 1000;
+      snprintf(buffer, sizeof(buffer), "%02u:%02u:%02u", (seconds / 3600) % 24, (seconds / 60) % 60, seconds % 60);
+      label->print(buffer);
+#endif
+      break;
+    }
+    case SCENARIO_LABEL_PRINT: {
+      char buffer[16];
+      snprintf(buffer, sizeof(buffer), "%.1f", 21.5f + 3.0f * sinf(this->step_count_ * 0.1f));
+      static_cast<gui::GuiLabel *>(scenario.target)->print(buffer);
+      break;
+    }
+#endif
+#ifdef USE_CHECKBOX
+    case SCENARIO_CHECKBOX_TOGGLE:
+      static_cast<gui::GuiCheckbox *>(scenario.target)->get_switch()->toggle();
+      break;
+#endif
+#ifdef USE_METER
+    case SCENARIO_METER_SWEEP: {
+      uint32_t pos = this->step_count_ % 200;
+      static_cast<gui::GuiMeter *>(scenario.target)->set_value(pos <= 100 ? pos : 200 - pos);
+      break;
+    }
+#endif
+    default:
+      break;
+  }
+}
+
+void GuiBenchmark::sample_memory_() {
+  if (!this->running_)
+    return;
+  gui::MemoryUsage usage = gui::get_memory_usage();
+  // LVGL only keeps the peak since boot, which belongs to this scenario once it has grown past the one at its start.
+  size_t peak = usage.max_used > this->start_max_used_ ? usage.max_used : usage.used;
+  this->peak_mem_ = std::max(this->peak_mem_, peak);
+  this->peak_heap_ = std::max(this->peak_heap_, heap_used());
+}
+
+void GuiBenchmark::finish_scenario_(uint32_t now) {
+  ScenarioResult result{};
+  result.name = this->scenarios_[this->current_].name;
+  result.duration_ms = now - this->started_at_;
+  result.frames = this->gui_->get_frame_count() - this->start_frames_;
+  result.fps = result.frames * 1000.0f / result.duration_ms;
+
+  std::vector<uint32_t> times = this->display_->get_flush_times();
+  result.flushes = times.size();
+  if (!times.empty()) {
+    std::sort(times.begin(), times.end());
+    uint64_t sum = 0;
+    for (uint32_t t : times)
+      sum += t;
+    result.flush_mean_us = (float) sum / times.size();
+    result.flush_p99_us = times[std::min(times.size() - 1, (size_t) (times.size() * 0.99f))];
+    result.flush_max_us = times.back();
+  }
+  if (result.frames > 0)
+    result.bytes_per_frame = (float) (this->gui_->get_total_bytes() - this->start_bytes_) / result.frames;
+
+  this->sample_memory_();
+  result.peak_mem = this->peak_mem_;
+  result.peak_heap = this->peak_heap_;
+
+  ESP_LOGI(TAG, "'%s': %.1f fps, flush mean %.0f us, p99 %u us, %.0f bytes/frame", result.name.c_str(), result.fps,
+           result.flush_mean_us, result.flush_p99_us, result.bytes_per_frame);
+  this->results_.push_back(result);
+  this->current_++;
+  this->start_scenario_(now);
+}
+
+void GuiBenchmark::write_results_() {
+  this->running_ = false;
+  this->done_ = true;
+  this->high_freq_.stop();
+
+  std::string json = "{\"scenarios\":[";
+  char buffer[512];
+  for (size_t i = 0; i < this->results_.size(); i++) {
+    const ScenarioResult &r = this->results_[i];
+    snprintf(buffer, sizeof(buffer),
+             "%s{\"name\":\"%s\",\"duration_ms\":%u,\"frames\":%u,\"flushes\":%u,\"fps\":%.2f,"
+             "\"flush_mean_us\":%.1f,\"flush_p99_us\":%u,\"flush_max_us\":%u,\"bytes_per_frame\":%.1f,"
+             "\"lvgl_peak_mem\":%u,\"heap_peak\":%u}",
+             i > 0 ? "," : "", r.name.c_str(), r.duration_ms, r.frames, r.flushes, r.fps, r.flush_mean_us,
+             r.flush_p99_us, r.flush_max_us, r.bytes_per_frame, r.peak_mem, r.peak_heap);
+    json += buffer;
+  }
+  json += "]}";
+  ESP_LOGI(TAG, "Results: %s", json.c_str());
+
+  if (!this->output_.empty()) {
+    FILE *file = fopen(this->output_.c_str(), "w");
+    if (file == nullptr) {
+      ESP_LOGE(TAG, "Could not open %s for writing", this->output_.c_str());
+    } else {
+      fputs(json.c_str(), file);
+      fputc('\n', file);
+      fclose(file);
+    }
+  }
+  if (this->exit_when_done_)
+    exit(0);  // NOLINT
+}
+
+void GuiBenchmark::dump_config() {
+  ESP_LOGCONFIG(TAG, "GUI Benchmark:");
+  ESP_LOGCONFIG(TAG, "  Scenarios: %u", this->scenarios_.size());
+  ESP_LOGCONFIG(TAG, "  Duration per scenario: %u ms", this->duration_);
+  if (!this->output_.empty())
+    ESP_LOGCONFIG(TAG, "  Output: %s", this->output_.c_str());
+}
+
+}  // namespace gui_benchmark
+}  // namespace esphome
+
+#endif
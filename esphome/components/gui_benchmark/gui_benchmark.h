@@ -0,0 +1,99 @@
+#pragma once
+
+#include <string>
+#include <vector>
+
+#include "esphome/components/gui/gui.h"
+#include "esphome/components/headless/headless_display.h"
+#include "esphome/core/component.h"
+
+namespace esphome {
+namespace gui_benchmark {
+
+enum ScenarioType {
+  /// GuiLabel::strftime() once per interval, like a clock.
+  SCENARIO_CLOCK = 0,
+  /// GuiLabel::print() of a changing sensor-like value.
+  SCENARIO_LABEL_PRINT,
+  /// Toggle the switch mirrored by a GuiCheckbox.
+  SCENARIO_CHECKBOX_TOGGLE,
+  /// Sweep the needle of a GuiMeter across its scale.
+  SCENARIO_METER_SWEEP,
+};
+
+struct Scenario {
+  std::string name;
+  ScenarioType type;
+  gui::GuiObject *target;
+  uint32_t interval;
+};
+
+struct ScenarioResult {
+  std::string name;
+  uint32_t duration_ms;
+  uint32_t frames;
+  uint32_t flushes;
+  float fps;
+  float flush_mean_us;
+  uint32_t flush_p99_us;
+  uint32_t flush_max_us;
+  float bytes_per_frame;
+  uint32_t peak_mem;
+  /// Peak of the process' heap in use, 0 if the C library can't tell.
+  uint32_t peak_heap;
+};
+
+/// Drives widgets of a GuiComponent rendering to a headless display through
+/// scripted scenarios, one after the other, and reports rendering statistics
+/// as JSON.
+class GuiBenchmark : public Component {
+ public:
+  void setup() override;
+  void loop() override;
+  void dump_config() override;
+  float get_setup_priority() const override { return setup_priority::LATE; }
+
+  void set_gui(gui::GuiComponent *gui) { this->gui_ = gui; }
+  void set_display(headless::HeadlessDisplay *display) { this->display_ = display; }
+  void set_warmup(uint32_t warmup) { this->warmup_ = warmup; }
+  void set_duration(uint32_t duration) { this->duration_ = duration; }
+  void set_output(const std::string &output) { this->output_ = output; }
+  void set_exit_when_done(bool exit_when_done) { this->exit_when_done_ = exit_when_done; }
+  void add_scenario(const std::string &name, ScenarioType type, gui::GuiObject *target, uint32_t interval) {
+    this->scenarios_.push_back(Scenario{name, type, target, interval});
+  }
+
+ protected:
+  void start_scenario_(uint32_t now);
+  void step_scenario_(const Scenario &scenario);
+  void finish_scenario_(uint32_t now);
+  /// Fold LVGL's and the process' current memory usage into the peaks of the
+  /// running scenario. Called once every frame has been flushed.
+  void sample_memory_();
+  void write_results_();
+
+  gui::GuiComponent *gui_{nullptr};
+  headless::HeadlessDisplay *display_{nullptr};
+  uint32_t warmup_{1000};
+  uint32_t duration_{10000};
+  std::string output_{};
+  bool exit_when_done_{false};
+  std::vector<Scenario> scenarios_;
+  std::vector<ScenarioResult> results_;
+
+  HighFrequencyLoopRequester high_freq_;
+  size_t current_{0};
+  bool running_{false};
+  bool done_{false};
+  uint32_t started_at_{0};
+  uint32_t last_step_{0};
+  uint32_t step_count_{0};
+  uint32_t start_frames_{0};
+  uint64_t start_bytes_{0};
+  size_t start_max_used_{0};
+  size_t peak_mem_{0};
+  size_t peak_heap_{0};
+};
+
+}  // namespace gui_benchmark
+}  // namespace esphome
@@ -0,0 +1 @@
+CODEOWNERS = ["@lukasz-tuz"]
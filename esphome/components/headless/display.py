@@ -0,0 +1,62 @@
+import esphome.codegen as cg
+import esphome.config_validation as cv
+from esphome.components import display
+from esphome.const import (
+    CONF_DIMENSIONS,
+    CONF_ID,
+    CONF_LAMBDA,
+    CONF_PAGES,
+)
+
+DEPENDENCIES = ["display"]
+
+CONF_BUS_SPEED = "bus_speed"
+CONF_BYTE_ORDER = "byte_order"
+CONF_COLOR_DEPTH = "color_depth"
+CONF_DUMP_PATH = "dump_path"
+
+headless_ns = cg.esphome_ns.namespace("headless")
+HeadlessDisplay = headless_ns.class_(
+    "HeadlessDisplay", cg.PollingComponent, display.DisplayBuffer
+)
+
+CONFIG_SCHEMA = cv.All(
+    display.FULL_DISPLAY_SCHEMA.extend(
+        {
+            cv.GenerateID(): cv.declare_id(HeadlessDisplay),
+            cv.Required(CONF_DIMENSIONS): cv.dimensions,
+            # Has to match the pixel format the gui component renders in.
+            cv.Optional(CONF_COLOR_DEPTH, default=16): cv.one_of(8, 16, 32, int=True),
+            cv.Optional(CONF_BYTE_ORDER, default="big_endian"): cv.one_of(
+                "big_endian", "little_endian"
+            ),
+            # Directory where every flushed frame is written as a PPM image.
+            cv.Optional(CONF_DUMP_PATH): cv.string,
+            # Emulate the transfer time of a display bus of the given speed.
+            cv.Optional(CONF_BUS_SPEED): cv.frequency,
+        }
+    ).extend(cv.polling_component_schema("never")),
+    cv.only_on(["host"]),
+    cv.has_at_most_one_key(CONF_PAGES, CONF_LAMBDA),
+)
+
+
+async def to_code(config):
+    var = cg.new_Pvariable(config[CONF_ID])
+    await cg.register_component(var, config)
+    await display.register_display(var, config)
+
+    w, h = config[CONF_DIMENSIONS]
+    cg.add(var.set_dimensions(w, h))
+    cg.add(var.set_color_depth(config[CONF_COLOR_DEPTH]))
+    cg.add(var.set_byte_swap(config[CONF_BYTE_ORDER] == "big_endian"))
+    if CONF_DUMP_PATH in config:
+        cg.add(var.set_dump_path(config[CONF_DUMP_PATH]))
+    if CONF_BUS_SPEED in config:
+        cg.add(var.set_bus_speed(int(config[CONF_BUS_SPEED])))
+
+    if CONF_LAMBDA in config:
+        lambda_ = await cg.process_lambda(
+            config[CONF_LAMBDA], [(display.DisplayRef, "it")], return_type=cg.void
+        )
+        cg.add(var.set_writer(lambda_))
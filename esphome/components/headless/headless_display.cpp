@@ -0,0 +1,151 @@
+#include "headless_display.h"
+
+#ifdef USE_HOST
+
+#include <cstdio>
+#include <cstring>
+#include <utility>
+
+#include "esphome/core/hal.h"
+#include "esphome/core/log.h"
+
+namespace esphome {
+namespace headless {
+
+static const char *const TAG = "headless";
+
+void HeadlessDisplay::setup() {
+  this->init_internal_(this->width_ * this->height_ * (this->color_depth_ / 8));
+}
+
+void HeadlessDisplay::update() {
+  // Without a lambda or pages the buffer belongs to whoever draws into it,
+  // e.g. the gui, which only redraws what changed. auto_clear_enabled would
+  // wipe its frame.
+  if (this->writer_.has_value() || this->page_ != nullptr)
+    this->do_update_();
+  this->flush_(this->buffer_length_);
+}
+
+uint32_t HeadlessDisplay::update_area(const display::Rect &area) {
+  if (!area.is_set()) {
+    this->update();
+    return this->buffer_length_;
+  }
+  return this->flush_(area.w * area.h * (this->color_depth_ / 8));
+}
+
+uint32_t HeadlessDisplay::flush_(uint32_t bytes) {
+  uint32_t start = micros();
+  if (this->bus_speed_ > 0) {
+    delayMicroseconds((uint64_t) bytes * 8 * 1000000 / this->bus_speed_);
+  }
+  if (!this->dump_path_.empty()) {
+    char filename[32];
+    snprintf(filename, sizeof(filename), "/frame_%06u.ppm", this->flush_count_);
+    this->save_ppm(this->dump_path_ + filename);
+  }
+  this->flush_times_.push_back(micros() - start);
+  this->flushed_bytes_ += bytes;
+  this->flush_count_++;
+  return bytes;
+}
+
+void HeadlessDisplay::reset_stats() {
+  this->flush_times_.clear();
+  this->flushed_bytes_ = 0;
+  this->flush_count_ = 0;
+}
+
+uint32_t HeadlessDisplay::encode_color_(Color color, uint8_t *data) {
+  switch (this->color_depth_) {
+    case 8:
+      data[0] = display::ColorUtil::color_to_332(color);
+      return 1;
+    case 16: {
+      uint16_t c = display::ColorUtil::color_to_565(color);
+      if (this->byte_swap_)
+        c = (c >> 8) | (c << 8);
+      memcpy(data, &c, sizeof(c));
+      return 2;
+    }
+    default:
+      // LVGL's 32-bit format, little-endian ARGB8888.
+      data[0] = color.b;
+      data[1] = color.g;
+      data[2] = color.r;
+      data[3] = 0xFF;
+      return 4;
+  }
+}
+
+void HeadlessDisplay::draw_absolute_pixel_internal(int x, int y, Color color) {
+  if (x >= this->width_ || x < 0 || y >= this->height_ || y < 0 || this->buffer_ == nullptr)
+    return;
+  uint8_t pixel[4];
+  uint32_t bpp = this->encode_color_(color, pixel);
+  memcpy(this->buffer_ + (x + y * this->width_) * bpp, pixel, bpp);
+}
+
+void HeadlessDisplay::fill_absolute_area_internal(const display::Rect &area, Color color) {
+  if (this->buffer_ == nullptr)
+    return;
+  uint8_t pixel[4];
+  uint32_t bpp = this->encode_color_(color, pixel);
+  this->fill_buffer_area_(area, pixel, bpp);
+}
+
+bool HeadlessDisplay::set_hardware_rotation_(display::DisplayRotation rotation) {
+  if (rotation == display::DISPLAY_ROTATION_90_DEGREES || rotation == display::DISPLAY_ROTATION_270_DEGREES)
+    std::swap(this->width_, this->height_);
+  return true;
+}
+
+Color HeadlessDisplay::get_pixel(int x, int y) {
+  uint32_t pos = x + y * this->width_;
+  switch (this->color_depth_) {
+    case 8:
+      return display::ColorUtil::rgb332_to_color(this->buffer_[pos]);
+    case 16: {
+      uint16_t c = ((uint16_t *) this->buffer_)[pos];
+      if (this->byte_swap_)
+        c = (c >> 8) | (c << 8);
+      return display::ColorUtil::to_color(c, display::COLOR_ORDER_RGB, display::COLOR_BITNESS_565);
+    }
+    default:
+      return Color(this->buffer_[pos * 4 + 2], this->buffer_[pos * 4 + 1], this->buffer_[pos * 4]);
+  }
+}
+
+bool HeadlessDisplay::save_ppm(const std::string &filename) {
+  FILE *file = fopen(filename.c_str(), "wb");
+  if (file == nullptr) {
+    ESP_LOGW(TAG, "Could not open %s for writing", filename.c_str());
+    return false;
+  }
+  fprintf(file, "P6\n%d %d\n255\n", this->width_, this->height_);
+  for (int y = 0; y < this->height_; y++) {
+    for (int x = 0; x < this->width_; x++) {
+      Color c = this->get_pixel(x, y);
+      uint8_t rgb[3] = {c.r, c.g, c.b};
+      fwrite(rgb, 1, sizeof(rgb), file);
+    }
+  }
+  fclose(file);
+  return true;
+}
+
+void HeadlessDisplay::dump_config() {
+  LOG_DISPLAY("", "Headless Display", this);
+  ESP_LOGCONFIG(TAG, "  Color depth: %u bits", this->color_depth_);
+  if (!this->dump_path_.empty())
+    ESP_LOGCONFIG(TAG, "  Dumping frames to: %s", this->dump_path_.c_str());
+  if (this->bus_speed_ > 0)
+    ESP_LOGCONFIG(TAG, "  Emulated bus speed: %u Hz", this->bus_speed_);
+  LOG_UPDATE_INTERVAL(this);
+}
+
+}  // namespace headless
+}  // namespace esphome
+
+#endif
@@ -0,0 +1,72 @@
+#pragma once
+
+#include <string>
+#include <vector>
+
+#include "esphome/components/display/display_buffer.h"
+#include "esphome/core/component.h"
+
+namespace esphome {
+namespace headless {
+
+/// In-memory display for the host platform. Keeps the frame buffer in RAM,
+/// optionally writes every flushed frame to disk and records how long each
+/// flush took, so the GUI can be run and measured without a panel attached.
+class HeadlessDisplay : public PollingComponent, public display::DisplayBuffer {
+ public:
+  void setup() override;
+  void update() override;
+  void dump_config() override;
+  float get_setup_priority() const override { return setup_priority::PROCESSOR; }
+
+  void set_dimensions(int width, int height) {
+    this->width_ = width;
+    this->height_ = height;
+  }
+  void set_color_depth(uint8_t color_depth) { this->color_depth_ = color_depth; }
+  void set_byte_swap(bool byte_swap) { this->byte_swap_ = byte_swap; }
+  void set_dump_path(const std::string &dump_path) { this->dump_path_ = dump_path; }
+  /// Emulate the transfer time of a display bus running at the given speed in Hz.
+  void set_bus_speed(uint32_t bus_speed) { this->bus_speed_ = bus_speed; }
+
+  display::DisplayType get_display_type() override { return display::DisplayType::DISPLAY_TYPE_COLOR; }
+
+  uint32_t update_area(const display::Rect &area) override;
+  bool supports_partial_update() override { return true; }
+
+  /// Read back a pixel from the frame buffer.
+  Color get_pixel(int x, int y);
+  /// Write the current frame buffer to a binary PPM file.
+  bool save_ppm(const std::string &filename);
+
+  /// Duration of every flush since the last reset_stats(), in microseconds.
+  const std::vector<uint32_t> &get_flush_times() const { return this->flush_times_; }
+  uint64_t get_flushed_bytes() const { return this->flushed_bytes_; }
+  uint32_t get_flush_count() const { return this->flush_count_; }
+  void reset_stats();
+
+ protected:
+  int get_width_internal() override { return this->width_; }
+  int get_height_internal() override { return this->height_; }
+  void draw_absolute_pixel_internal(int x, int y, Color color) override;
+  void fill_absolute_area_internal(const display::Rect &area, Color color) override;
+  /// Emulates a panel which rotates by itself: the frame buffer simply takes the rotated dimensions.
+  bool set_hardware_rotation_(display::DisplayRotation rotation) override;
+  /// Encode a color in the buffer's format, returns the number of bytes written.
+  uint32_t encode_color_(Color color, uint8_t *data);
+  uint32_t flush_(uint32_t bytes);
+
+  int width_{0};
+  int height_{0};
+  uint8_t color_depth_{16};
+  bool byte_swap_{true};
+  std::string dump_path_{};
+  uint32_t bus_speed_{0};
+
+  std::vector<uint32_t> flush_times_;
+  uint64_t flushed_bytes_{0};
+  uint32_t flush_count_{0};
+};
+
+}  // namespace headless
+}  // namespace esphome